@@ -0,0 +1,184 @@
+"""
+Admission control and load shedding for the analysis endpoints.
+
+Each analysis request has to take a token from a per-user bucket and from
+a global bucket (both kept in Redis so every gunicorn worker shares them),
+and the inference queue depth is checked against a soft and a hard limit:
+
+    * bucket empty            -> reject with 429 + Retry-After
+    * depth >= hard limit     -> reject with 429 + Retry-After
+    * depth >= soft limit     -> downgrade to the fast extractive pipeline
+                                 (or reject, if the endpoint cannot downgrade
+                                 or ADMISSION_OVERLOAD_POLICY is 'reject')
+
+Every decision is exported through ``metrics``. If Redis is unreachable the
+controller fails open so that analysis keeps working without it.
+"""
+
+import os
+import math
+import time
+import logging
+from functools import wraps
+
+from flask import request, jsonify
+
+import metrics
+from config import config
+from redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+# Take one token from the user bucket and one from the global bucket, or
+# from neither. Returns {allowed, retry_after_seconds, limiting_bucket}.
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local result_wait = 0
+local limiting = ''
+local levels = {}
+for i = 1, 2 do
+    local rate = tonumber(ARGV[i * 2])
+    local capacity = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < 1 then
+        local wait = (1 - tokens) / rate
+        if wait > result_wait then
+            result_wait = wait
+            limiting = (i == 1) and 'user' or 'global'
+        end
+    end
+end
+local allowed = (result_wait == 0) and 1 or 0
+for i = 1, 2 do
+    local rate = tonumber(ARGV[i * 2])
+    local capacity = tonumber(ARGV[i * 2 + 1])
+    local tokens = levels[i]
+    if allowed == 1 then tokens = tokens - 1 end
+    redis.call('HSET', KEYS[i], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[i], math.ceil(capacity / rate) + 60)
+end
+return {allowed, tostring(result_wait), limiting}
+"""
+
+ADMIT = 'admit'
+DOWNGRADE = 'downgrade'
+REJECT = 'reject'
+
+
+class AdmissionDecision:
+    """Outcome of an admission check."""
+
+    def __init__(self, action, reason='ok', retry_after=0):
+        self.action = action
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def downgrade(self):
+        return self.action == DOWNGRADE
+
+
+class AdmissionController:
+    """Redis-backed token buckets plus queue-depth thresholds."""
+
+    def __init__(self, cfg=None):
+        cfg = cfg or config[env]
+        self.enabled = cfg.ADMISSION_ENABLED
+        self.user_rate = cfg.ADMISSION_USER_RATE
+        self.user_burst = cfg.ADMISSION_USER_BURST
+        self.global_rate = cfg.ADMISSION_GLOBAL_RATE
+        self.global_burst = cfg.ADMISSION_GLOBAL_BURST
+        self.queue_soft_limit = cfg.ADMISSION_QUEUE_SOFT_LIMIT
+        self.queue_hard_limit = cfg.ADMISSION_QUEUE_HARD_LIMIT
+        self.overload_policy = cfg.ADMISSION_OVERLOAD_POLICY
+        self.queue_name = cfg.INFERENCE_QUEUE
+        self._script = None
+
+    def _take_tokens(self, r, identity):
+        if self._script is None:
+            self._script = r.register_script(TOKEN_BUCKET_SCRIPT)
+        allowed, wait, limiting = self._script(
+            keys=[f"admission:user:{identity}", "admission:global"],
+            args=[time.time(), self.user_rate, self.user_burst, self.global_rate, self.global_burst],
+        )
+        if isinstance(limiting, bytes):
+            limiting = limiting.decode()
+        return bool(allowed), float(wait), limiting
+
+    def queue_depth(self, r):
+        """
+        Number of analyses waiting for an inference worker: jobs held by the
+        SEJF dispatcher plus tasks already in the Celery queue (a Redis list).
+        """
+        from scheduler import PENDING_KEY
+        depth = r.llen(self.queue_name) + r.zcard(PENDING_KEY)
+        metrics.set_gauge('analysis_queue_depth', depth, queue=self.queue_name)
+        return depth
+
+    def check(self, identity, downgradable=False):
+        """Decide whether to admit, downgrade or reject one analysis request."""
+        if not self.enabled:
+            return AdmissionDecision(ADMIT, 'disabled')
+        try:
+            r = get_redis()
+            allowed, wait, limiting = self._take_tokens(r, identity)
+            if not allowed:
+                return AdmissionDecision(REJECT, f'{limiting}_rate_limit', wait)
+
+            depth = self.queue_depth(r)
+        except Exception as e:
+            logger.warning(f"Admission control unavailable, admitting request: {str(e)}")
+            return AdmissionDecision(ADMIT, 'redis_unavailable')
+
+        # Rough drain estimate: a queued analysis takes a couple of seconds per slot
+        overload_wait = max(1, depth - self.queue_soft_limit + 1) * 2
+        if depth >= self.queue_hard_limit:
+            return AdmissionDecision(REJECT, 'queue_full', overload_wait)
+        if depth >= self.queue_soft_limit:
+            if downgradable and self.overload_policy == DOWNGRADE:
+                return AdmissionDecision(DOWNGRADE, 'queue_backlog')
+            return AdmissionDecision(REJECT, 'queue_backlog', overload_wait)
+        return AdmissionDecision(ADMIT)
+
+
+admission_controller = AdmissionController()
+
+
+def admission_controlled(endpoint, downgradable=False):
+    """
+    Decorator that runs admission control before an analysis endpoint.
+
+    Rejected requests get 429 with Retry-After. Admitted requests find the
+    decision on ``request.admission``; endpoints marked ``downgradable``
+    must check ``request.admission.downgrade`` and use the fast pipeline.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            current_user = getattr(request, 'current_user', None)
+            identity = current_user['user_id'] if current_user else (request.remote_addr or 'anonymous')
+            decision = admission_controller.check(identity, downgradable=downgradable)
+            metrics.inc('admission_decisions_total', endpoint=endpoint,
+                        decision=decision.action, reason=decision.reason)
+
+            if decision.action == REJECT:
+                retry_after = max(1, math.ceil(decision.retry_after))
+                logger.warning(f"Admission rejected {endpoint} for {identity}: {decision.reason}")
+                response = jsonify(error='Too many analysis requests, please retry later',
+                                   reason=decision.reason, retry_after=retry_after)
+                response.status_code = 429
+                response.headers['Retry-After'] = str(retry_after)
+                return response
+            if decision.downgrade:
+                logger.info(f"Admission downgraded {endpoint} for {identity} to the fast pipeline")
+
+            request.admission = decision
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
@@ -0,0 +1,135 @@
+"""
+Analysis router.
+
+Picks the analysis pipeline from the features computed at ingest
+(utils.document_features, stored on the document row):
+
+    fast          short documents (at most ROUTER_FAST_MAX_TOKENS estimated
+                  tokens) and simple ones (at most ROUTER_SIMPLE_MAX_SECTIONS
+                  sections and ROUTER_SIMPLE_MAX_TOKENS tokens), any language:
+                  the extractive analysis
+    multilingual  Indic text (at least ROUTER_INDIC_MIN_RATIO of the letters
+                  in an Indic script): the language-specific models
+    bart          everything else: BART, summarizing as many 1024-token
+                  chunks as the document needs, between SUMMARY_MAX_CHUNKS
+                  and ROUTER_MAX_CHUNKS
+
+Every decision is counted in ``router_decisions_total`` and kept in Redis
+until its task finishes; the end-to-end latency is then observed in
+``router_latency_seconds`` and the decision, features and outcome are
+appended to the ``router:log`` list (the last ROUTER_LOG_MAX_ENTRIES) for
+tuning the thresholds with ``scripts/routing_report.py``.
+"""
+
+import os
+import json
+import math
+import time
+import logging
+
+import metrics
+from config import config
+from redis_client import get_redis
+from utils.document_features import document_features
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+DECISION_KEY = "router:decision:{}"
+LOG_KEY = "router:log"
+DECISION_TTL_SECONDS = 24 * 3600
+
+FAST, BART, MULTILINGUAL = 'fast', 'bart', 'multilingual'
+
+TASKS = {
+    FAST: 'tasks.analyze_document_fast_task',
+    BART: 'tasks.analyze_document_task',
+    MULTILINGUAL: 'tasks.analyze_document_multilingual_task',
+}
+
+FEATURES = ('text_length', 'estimated_tokens', 'script_ratio', 'section_count', 'language')
+
+
+def features_of(document):
+    """
+    The stored routing features of a document row, or None when it was
+    uploaded before they were computed.
+    """
+    if any(document.get(name) is None for name in FEATURES):
+        return None
+    return {name: document[name] for name in FEATURES}
+
+
+def ensure_features(db, document):
+    """Stored features of a document, computing and storing them if missing."""
+    features = features_of(document)
+    if features is None:
+        features = document_features(document.get('content') or '')
+        db.update_document_features(document['id'], features)
+    return features
+
+
+def route(features):
+    """
+    Choose a pipeline for a document.
+
+    Returns:
+        dict: {'pipeline', 'task', 'reason', 'max_chunks' (BART only)}
+    """
+    cfg = config[env]
+    tokens = features['estimated_tokens']
+    if tokens <= cfg.ROUTER_FAST_MAX_TOKENS:
+        pipeline, reason = FAST, 'short'
+    elif features['section_count'] <= cfg.ROUTER_SIMPLE_MAX_SECTIONS and tokens <= cfg.ROUTER_SIMPLE_MAX_TOKENS:
+        pipeline, reason = FAST, 'simple'
+    elif features['script_ratio'] >= cfg.ROUTER_INDIC_MIN_RATIO:
+        pipeline, reason = MULTILINGUAL, f"indic:{features['language']}"
+    else:
+        pipeline, reason = BART, 'long' if tokens > 1024 * cfg.SUMMARY_MAX_CHUNKS else 'default'
+    decision = {'pipeline': pipeline, 'task': TASKS[pipeline], 'reason': reason}
+    if pipeline == BART:
+        decision['max_chunks'] = max(cfg.SUMMARY_MAX_CHUNKS, min(math.ceil(tokens / 1024), cfg.ROUTER_MAX_CHUNKS))
+    return decision
+
+
+def record(task_id, doc_id, features, decision):
+    """Log a routing decision and keep it until its task completes."""
+    entry = {'task_id': task_id, 'document_id': doc_id, 'features': features, **decision,
+             'decided_at': time.time()}
+    metrics.inc('router_decisions_total', pipeline=decision['pipeline'], reason=decision['reason'])
+    logger.info(f"Routed document {doc_id} to {decision['pipeline']} ({decision['reason']}): {features}")
+    try:
+        get_redis().set(DECISION_KEY.format(task_id), json.dumps(entry), ex=DECISION_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Could not record routing decision for {task_id}: {str(e)}")
+
+
+def complete(task_id, state):
+    """
+    Record the outcome of a routed task (no-op for tasks that were not routed).
+
+    Returns:
+        dict: The logged decision with 'latency_seconds' and 'state', or None
+    """
+    r = get_redis()
+    raw = r.get(DECISION_KEY.format(task_id))
+    if raw is None:
+        return None
+    entry = json.loads(raw)
+    entry.update(latency_seconds=round(time.time() - entry['decided_at'], 3), state=state)
+    pipe = r.pipeline()
+    pipe.delete(DECISION_KEY.format(task_id))
+    pipe.lpush(LOG_KEY, json.dumps(entry))
+    pipe.ltrim(LOG_KEY, 0, config[env].ROUTER_LOG_MAX_ENTRIES - 1)
+    pipe.execute()
+    metrics.observe('router_latency_seconds', entry['latency_seconds'], pipeline=entry['pipeline'],
+                    reason=entry['reason'])
+    logger.info(f"Routed task {task_id} ({entry['pipeline']}, {entry['reason']}) finished {state} "
+                f"in {entry['latency_seconds']}s")
+    return entry
+
+
+def recent_decisions(limit=1000):
+    """The latest completed routing decisions, newest first."""
+    return [json.loads(raw) for raw in get_redis().lrange(LOG_KEY, 0, limit - 1)]
@@ -3,22 +3,32 @@ import sys
 import logging
 import datetime as dt
 import re
+import time
 from marshmallow import Schema, fields, validate, ValidationError
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from config import config
 from models_supabase import SupabaseDB, DBManager
 from utils.file_utils import allowed_file, extract_text
+from utils.clause_spans import clause_preview, with_previews
 # from transformers import pipeline  # Commented out as unused after disabling LLM
 import uuid
 import tempfile
-from tasks import analyze_document_task
 from compatibility_endpoints import analyze_document_temp, task_status_temp, export_analysis_temp, analyze_document_multilingual_temp, analyze_document_fast_multilingual_temp
 from celery_app import celery_app
-from auth import jwt_manager, token_required
+from auth import jwt_manager, token_required, admin_required, metrics_access_required
 from auth_routes import auth_bp
+from admission import admission_controlled
+import metrics
+import scheduler
+import template_library
+import near_duplicates
+import analysis_router
+import deadlines
+import summary_stream
+from utils.document_features import document_features
 from functools import wraps
 
 # Set up logging
@@ -28,6 +38,7 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 env = os.getenv('FLASK_ENV', 'development')
 app.config.from_object(config[env])
+deadlines.check_limits(config[env])
 # Configure CORS — allow local dev AND Docker (nginx on port 80)
 allowed_origins = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://127.0.0.1:3000,http://localhost,http://localhost:80').split(',')
 CORS(app, 
@@ -114,6 +125,22 @@ def get_user_analysis_safe(user_id):
         logger.error(f"Error getting user analysis: {str(e)}")
         return []
 
+def load_task_analysis(result):
+    """Resolve a task result reference to its stored analysis row.
+
+    Tasks return only {document_id, analysis_id, status}; the full analysis
+    is read from the database. Falls back to the latest analysis for the
+    document when the result predates analysis_id references.
+    """
+    if not isinstance(result, dict) or 'document_id' not in result:
+        return None
+    analysis_id = result.get('analysis_id')
+    if analysis_id:
+        analysis_doc = db_manager.get_analysis_result_by_id(analysis_id)
+        if analysis_doc:
+            return analysis_doc
+    return db_manager.get_analysis_result(result['document_id'])
+
 # Ensure upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
@@ -131,6 +158,18 @@ def upload_document():
     if file.content_length > app.config['MAX_CONTENT_LENGTH']:
         logger.error(f"File too large: {file.content_length} bytes")
         return jsonify(error='File too large'), 400
+    # Optional: the document this upload revises (re-analysis reuses its results)
+    previous_version_id = request.form.get('previous_version_id') or None
+    parent_version = 0
+    if previous_version_id:
+        if len(previous_version_id) > 100 or not re.match(r'^[a-zA-Z0-9_-]+$', previous_version_id):
+            return jsonify(error='Invalid previous_version_id format'), 400
+        previous = db_manager.get_document(previous_version_id)
+        if not previous:
+            return jsonify(error='Previous version not found'), 404
+        if str(previous.get('user_id')) != str(request.current_user['user_id']):
+            return jsonify(error='Access denied'), 403
+        parent_version = previous.get('version') or 1
     try:
         filename = secure_filename(file.filename)
         logger.info(f"Processing file: {filename}")
@@ -142,7 +181,8 @@ def upload_document():
         logger.info("File saved successfully, extracting text")
         text = extract_text(save_path)
         logger.info(f"Text extracted, length: {len(text)}")
-        doc_id = db_manager.store_document_metadata_and_content(filename, text, save_path)
+        doc_id = db_manager.store_document_metadata_and_content(filename, text, save_path, previous_version_id,
+                                                                parent_version + 1)
         # Associate document with current user
         supabase_db.update_document_with_user(doc_id, request.current_user['user_id'])
         # Upload to Supabase Storage
@@ -156,14 +196,48 @@ def upload_document():
             logger.info(f"File uploaded to Supabase Storage: {storage_path}")
         except Exception as storage_err:
             logger.warning(f"Supabase Storage upload failed (file saved locally): {storage_err}")
+        # Match the closest registered template (analysis then skips its boilerplate)
+        template_match = None
+        if app.config['TEMPLATES_ENABLED']:
+            try:
+                template_match = template_library.match_document(supabase_db, text)
+                if template_match['template_id']:
+                    supabase_db.update_document_template(doc_id, template_match['template_id'],
+                                                         template_match['coverage'], template_match['match_ms'])
+                logger.info(f"Template match for {doc_id}: {template_match}")
+            except Exception as match_err:
+                logger.warning(f"Template matching failed: {match_err}")
+        # Cheap routing features (length, tokens, script, sections, language)
+        features = None
+        try:
+            features = document_features(text)
+            supabase_db.update_document_features(doc_id, features)
+        except Exception as features_err:
+            logger.warning(f"Computing document features failed: {features_err}")
+        # MinHash signature for near-duplicate lookups
+        if app.config['NEAR_DUPLICATES_ENABLED']:
+            try:
+                signature = near_duplicates.compute_signature(text)
+                supabase_db.update_document_minhash(doc_id, signature)
+                near_duplicates.index_document(request.current_user['user_id'], doc_id, signature)
+            except Exception as lsh_err:
+                logger.warning(f"Near-duplicate indexing failed: {lsh_err}")
         logger.info(f"Document stored in DB with ID: {doc_id} for user {request.current_user['user_id']}")
-        return jsonify(document_id=doc_id), 200
+        response = {'document_id': doc_id}
+        if previous_version_id:
+            response.update(previous_version_id=previous_version_id, version=parent_version + 1)
+        if template_match:
+            response['template_match'] = template_match
+        if features:
+            response['features'] = features
+        return jsonify(response), 200
     except Exception as e:
         logger.error(f"Error during upload: {str(e)}", exc_info=True)
         return jsonify(error=str(e)), 500
 
 @app.route('/api/analyze-document', methods=['POST'])
 @token_required
+@admission_controlled('analyze_document', downgradable=True)
 def analyze_document():
     try:
         data = request.get_json()
@@ -177,6 +251,20 @@ def analyze_document():
         # Validate document ID format
         if len(doc_id) > 100 or not re.match(r'^[a-zA-Z0-9_-]+$', doc_id):
             return jsonify({'error': 'Invalid document_id format'}), 400
+
+        # An optional deadline bounds the response time whatever the document size
+        deadline_ms = data.get('deadline_ms')
+        if deadline_ms is not None:
+            if (not isinstance(deadline_ms, int) or isinstance(deadline_ms, bool)
+                    or not app.config['DEADLINE_MIN_MS'] <= deadline_ms <= app.config['DEADLINE_MAX_MS']):
+                return jsonify({'error': f"deadline_ms must be an integer between {app.config['DEADLINE_MIN_MS']} "
+                                         f"and {app.config['DEADLINE_MAX_MS']}"}), 400
+        deadline_at = time.time() + deadline_ms / 1000 if deadline_ms is not None else None
+
+        # Pick the pipeline from the ingest features unless the client named one
+        pipeline = data.get('pipeline') or ('auto' if app.config['ROUTER_ENABLED'] else analysis_router.BART)
+        if pipeline != 'auto' and pipeline not in analysis_router.TASKS:
+            return jsonify({'error': f"pipeline must be 'auto' or one of {', '.join(analysis_router.TASKS)}"}), 400
         
         # Get document
         document = db_manager.get_document(doc_id)
@@ -188,24 +276,95 @@ def analyze_document():
             logger.warning(f"Unauthorized access attempt by user {request.current_user['user_id']} to document {doc_id}")
             return jsonify({'error': 'Access denied'}), 403
         
-        # Start Celery task
-        task = analyze_document_task.delay(doc_id)
-        return jsonify(task_id=task.id, status='processing'), 202
+        # Under overload, admission control sends the request to the fast
+        # extractive pipeline instead of queueing another BART run; a deadline
+        # is still answered by its expiry
+        if request.admission.downgrade:
+            task = celery_app.send_task('tasks.analyze_document_fast_task', args=[doc_id])
+            if deadline_at is not None:
+                return deadline_response(task, document, deadline_at, deadline_ms, analysis_router.FAST,
+                                         {'reason': 'overload'}, downgraded=True)
+            return jsonify(task_id=task.id, status='processing', pipeline='fast', downgraded=True), 202
+
+        features = analysis_router.ensure_features(supabase_db, document)
+        if pipeline == 'auto':
+            decision = analysis_router.route(features)
+        else:
+            decision = {'pipeline': pipeline, 'task': analysis_router.TASKS[pipeline], 'reason': 'requested'}
+
+        if decision['pipeline'] == analysis_router.FAST:
+            # Recorded before sending: the fast task can finish within milliseconds
+            task_id = str(uuid.uuid4())
+            analysis_router.record(task_id, doc_id, features, decision)
+            task = celery_app.send_task(decision['task'], args=[doc_id], task_id=task_id)
+            eta = {}
+        else:
+            # Schedule the Celery task by its predicted cost (short jobs first)
+            args = [doc_id, decision['max_chunks']] if decision.get('max_chunks') else [doc_id]
+            if deadline_at is not None and decision['pipeline'] == analysis_router.BART:
+                args = [doc_id, decision.get('max_chunks'), deadline_at, deadline_ms]
+            task = scheduler.submit(
+                decision['task'], args,
+                text_length=features['text_length'],
+                document_type=document.get('document_type'),
+                language=features['language'],
+                pipeline=decision['pipeline'],
+                deadline_at=deadline_at
+            )
+            analysis_router.record(task.id, doc_id, features, decision)
+            eta = scheduler.eta(task.id)
+        route = {k: v for k, v in decision.items() if k in ('reason', 'max_chunks')}
+        if deadline_at is not None:
+            return deadline_response(task, document, deadline_at, deadline_ms, decision['pipeline'], route)
+        return jsonify(task_id=task.id, status='processing', pipeline=decision['pipeline'], route=route, **eta), 202
     except Exception as e:
         logger.error(f"Error in analyze_document: {str(e)}")
         return jsonify({'error': 'Analysis failed'}), 500
 
+def deadline_response(task, document, deadline_at, deadline_ms, pipeline, route, **extra):
+    """
+    Answer an analysis request by its deadline: complete, partial or preview
+    (see deadlines.py). ``extra`` fields are added to the response.
+    """
+    try:
+        with deadlines.waiter_slot(deadline_at) as may_wait:
+            if may_wait:
+                outcome, analysis_doc = deadlines.wait_for_analysis(task, deadline_at,
+                                                                    db_manager.get_analysis_result_by_id)
+            else:
+                logger.info(f"Too many deadline requests waiting, answering task {task.id} without waiting")
+                outcome, analysis_doc = None, None
+        if analysis_doc:
+            analysis = analysis_doc.get('analysis_results', {})
+        else:
+            outcome, analysis = 'preview', deadlines.preview(document['content'])
+    except Exception as e:
+        logger.error(f"Deadline answer for task {task.id} failed: {str(e)}")
+        deadlines.record_response(deadline_ms, 'pending', {})
+        return jsonify(task_id=task.id, status='processing', pipeline=pipeline, route=route, outcome='pending',
+                       **extra), 202
+    deadlines.record_response(deadline_ms, outcome, analysis)
+    partial = outcome != 'complete'
+    return jsonify(task_id=task.id, status='processing' if partial else 'completed', pipeline=pipeline,
+                   route=route, outcome=outcome, partial=partial, analysis=analysis, **extra), 200
+
 @app.route('/api/task-status/<task_id>', methods=['GET'])
 @token_required
 def task_status(task_id):
     from celery_app import celery_app
     task = celery_app.AsyncResult(task_id)
     if task.state == 'PENDING':
-        response = {'state': task.state, 'status': 'Pending...'}
+        response = {'state': task.state, 'status': 'Pending...', **scheduler.eta(task_id)}
     elif task.state == 'PROGRESS':
-        response = {'state': task.state, 'status': task.info.get('status', '')}
+        response = {'state': task.state, 'status': task.info.get('status', ''), **scheduler.eta(task_id)}
+        if task.info.get('partial_analysis_id'):
+            response.update(partial=True, partial_analysis_id=task.info['partial_analysis_id'])
     elif task.state == 'SUCCESS':
-        response = {'state': task.state, 'result': task.result}
+        result = dict(task.result) if isinstance(task.result, dict) else task.result
+        analysis_doc = load_task_analysis(result)
+        if analysis_doc:
+            result['analysis'] = analysis_doc.get('analysis_results', {})
+        response = {'state': task.state, 'result': result}
     else:
         response = {'state': task.state, 'status': str(task.info)}
     return jsonify(response)
@@ -317,14 +476,17 @@ def dashboard_stats():
                         else:
                             clause_counts['other'] += 1
                 
-                # Simple risk assessment based on number of risks detected
-                risks = results.get('risks', [])
-                risk_level = len(risks)
-                logger.info(f"Found {risk_level} risks for analysis")
-                
-                if risk_level >= 3:
+                # Risk classifier level when the analysis has one, else the
+                # number of risk flags detected
+                risk_level = results.get('risk_level')
+                if risk_level is None:
+                    flag_count = len(results.get('risks', []))
+                    risk_level = 'high' if flag_count >= 3 else 'medium' if flag_count >= 2 else 'low'
+                logger.info(f"Risk level {risk_level} for analysis")
+
+                if risk_level == 'high':
                     high_risk_count += 1
-                elif risk_level >= 2:
+                elif risk_level == 'medium':
                     medium_risk_count += 1
                 else:
                     low_risk_count += 1
@@ -487,17 +649,15 @@ def export_analysis():
     elif task.state != 'SUCCESS':
         return jsonify({'error': 'Analysis failed or not completed'}), 409
 
-    # Extract document_id from task result
+    # Task results are references - resolve the analysis from Supabase
     result = task.result
-    import json
-    logger.info(f"Full task result JSON: {json.dumps(result, default=str)}")
+    logger.info(f"Task result reference: {result}")
     if not isinstance(result, dict) or 'document_id' not in result:
         return jsonify({'error': 'Invalid task result'}), 500
 
     document_id = result['document_id']
 
-    # Get analysis from Supabase
-    analysis_doc = supabase_db.get_analysis_result(document_id)
+    analysis_doc = load_task_analysis(result)
     if not analysis_doc:
         return jsonify({'error': 'Analysis not found in database'}), 404
 
@@ -543,8 +703,9 @@ def export_analysis():
     if clauses_count > 0:
         c.drawString(100, y_pos, "Clauses:")
         y_pos -= 20
+        document_text = (db_manager.get_document(document_id) or {}).get('content') or ''
         for clause in analysis.get('clauses', []):
-            clause_text = f"{clause.get('type', 'Unknown')}: {clause.get('heading', '')} - {clause.get('content', '')[:200]}..."
+            clause_text = f"{clause.get('type', 'Unknown')}: {clause.get('heading', '')} - {clause_preview(document_text, clause, 200)}"
             c.drawString(120, y_pos, clause_text)
             y_pos -= 20
             if y_pos < 50:  # Prevent going off page
@@ -557,6 +718,7 @@ def export_analysis():
 
 # Temporary endpoints to bypass Celery issues
 @app.route('/api/analyze-document-temp', methods=['POST'])
+@admission_controlled('analyze_document_temp', downgradable=True)
 def analyze_document_temp_route():
     """Temporary synchronous analysis endpoint to bypass Celery issues"""
     return analyze_document_temp()
@@ -572,16 +734,210 @@ def export_analysis_temp_route(document_id):
     return export_analysis_temp(document_id)
 
 @app.route('/api/analyze-document-multilingual', methods=['POST'])
+@admission_controlled('analyze_document_multilingual', downgradable=True)
 def analyze_document_multilingual_route():
     """Multilingual document analysis endpoint supporting Hindi, Marathi, and English"""
     return analyze_document_multilingual_temp()
 
 @app.route('/api/analyze-document-fast-multilingual', methods=['POST'])
 @token_required
+@admission_controlled('analyze_document_fast_multilingual')
 def analyze_document_fast_multilingual_route():
     """Fast multilingual document analysis endpoint with optimized performance"""
     return analyze_document_fast_multilingual_temp(supabase_db, supabase_db)
 
+@app.route('/api/documents/<doc_id>/summary/stream', methods=['POST'])
+@token_required
+@admission_controlled('stream_summary')
+def stream_summary(doc_id):
+    """Stream the summary as server-sent events, then store the analysis."""
+    if len(doc_id) > 100 or not re.match(r'^[a-zA-Z0-9_-]+$', doc_id):
+        return jsonify({'error': 'Invalid document_id format'}), 400
+    try:
+        document = db_manager.get_document(doc_id)
+        if not document:
+            return jsonify({'error': 'Document not found'}), 404
+        if str(document.get('user_id')) != str(request.current_user['user_id']):
+            logger.warning(f"Unauthorized access attempt by user {request.current_user['user_id']} to document {doc_id}")
+            return jsonify({'error': 'Access denied'}), 403
+    except Exception as e:
+        logger.error(f"Error in stream_summary: {str(e)}")
+        return jsonify({'error': 'Analysis failed'}), 500
+
+    # BART runs on an inference worker; this request only relays its events
+    started = time.time()
+    stream_id = str(uuid.uuid4())
+    celery_app.send_task('tasks.stream_summary_task', args=[doc_id, stream_id])
+    events = summary_stream.relay_events(stream_id, started)
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/documents/<doc_id>/clauses', methods=['GET'])
+@token_required
+def document_clauses(doc_id):
+    """
+    Clauses of a document's latest analysis as spans of its text.
+
+    Query parameters:
+        previews: 'true' to render a whitespace-collapsed preview per clause
+        max_chars: Preview length (default 500, at most 5000)
+    """
+    if len(doc_id) > 100 or not re.match(r'^[a-zA-Z0-9_-]+$', doc_id):
+        return jsonify({'error': 'Invalid document_id format'}), 400
+    try:
+        document = db_manager.get_document(doc_id)
+        if not document:
+            return jsonify({'error': 'Document not found'}), 404
+        if str(document.get('user_id')) != str(request.current_user['user_id']):
+            logger.warning(f"Unauthorized access attempt by user {request.current_user['user_id']} to document {doc_id}")
+            return jsonify({'error': 'Access denied'}), 403
+
+        analysis_doc = db_manager.get_analysis_result(doc_id)
+        if not analysis_doc:
+            return jsonify({'error': 'Analysis not found'}), 404
+        clauses = (analysis_doc.get('analysis_results') or {}).get('clauses') or []
+
+        if request.args.get('previews', 'false').lower() == 'true':
+            try:
+                max_chars = min(int(request.args.get('max_chars', 500)), 5000)
+            except ValueError:
+                return jsonify({'error': 'max_chars must be an integer'}), 400
+            clauses = with_previews(clauses, document.get('content') or '', max_chars)
+        return jsonify(document_id=doc_id, clauses=clauses)
+    except Exception as e:
+        logger.error(f"Error in document_clauses: {str(e)}")
+        return jsonify({'error': 'Failed to load clauses'}), 500
+
+@app.route('/api/documents/<doc_id>/versions', methods=['GET'])
+@token_required
+def document_versions(doc_id):
+    """Every version linked to a document (previous versions and revisions), oldest first."""
+    if len(doc_id) > 100 or not re.match(r'^[a-zA-Z0-9_-]+$', doc_id):
+        return jsonify({'error': 'Invalid document_id format'}), 400
+    try:
+        document = db_manager.get_document(doc_id)
+        if not document:
+            return jsonify({'error': 'Document not found'}), 404
+        user_id = str(request.current_user['user_id'])
+        if str(document.get('user_id')) != user_id:
+            logger.warning(f"Unauthorized access attempt by user {user_id} to document {doc_id}")
+            return jsonify({'error': 'Access denied'}), 403
+        versions = [v for v in supabase_db.get_document_versions(doc_id) if str(v.get('user_id')) == user_id]
+        return jsonify(document_id=doc_id, versions=versions)
+    except Exception as e:
+        logger.error(f"Error in document_versions: {str(e)}")
+        return jsonify({'error': 'Failed to load versions'}), 500
+
+@app.route('/api/documents/<doc_id>/similar', methods=['GET'])
+@token_required
+def similar_documents(doc_id):
+    """
+    The user's documents that are near-duplicates of a document.
+
+    Query parameters:
+        threshold: Minimum estimated Jaccard similarity (default NEAR_DUPLICATE_THRESHOLD)
+        limit: Maximum number of results (default 20, at most 100)
+    """
+    if len(doc_id) > 100 or not re.match(r'^[a-zA-Z0-9_-]+$', doc_id):
+        return jsonify({'error': 'Invalid document_id format'}), 400
+    try:
+        threshold = float(request.args.get('threshold', app.config['NEAR_DUPLICATE_THRESHOLD']))
+        limit = min(int(request.args.get('limit', 20)), 100)
+    except ValueError:
+        return jsonify({'error': 'threshold must be a number and limit an integer'}), 400
+    if not 0 <= threshold <= 1 or limit < 1:
+        return jsonify({'error': 'threshold must be between 0 and 1 and limit positive'}), 400
+    try:
+        document = db_manager.get_document(doc_id)
+        if not document:
+            return jsonify({'error': 'Document not found'}), 404
+        user_id = str(request.current_user['user_id'])
+        if str(document.get('user_id')) != user_id:
+            logger.warning(f"Unauthorized access attempt by user {user_id} to document {doc_id}")
+            return jsonify({'error': 'Access denied'}), 403
+        signature = document.get('minhash')
+        if not signature:
+            # Uploaded before near-duplicate detection: index it now
+            signature = near_duplicates.compute_signature(document.get('content') or '')
+            supabase_db.update_document_minhash(doc_id, signature)
+            near_duplicates.index_document(user_id, doc_id, signature)
+        similar = near_duplicates.find_similar(user_id, doc_id, signature, threshold, limit)
+        documents = {d['id']: d for d in supabase_db.get_documents_by_ids([i for i, _ in similar])} if similar else {}
+        return jsonify(document_id=doc_id, threshold=threshold, similar=[
+            {'document_id': i, 'filename': documents[i].get('filename'), 'jaccard': round(score, 4)}
+            for i, score in similar if i in documents])
+    except Exception as e:
+        logger.error(f"Error in similar_documents: {str(e)}")
+        return jsonify({'error': 'Failed to find similar documents'}), 500
+
+@app.route('/api/admin/templates', methods=['GET'])
+@token_required
+@admin_required
+def list_templates():
+    """Registered templates (metadata only)."""
+    return jsonify(templates=supabase_db.list_templates())
+
+@app.route('/api/admin/templates', methods=['POST'])
+@token_required
+@admin_required
+def register_template():
+    """
+    Register an analyzed document as a template.
+
+    Body: {"name": str, "document_id": str}; the document must belong to the
+    admin and needs a completed analysis from /api/analyze-document.
+    """
+    data = request.get_json() or {}
+    name = (data.get('name') or '').strip()
+    doc_id = data.get('document_id')
+    if not name or len(name) > 200:
+        return jsonify({'error': 'A template name of at most 200 characters is required'}), 400
+    if not doc_id or not isinstance(doc_id, str) or len(doc_id) > 100 or not re.match(r'^[a-zA-Z0-9_-]+$', doc_id):
+        return jsonify({'error': 'Valid document_id is required'}), 400
+    try:
+        document = db_manager.get_document(doc_id)
+        if not document:
+            return jsonify({'error': 'Document not found'}), 404
+        # Templates are shared with every user, so only the owner may publish a document
+        if str(document.get('user_id')) != str(request.current_user['user_id']):
+            logger.warning(f"Unauthorized template registration by user {request.current_user['user_id']} from document {doc_id}")
+            return jsonify({'error': 'Access denied'}), 403
+        analysis_row = db_manager.get_analysis_result(doc_id)
+        if not analysis_row:
+            return jsonify({'error': 'Analyze the document before registering it as a template'}), 409
+        template_id = template_library.register(supabase_db, name, document, analysis_row,
+                                                request.current_user['user_id'])
+        return jsonify(template_id=template_id, name=name), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        logger.error(f"Error in register_template: {str(e)}")
+        return jsonify({'error': 'Failed to register template'}), 500
+
+@app.route('/api/admin/templates/<template_id>', methods=['DELETE'])
+@token_required
+@admin_required
+def delete_template(template_id):
+    if len(template_id) > 100 or not re.match(r'^[a-zA-Z0-9_-]+$', template_id):
+        return jsonify({'error': 'Invalid template_id format'}), 400
+    deleted = supabase_db.delete_template(template_id)
+    if deleted is None:
+        return jsonify({'error': 'Failed to delete template'}), 500
+    if not deleted:
+        return jsonify({'error': 'Template not found'}), 404
+    template_library.invalidate()
+    return jsonify(template_id=template_id, deleted=True)
+
+@app.route('/api/metrics', methods=['GET'])
+@metrics_access_required
+def metrics_endpoint():
+    """Prometheus scrape endpoint (METRICS_TOKEN or an admin) for admission, cache and latency metrics."""
+    try:
+        return metrics.render_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4'}
+    except Exception as e:
+        logger.error(f"Error rendering metrics: {str(e)}")
+        return jsonify({'error': 'Metrics unavailable'}), 503
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint for Docker / load balancers."""
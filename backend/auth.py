@@ -1,3 +1,4 @@
+import hmac
 import jwt
 from datetime import datetime, timedelta
 from functools import wraps
@@ -85,6 +86,43 @@ def token_required(f):
     
     return decorated
 
+def is_admin(email):
+    """Whether an email is listed in ADMIN_EMAILS"""
+    admins = {e.strip().lower() for e in current_app.config.get('ADMIN_EMAILS', '').split(',') if e.strip()}
+    return (email or '').lower() in admins
+
+def admin_required(f):
+    """Decorator (after token_required) limiting an endpoint to ADMIN_EMAILS"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not is_admin(request.current_user.get('email')):
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(*args, **kwargs)
+
+    return decorated
+
+def metrics_access_required(f):
+    """Decorator allowing the METRICS_TOKEN bearer (Prometheus) or an admin's JWT"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        auth_header = request.headers.get('Authorization') or ''
+        token = auth_header[len('Bearer '):] if auth_header.startswith('Bearer ') else None
+        if not token:
+            return jsonify({'error': 'Token is missing'}), 401
+
+        scrape_token = current_app.config.get('METRICS_TOKEN')
+        if scrape_token and hmac.compare_digest(token.encode(), scrape_token.encode()):
+            return f(*args, **kwargs)
+
+        payload = jwt_manager.verify_token(token)
+        if not payload:
+            return jsonify({'error': 'Token is invalid or expired'}), 401
+        if not is_admin(payload.get('email')):
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(*args, **kwargs)
+
+    return decorated
+
 def validate_registration_data(email, password):
     """Validate registration data"""
     errors = []
@@ -2,8 +2,11 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from billiard.process import current_process
 from celery import Celery
+from celery.signals import celeryd_init, worker_process_init
 from config import config
+import topology
 
 # Get environment from env variable, default to development
 env = os.getenv('FLASK_ENV', 'development')
@@ -24,16 +27,61 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
-    # Task routing - send tasks to celery queue
+    # Task routing - model inference goes to the inference queue, the rest
+    # to the default celery queue
     task_routes={
+        'tasks.analyze_document_task': {'queue': config[env].INFERENCE_QUEUE},
+        'tasks.analyze_document_ml_task': {'queue': config[env].INFERENCE_QUEUE},
+        'tasks.analyze_document_multilingual_task': {'queue': config[env].INFERENCE_QUEUE},
+        'tasks.stream_summary_task': {'queue': config[env].INFERENCE_QUEUE},
         'tasks.*': {'queue': 'celery'},
     },
+    # analyze_document_task opts into late acknowledgement itself (it
+    # resumes from checkpoints); every other task is acked on receipt
+    worker_prefetch_multiplier=1,
+    broker_transport_options={
+        'visibility_timeout': config[env].CELERY_VISIBILITY_TIMEOUT,
+    },
     # Result backend settings - remove problematic Redis-specific settings
     result_backend_transport_options={
         'visibility_timeout': 3600,
     },
+    # Periodic jobs for the SEJF dispatcher (run with `celery beat`)
+    beat_schedule={
+        'dispatch-scheduled-analyses': {
+            'task': 'tasks.dispatch_scheduled_task',
+            'schedule': 5.0,
+        },
+        'refit-cost-model': {
+            'task': 'tasks.refit_cost_model_task',
+            'schedule': 3600.0,
+        },
+    },
 )
 
-# Import tasks to register them with the worker
-# This must happen AFTER celery_app is created
-import tasks
+# Compress stored results only when explicitly configured
+if config[env].CELERY_RESULT_COMPRESSION:
+    celery_app.conf.result_compression = config[env].CELERY_RESULT_COMPRESSION
+
+# Size the pool and its children's thread pools from the usable cores.
+# The role comes from WORKER_ROLE, else from the queues the worker consumes.
+worker_role = None
+
+
+@celeryd_init.connect
+def configure_worker_topology(sender=None, conf=None, options=None, **kwargs):
+    global worker_role
+    options = options or {}
+    queues = options.get('queues') or []
+    if isinstance(queues, str):
+        queues = queues.split(',')
+    worker_role = os.getenv('WORKER_ROLE') or (
+        topology.INFERENCE if config[env].INFERENCE_QUEUE in queues else topology.FAST)
+    if config[env].TOPOLOGY_ENABLED and not options.get('concurrency'):
+        conf.worker_concurrency = topology.plan(worker_role).processes
+
+
+@worker_process_init.connect
+def apply_worker_topology(**kwargs):
+    if worker_role:
+        topology.apply(worker_role, index=getattr(current_process(), 'index', None))
@@ -0,0 +1,99 @@
+"""
+Stage checkpoints for resumable analysis tasks.
+
+Each analysis stage (document structure, clause list, per-chunk summaries)
+stores its output in a Redis hash keyed by
+``(doc_id, content_hash, pipeline_version)``. When a worker is OOM-killed
+or redeployed mid-task, the redelivered task (``acks_late``) finds the
+completed stages and resumes after them instead of re-running BART on
+every chunk. Because the key includes the content hash and pipeline
+version, an edited document or a changed pipeline never picks up stale
+stages. The same hash counts deliveries of the task, so a document that
+kills its worker every time is given up after CHECKPOINT_MAX_ATTEMPTS.
+"""
+
+import os
+import json
+import logging
+
+from config import config
+from redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+CHECKPOINT_KEY = "checkpoint:{}:{}:{}"
+ATTEMPTS_FIELD = "attempts"
+
+
+class AnalysisCheckpoint:
+    """Checkpointed stage outputs for one (document, content, pipeline) triple."""
+
+    def __init__(self, doc_id, content_hash, pipeline_version):
+        self.key = CHECKPOINT_KEY.format(doc_id, content_hash, pipeline_version)
+        self.ttl = config[env].CHECKPOINT_TTL_SECONDS
+        self.resumed_stages = []
+        self.recompute_avoided_seconds = 0.0
+        # Stages this task computed itself; reading them back is not a resume
+        self.computed = {}
+
+    def start_attempt(self):
+        """Count one more delivery of the task and return the count (1 on the first run)."""
+        try:
+            r = get_redis()
+            pipe = r.pipeline()
+            pipe.hincrby(self.key, ATTEMPTS_FIELD, 1)
+            pipe.expire(self.key, self.ttl)
+            return int(pipe.execute()[0])
+        except Exception as e:
+            logger.warning(f"Checkpoint attempt count failed for {self.key}: {str(e)}")
+            return 1
+
+    def load(self, stage):
+        """
+        Return the saved output of a stage, or None if it has not completed.
+        Every hit from an earlier run is recorded so the task can report
+        the work it skipped.
+        """
+        if stage in self.computed:
+            return self.computed[stage]
+        try:
+            r = get_redis()
+            raw = r.hget(self.key, stage)
+            if raw is None:
+                return None
+            elapsed = float(r.hget(self.key, f"{stage}:elapsed") or 0)
+        except Exception as e:
+            logger.warning(f"Checkpoint read failed for {self.key} [{stage}]: {str(e)}")
+            return None
+        self.resumed_stages.append(stage)
+        self.recompute_avoided_seconds += elapsed
+        logger.info(f"Resuming {stage} from checkpoint (saves {elapsed:.2f}s)")
+        return json.loads(raw)
+
+    def save(self, stage, value, elapsed):
+        """Store a completed stage along with how long it took to compute."""
+        self.computed[stage] = value
+        try:
+            r = get_redis()
+            pipe = r.pipeline()
+            pipe.hset(self.key, mapping={stage: json.dumps(value), f"{stage}:elapsed": elapsed})
+            pipe.expire(self.key, self.ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Checkpoint write failed for {self.key} [{stage}]: {str(e)}")
+
+    def clear(self):
+        """Drop all stages once the analysis has been stored."""
+        try:
+            get_redis().delete(self.key)
+        except Exception as e:
+            logger.warning(f"Checkpoint cleanup failed for {self.key}: {str(e)}")
+
+    def summary(self):
+        """Checkpoint statistics for task metadata."""
+        return {
+            'resumed_stages': list(self.resumed_stages),
+            'recompute_avoided_seconds': round(self.recompute_avoided_seconds, 2),
+        }
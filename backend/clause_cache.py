@@ -0,0 +1,169 @@
+"""
+Two-tier cache of per-clause model outputs.
+
+Standard confidentiality, governing-law and liability paragraphs recur word
+for word across contracts, so model outputs are cached by the hash of the
+normalized clause text (utils.hashing.clause_hash) and shared between
+documents. Each entry holds one field per kind of output and model
+revision, e.g. ``risk:<revision>`` for the risk classifier probabilities
+or ``clauses:<revision>`` for the clause model's spans within a section;
+a new kind (such as clause summaries) only needs a new field name, and a
+new model snapshot, backend or threshold never reads another model's
+outputs.
+
+    Memory tier  per-process LRU of CLAUSE_CACHE_MEMORY_ENTRIES fields
+    Redis tier   one hash per clause (``clause_cache:<hash>``) expiring after
+                 CLAUSE_CACHE_TTL_SECONDS; an access index (sorted set)
+                 evicts the least recently used clauses beyond
+                 CLAUSE_CACHE_MAX_ENTRIES. Redis hits are promoted to memory.
+
+Lookups are counted in ``clause_cache_requests_total`` by kind and tier
+(``memory``, ``redis``, ``miss``), and ``clause_cache_hit_ratio`` holds the
+hit ratio of the latest document per kind. Cache failures are logged and
+treated as misses.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import metrics
+import model_store
+from config import config
+from redis_client import get_redis
+from utils.hashing import clause_hash, params_hash
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+ENTRY_KEY = "clause_cache:{}"
+INDEX_KEY = "clause_cache:index"
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _cfg():
+    return config[env]
+
+
+@lru_cache(maxsize=None)
+def model_revision(model_name, backend, **params):
+    """
+    Identity of the model that produces an output: the modification time of
+    a local model directory (or the store version, or 'hub'), the backend
+    and any parameters that change the output. Resolved once per process,
+    like the loaded models themselves.
+    """
+    path, _ = model_store.resolve(model_name)
+    if os.path.isdir(path):
+        version = str(int(os.path.getmtime(path)))
+    else:
+        version = model_store.current_version() or 'hub'
+    return f"{version}:{backend}:{params_hash(params)[:12]}"
+
+
+def _memory_get(field_key):
+    with _memory_lock:
+        if field_key not in _memory:
+            return None
+        _memory.move_to_end(field_key)
+        return _memory[field_key]
+
+
+def _memory_put(field_key, value):
+    with _memory_lock:
+        _memory[field_key] = value
+        _memory.move_to_end(field_key)
+        while len(_memory) > _cfg().CLAUSE_CACHE_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def clear_memory():
+    with _memory_lock:
+        _memory.clear()
+
+
+def _write_redis(field, entries):
+    """Store {clause hash: value} under ``field`` and evict beyond the entry cap."""
+    cfg = _cfg()
+    r = get_redis()
+    now = time.time()
+    pipe = r.pipeline()
+    for key, value in entries.items():
+        pipe.hset(ENTRY_KEY.format(key), field, json.dumps(value))
+        pipe.expire(ENTRY_KEY.format(key), cfg.CLAUSE_CACHE_TTL_SECONDS)
+    pipe.zadd(INDEX_KEY, {key: now for key in entries})
+    pipe.execute()
+
+    excess = r.zcard(INDEX_KEY) - cfg.CLAUSE_CACHE_MAX_ENTRIES
+    if excess > 0:
+        evicted = [k.decode() if isinstance(k, bytes) else k for k in r.zrange(INDEX_KEY, 0, excess - 1)]
+        pipe = r.pipeline()
+        pipe.delete(*[ENTRY_KEY.format(k) for k in evicted])
+        pipe.zrem(INDEX_KEY, *evicted)
+        pipe.execute()
+
+
+def get_many(kind, revision, texts):
+    """
+    Cached outputs of one kind for several clause texts.
+
+    Args:
+        kind: Output kind ('risk', 'clauses', ...)
+        revision: Model revision (see model_revision)
+        texts: Clause (or section) texts
+
+    Returns:
+        list: The cached value of each text, or None
+    """
+    if not _cfg().CLAUSE_CACHE_ENABLED or not texts:
+        return [None] * len(texts)
+    field = f"{kind}:{revision}"
+    keys = [clause_hash(text) for text in texts]
+    values = [_memory_get(f"{field}:{key}") for key in keys]
+    tiers = ['memory' if value is not None else 'miss' for value in values]
+
+    pending = [i for i, value in enumerate(values) if value is None]
+    if pending:
+        try:
+            r = get_redis()
+            pipe = r.pipeline()
+            for i in pending:
+                pipe.hget(ENTRY_KEY.format(keys[i]), field)
+            found = {}
+            for i, raw in zip(pending, pipe.execute()):
+                if raw is not None:
+                    values[i], tiers[i] = json.loads(raw), 'redis'
+                    _memory_put(f"{field}:{keys[i]}", values[i])
+                    found[keys[i]] = time.time()
+            if found:
+                r.zadd(INDEX_KEY, found)
+        except Exception as e:
+            logger.warning(f"Clause cache read failed: {str(e)}")
+
+    for tier in ('memory', 'redis', 'miss'):
+        count = tiers.count(tier)
+        if count:
+            metrics.inc('clause_cache_requests_total', count, kind=kind, tier=tier)
+    metrics.set_gauge('clause_cache_hit_ratio', round(1 - tiers.count('miss') / len(tiers), 4), kind=kind)
+    return values
+
+
+def put_many(kind, revision, texts, values):
+    """Store one output of a kind per clause text."""
+    if not _cfg().CLAUSE_CACHE_ENABLED or not texts:
+        return
+    field = f"{kind}:{revision}"
+    entries = {clause_hash(text): value for text, value in zip(texts, values)}
+    for key, value in entries.items():
+        _memory_put(f"{field}:{key}", value)
+    try:
+        _write_redis(field, entries)
+    except Exception as e:
+        logger.warning(f"Clause cache write failed: {str(e)}")
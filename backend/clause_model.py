@@ -0,0 +1,290 @@
+"""
+Batched sliding-window serving of the fine-tuned clause extraction model.
+
+The model trained by ``ml/models/fine_tune_clause_extraction.py`` is a
+binary token classifier (clause / not clause) with a 512-token window.
+Documents are longer than that, so ``extract_clauses``:
+
+    1. tokenizes the document once (``tokenize_document``, cached in Redis)
+    2. cuts it into CLAUSE_MODEL_WINDOW-token windows that overlap by
+       CLAUSE_MODEL_OVERLAP tokens
+    3. runs the windows through the model in padded batches of
+       CLAUSE_MODEL_BATCH_SIZE on CPU
+    4. merges the overlapping per-token probabilities, weighting each
+       window's tokens by their distance from the window edge (where the
+       model saw the least context)
+    5. turns runs of tokens above CLAUSE_MODEL_THRESHOLD into clause spans
+       (see utils.clause_spans), typed by the keyword scan
+
+``CLAUSE_MODEL_BACKEND`` is ``pytorch`` (fp32) or ``pytorch-int8`` (dynamic
+int8 quantization of the Linear layers, as for the summarizer). Every run
+reports windows and documents per second; ``scripts/benchmark_clause_model.py``
+compares the backends. ``extract_section_clauses`` puts the clause cache in
+front of the model, so boilerplate sections seen before are not re-run.
+"""
+
+import os
+import time
+import logging
+import threading
+from bisect import bisect_left
+
+import numpy as np
+
+import metrics
+import model_store
+import clause_cache
+from config import config
+from keywords import CLAUSE, CLAUSE_CATEGORIES, scan as scan_keywords
+from summarizer_backends import PYTORCH, PYTORCH_INT8
+from tokenization import tokenize_document
+from utils.clause_spans import PageIndex, clause_record
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+BACKENDS = (PYTORCH, PYTORCH_INT8)
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def window_bounds(length, window, overlap):
+    """(start, end) token indices of windows covering ``length`` tokens, overlapping by ``overlap``."""
+    step = max(1, window - overlap)
+    bounds = []
+    start = 0
+    while True:
+        end = min(start + window, length)
+        bounds.append((start, end))
+        if end >= length:
+            return bounds
+        start += step
+
+
+def edge_weights(size):
+    """Per-token weights of a window: 1 at the edges, rising towards the centre."""
+    positions = np.arange(size)
+    return np.minimum(positions + 1, size - positions).astype(np.float32)
+
+
+def merge_window_probs(length, bounds, window_probs):
+    """
+    Merge per-window token probabilities into one probability per token.
+
+    Args:
+        length: Number of document tokens
+        bounds: (start, end) of each window
+        window_probs: Clause probability of each window token
+
+    Returns:
+        numpy.ndarray: Edge-weighted average probability per token
+    """
+    total = np.zeros(length, dtype=np.float32)
+    weight = np.zeros(length, dtype=np.float32)
+    for (start, end), probs in zip(bounds, window_probs):
+        w = edge_weights(end - start)
+        total[start:end] += w * np.asarray(probs, dtype=np.float32)
+        weight[start:end] += w
+    return np.divide(total, weight, out=np.zeros_like(total), where=weight > 0)
+
+
+def probability_runs(probs, threshold, min_tokens=1):
+    """(start, end) token runs with probability >= ``threshold`` and at least ``min_tokens`` long."""
+    above = np.concatenate(([0], (np.asarray(probs) >= threshold).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(above))
+    return [(int(start), int(end)) for start, end in zip(edges[::2], edges[1::2]) if end - start >= min_tokens]
+
+
+def _clause_type(hits, start, end):
+    """Clause category with the most keyword hits inside [start, end), else 'general'."""
+    best, best_count = 'general', 0
+    for name in CLAUSE_CATEGORIES:
+        offsets = hits.offsets.get((CLAUSE, name))
+        if not offsets:
+            continue
+        i = bisect_left(offsets, (start,))
+        count = 0
+        while i < len(offsets) and offsets[i][0] < end:
+            count += offsets[i][1] <= end
+            i += 1
+        if count > best_count:
+            best, best_count = name, count
+    return best
+
+
+def load_model(model_dir=None, backend=None):
+    """Load the clause model once per process and backend (eval mode, CPU)."""
+    model_dir = model_dir or config[env].CLAUSE_MODEL_DIR
+    backend = backend or config[env].CLAUSE_MODEL_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown clause model backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    with _models_lock:
+        if (model_dir, backend) not in _models:
+            import torch
+            from transformers import AutoModelForTokenClassification
+            path, kwargs = model_store.resolve(model_dir)
+            model = AutoModelForTokenClassification.from_pretrained(path, **kwargs)
+            model.eval()
+            if backend == PYTORCH_INT8:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info(f"Loaded clause model from {path} ({backend})")
+            _models[(model_dir, backend)] = model
+        return _models[(model_dir, backend)]
+
+
+def predict_windows(tokens, bounds, model, batch_size):
+    """
+    Clause probability of every document token in each window.
+
+    Windows are run in padded batches; the probabilities of the special
+    tokens added around each window are dropped.
+    """
+    import torch
+
+    tokenizer = model_store.load_tokenizer(tokens.model_name)
+    window_probs = []
+    for i in range(0, len(bounds), batch_size):
+        batch = bounds[i:i + batch_size]
+        inputs = [tokens.chunk(start, end) for start, end in batch]
+        encoded = tokenizer.pad({'input_ids': inputs}, return_tensors='pt')
+        with torch.inference_mode():
+            logits = model(**encoded).logits
+        probs = torch.softmax(logits, dim=-1)[:, :, 1].numpy()
+        for row, (start, end) in enumerate(batch):
+            special = tokenizer.get_special_tokens_mask([int(t) for t in tokens.input_ids[start:end]])
+            positions = [p for p, is_special in enumerate(special) if not is_special]
+            window_probs.append(probs[row, positions])
+    return window_probs
+
+
+def extract_clauses(text, text_hash=None, backend=None):
+    """
+    Clause spans predicted by the fine-tuned clause model.
+
+    Args:
+        text: Document text
+        text_hash: Precomputed content hash of ``text`` (optional)
+        backend: One of BACKENDS (defaults to CLAUSE_MODEL_BACKEND)
+
+    Returns:
+        list: Clause records as spans of ``text`` (see utils.clause_spans);
+              confidence is the mean clause probability of the span
+    """
+    cfg = config[env]
+    backend = backend or cfg.CLAUSE_MODEL_BACKEND
+    model = load_model(cfg.CLAUSE_MODEL_DIR, backend)
+    tokens = tokenize_document(text, cfg.CLAUSE_MODEL_DIR, text_hash)
+
+    started = time.time()
+    bounds = window_bounds(len(tokens), tokens.window_size(cfg.CLAUSE_MODEL_WINDOW), cfg.CLAUSE_MODEL_OVERLAP)
+    probs = merge_window_probs(len(tokens), bounds,
+                               predict_windows(tokens, bounds, model, cfg.CLAUSE_MODEL_BATCH_SIZE))
+    elapsed = max(time.time() - started, 1e-6)
+
+    metrics.inc('clause_model_windows_total', len(bounds), backend=backend)
+    metrics.inc('clause_model_documents_total', backend=backend)
+    metrics.set_gauge('clause_model_windows_per_second', len(bounds) / elapsed, backend=backend)
+    metrics.set_gauge('clause_model_documents_per_second', 1 / elapsed, backend=backend)
+    logger.info(f"Clause model ({backend}): {len(bounds)} windows of {len(tokens)} tokens in {elapsed:.2f}s "
+                f"({len(bounds) / elapsed:.1f} windows/s)")
+
+    hits = scan_keywords(text)
+    pages = PageIndex(text)
+    clauses = []
+    for token_start, token_end in probability_runs(probs, cfg.CLAUSE_MODEL_THRESHOLD, cfg.CLAUSE_MODEL_MIN_TOKENS):
+        start, end = tokens.char_span(token_start, token_end)
+        heading = text[start:end].strip().split('\n', 1)[0][:100]
+        confidence = round(float(probs[token_start:token_end].mean()), 3)
+        clauses.append(clause_record(text, _clause_type(hits, start, end), heading, start, end, confidence, pages))
+    return clauses
+
+
+def _section_entries(sections, indices, clauses):
+    """
+    Cache entries ({'hash', 'clauses' relative to the section}) of the given
+    sections; sections overlapped by a clause extending past them are left
+    out, since their clauses depend on the neighbouring text.
+    """
+    entries = {i: {'hash': sections[i]['hash'], 'clauses': []} for i in indices}
+    starts = [sections[i]['start'] for i in indices]
+    for clause in clauses:
+        position = bisect_left(starts, clause['start'] + 1) - 1
+        if position < 0:
+            continue
+        index = indices[position]
+        section = sections[index]
+        if clause['end'] > section['end']:
+            for i in indices[position:]:
+                if sections[i]['start'] < clause['end']:
+                    entries.pop(i, None)
+            continue
+        if index in entries:
+            record = {key: value for key, value in clause.items() if key != 'page'}
+            record.update(start=clause['start'] - section['start'], end=clause['end'] - section['start'])
+            entries[index]['clauses'].append(record)
+    return entries
+
+
+def extract_section_clauses(text, sections, text_hash=None, backend=None):
+    """
+    ``extract_clauses`` with the clause cache in front of the model.
+
+    Each section's clauses are cached under its normalized text (see
+    clause_cache.py), together with the hash of its exact text so cached
+    offsets are only reused for an identical section. Only the runs of
+    consecutive uncached sections are run through the model (the whole
+    document when nothing is cached), and their clauses are cached in turn.
+
+    Args:
+        text: Document text
+        sections: Structure index of ``text`` (utils.structure)
+        text_hash: Precomputed content hash of ``text`` (optional)
+        backend: One of BACKENDS (defaults to CLAUSE_MODEL_BACKEND)
+
+    Returns:
+        list: Clause records as spans of ``text``, in document order
+    """
+    cfg = config[env]
+    backend = backend or cfg.CLAUSE_MODEL_BACKEND
+    if not sections:
+        return extract_clauses(text, text_hash, backend)
+    revision = clause_cache.model_revision(cfg.CLAUSE_MODEL_DIR, backend, window=cfg.CLAUSE_MODEL_WINDOW,
+                                           overlap=cfg.CLAUSE_MODEL_OVERLAP, threshold=cfg.CLAUSE_MODEL_THRESHOLD,
+                                           min_tokens=cfg.CLAUSE_MODEL_MIN_TOKENS)
+    texts = [text[section['start']:section['end']] for section in sections]
+    cached = clause_cache.get_many('clauses', revision, texts)
+    hits = {i: entry['clauses'] for i, entry in enumerate(cached)
+            if entry and entry.get('hash') == sections[i]['hash']}
+
+    # Runs of consecutive uncached sections
+    runs = []
+    for i in range(len(sections)):
+        if i in hits:
+            continue
+        if runs and runs[-1][-1] == i - 1:
+            runs[-1].append(i)
+        else:
+            runs.append([i])
+
+    pages = PageIndex(text)
+    clauses = []
+    for i, records in hits.items():
+        offset = sections[i]['start']
+        for record in records:
+            start = record['start'] + offset
+            clauses.append({**record, 'start': start, 'end': record['end'] + offset, 'page': pages.page(start)})
+    entries = {}
+    for run in runs:
+        offset, end = sections[run[0]]['start'], sections[run[-1]]['end']
+        whole = offset == 0 and end == len(text)
+        found = extract_clauses(text[offset:end], text_hash if whole else None, backend)
+        found = [{**clause, 'start': clause['start'] + offset, 'end': clause['end'] + offset,
+                  'page': pages.page(clause['start'] + offset)} for clause in found]
+        clauses.extend(found)
+        entries.update(_section_entries(sections, run, found))
+    if entries:
+        clause_cache.put_many('clauses', revision, [texts[i] for i in entries], list(entries.values()))
+    logger.info(f"Clause cache: {len(hits)} of {len(sections)} sections cached, model run on {len(runs)} spans")
+    return sorted(clauses, key=lambda clause: clause['start'])
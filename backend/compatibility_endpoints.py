@@ -8,9 +8,6 @@ import logging
 import uuid
 import time
 import os
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.platypus import Image
 import os
 
 # Import Supabase DB layer
@@ -21,6 +18,8 @@ from models_supabase import SupabaseDB
 supabase_db = SupabaseDB()
 import io
 from config import config
+from utils.clause_spans import clause_preview
+import scheduler
 
 # Get environment from env variable
 env = os.getenv('FLASK_ENV', 'development')
@@ -31,6 +30,8 @@ def add_legistra_logo_to_pdf(canvas_obj, x, y, width=50):
     """
     Add the official Legistra logo to PDF canvas using the LOGO.png file
     """
+    from reportlab.platypus import Image
+
     try:
         # Path to the LOGO.png file
         logo_path = os.path.join(os.path.dirname(__file__), '..', 'frontend', 'src', 'assets', 'logo', 'LOGO.png')
@@ -54,6 +55,51 @@ def add_legistra_logo_to_pdf(canvas_obj, x, y, width=50):
         canvas_obj.setFillColorRGB(1.0, 1.0, 1.0)  # White
         canvas_obj.drawString(x + 5, y + width/2, "LEGISTRA")
 
+FAST_ANALYSIS_TASK = 'tasks.analyze_document_fast_task'
+
+def submit_analysis_with_budget(task_name, document_id):
+    """
+    Submit an analysis task (routed to the inference queue for model-backed
+    tasks, see celery_app.task_routes) and wait for it up to
+    SYNC_ANALYSIS_WAIT_SECONDS. Models only live in the inference workers,
+    so the web worker never imports torch or holds a model.
+
+    Returns:
+        tuple: (result, task_id) - result is None if the budget ran out
+    """
+    from celery_app import celery_app
+    from celery.exceptions import TimeoutError as CeleryTimeoutError
+
+    if task_name == FAST_ANALYSIS_TASK:
+        task = celery_app.send_task(task_name, args=[document_id])
+    else:
+        # Model-backed tasks go through the SEJF dispatcher
+        document = supabase_db.get_document(document_id) or {}
+        task = scheduler.submit(
+            task_name, [document_id],
+            text_length=document.get('text_length') or 0,
+            document_type=document.get('document_type'),
+            language=document.get('language'),
+            pipeline='multilingual' if 'multilingual' in task_name else 'bart'
+        )
+    try:
+        result = task.get(timeout=config[env].SYNC_ANALYSIS_WAIT_SECONDS, propagate=False)
+    except CeleryTimeoutError:
+        logger.info(f"Analysis task {task.id} still running after {config[env].SYNC_ANALYSIS_WAIT_SECONDS}s")
+        return None, task.id
+    if isinstance(result, Exception):
+        result = {'error': str(result)}
+    return result, task.id
+
+def load_analysis_for_reference(result):
+    """Read the stored analysis a task result reference points at."""
+    analysis_doc = None
+    if result.get('analysis_id'):
+        analysis_doc = supabase_db.get_analysis_result_by_id(result['analysis_id'])
+    if not analysis_doc:
+        analysis_doc = supabase_db.get_analysis_result(result['document_id'])
+    return analysis_doc.get('analysis_results', {}) if analysis_doc else None
+
 def analyze_document_temp():
     """
     Temporary synchronous analysis endpoint using real ML analysis
@@ -74,20 +120,27 @@ def analyze_document_temp():
             logger.error("Missing document_id in request")
             return jsonify(error='document_id is required'), 400
         
-        logger.info(f"Starting real ML analysis for document: {document_id}")
-        
-        # Import real ML task (synchronous version)
-        from ml_analysis_sync import analyze_document_ml_sync
+        logger.info(f"Submitting ML analysis for document: {document_id}")
         
-        # Run real ML task directly
+        # Run the ML task on the inference queue with a bounded wait, or the
+        # fast extractive task when admission control downgraded the request
+        downgraded = request.admission.downgrade
+        task_name = FAST_ANALYSIS_TASK if downgraded else 'tasks.analyze_document_ml_task'
         try:
-            result = analyze_document_ml_sync(document_id)
+            result, task_id = submit_analysis_with_budget(task_name, document_id)
             
-            if result and 'error' not in result:
+            if result is None:
+                return jsonify(document_id=document_id, task_id=task_id, status='processing',
+                               **scheduler.eta(task_id)), 202
+            if 'error' not in result:
                 logger.info(f"Real ML analysis completed for document: {document_id}")
-                return jsonify(document_id=document_id, analysis=result['analysis'], status='completed'), 200
+                analysis = load_analysis_for_reference(result)
+                if analysis is None:
+                    return jsonify(error='Analysis not found in database'), 500
+                return jsonify(document_id=document_id, analysis=analysis, status='completed',
+                               downgraded=downgraded), 200
             else:
-                error_msg = result.get('error', 'Unknown analysis error') if result else 'Analysis failed'
+                error_msg = result.get('error', 'Unknown analysis error')
                 logger.error(f"Real ML analysis failed: {error_msg}")
                 return jsonify(error=error_msg), 500
         except Exception as task_error:
@@ -132,7 +185,9 @@ def export_analysis_temp(document_id):
         logger.info(f"Clauses count: {len(analysis_results.get('clauses', []))}")
         logger.info(f"Risks count: {len(analysis_results.get('risks', []))}")
         
-        # Generate PDF
+        # Generate PDF (reportlab is only loaded by workers that export)
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
         buffer = io.BytesIO()
         
         # Create PDF canvas
@@ -186,6 +241,7 @@ def export_analysis_temp(document_id):
             y_pos -= 20
             
             clauses = analysis_results['clauses']
+            document_text = (supabase_db.get_document(document_id) or {}).get('content') or ''
             for clause in clauses[:10]:  # Limit to 10 clauses
                 if y_pos < 72:
                     p.showPage()
@@ -193,7 +249,7 @@ def export_analysis_temp(document_id):
                 
                 clause_type = clause.get('type', 'Unknown')
                 heading = clause.get('heading', 'No heading')
-                content = clause.get('content', '')
+                content = clause_preview(document_text, clause, 240)
                 
                 p.setFont("Helvetica-Bold", 12)
                 p.drawString(72, y_pos, f"{clause_type.replace('_', ' ').title()}: {heading}")
@@ -201,7 +257,7 @@ def export_analysis_temp(document_id):
                 
                 p.setFont("Helvetica", 10)
                 # Wrap content
-                content_lines = content.split('\n')
+                content_lines = [content[i:i + 80] for i in range(0, len(content), 80)]
                 for content_line in content_lines[:3]:  # Limit content per clause
                     if y_pos < 72:
                         p.showPage()
@@ -243,21 +299,32 @@ def export_analysis_temp(document_id):
 
 def task_status_temp(task_id):
     """
-    Temporary task status endpoint (for compatibility)
+    Status of an analysis submitted by the synchronous endpoints that
+    outlived its wait budget
     """
     if not task_id:
         return jsonify(error='task_id is required'), 400
     
-    logger.info(f"Checking temporary task status for: {task_id}")
+    logger.info(f"Checking task status for: {task_id}")
     
     try:
-        # For synchronous analysis, tasks are either completed or don't exist
-        return jsonify({
-            'state': 'SUCCESS',
-            'status': 'Analysis completed',
-            'task_id': task_id,
-            'message': 'Synchronous analysis completed'
-        })
+        from celery_app import celery_app
+        task = celery_app.AsyncResult(task_id)
+        if task.state == 'SUCCESS':
+            result = task.result or {}
+            if 'error' in result:
+                return jsonify({'state': 'FAILURE', 'task_id': task_id, 'error': result['error']})
+            analysis = load_analysis_for_reference(result)
+            return jsonify({
+                'state': 'SUCCESS',
+                'status': 'Analysis completed',
+                'task_id': task_id,
+                'result': dict(result, analysis=analysis)
+            })
+        if task.state == 'FAILURE':
+            return jsonify({'state': task.state, 'task_id': task_id, 'error': str(task.info)})
+        status = task.info.get('status', '') if isinstance(task.info, dict) else 'Pending...'
+        return jsonify({'state': task.state, 'status': status, 'task_id': task_id, **scheduler.eta(task_id)})
         
     except Exception as e:
         logger.error(f"Error checking temporary task status: {str(e)}", exc_info=True)
@@ -283,20 +350,32 @@ def analyze_document_multilingual_temp():
             logger.error("Missing document_id in request")
             return jsonify(error='document_id is required'), 400
         
-        logger.info(f"Starting multilingual ML analysis for document: {document_id}")
+        logger.info(f"Submitting multilingual ML analysis for document: {document_id}")
         
-        # Import multilingual ML task
-        from multilingual_analysis import analyze_document_multilingual_sync
-        
-        # Run multilingual ML task directly
+        # Run the multilingual ML task on the inference queue with a bounded
+        # wait, or the fast extractive task when admission control downgraded
+        downgraded = request.admission.downgrade
+        task_name = FAST_ANALYSIS_TASK if downgraded else 'tasks.analyze_document_multilingual_task'
         try:
-            result = analyze_document_multilingual_sync(document_id)
+            result, task_id = submit_analysis_with_budget(task_name, document_id)
             
-            if result and 'error' not in result:
+            if result is None:
+                return jsonify(document_id=document_id, task_id=task_id, status='processing',
+                               **scheduler.eta(task_id)), 202
+            if 'error' not in result:
                 logger.info(f"Multilingual ML analysis completed for document: {document_id}")
-                return jsonify(result), 200
+                analysis = load_analysis_for_reference(result)
+                if analysis is None:
+                    return jsonify(error='Analysis not found in database'), 500
+                return jsonify({
+                    'document_id': document_id,
+                    'analysis_id': result.get('analysis_id'),
+                    'analysis': analysis,
+                    'language_info': result.get('language_info', {}),
+                    'downgraded': downgraded
+                }), 200
             else:
-                error_msg = result.get('error', 'Unknown analysis error') if result else 'Analysis failed'
+                error_msg = result.get('error', 'Unknown analysis error')
                 logger.error(f"Multilingual ML analysis failed: {error_msg}")
                 return jsonify(error=error_msg), 500
         except Exception as task_error:
@@ -11,8 +11,166 @@ class Config:
     SUPABASE_URL = os.getenv('SUPABASE_URL', '')
     SUPABASE_KEY = os.getenv('SUPABASE_KEY', '')
 
+    # Comma-separated emails of users allowed to use /api/admin endpoints
+    ADMIN_EMAILS = os.getenv('ADMIN_EMAILS', '')
+    # Bearer token Prometheus scrapes /api/metrics with (admins can always read it)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
     # Redis Configuration (for Celery)
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    # Optional compression for Celery task results ('gzip', 'zlib', 'bzip2').
+    # Task results are small references by default; this only matters for
+    # tasks that still return large payloads.
+    CELERY_RESULT_COMPRESSION = os.getenv('CELERY_RESULT_COMPRESSION') or None
+    # Queue consumed by the model-holding workers; web workers only enqueue
+    INFERENCE_QUEUE = os.getenv('INFERENCE_QUEUE', 'inference')
+    # How long the synchronous analysis endpoints wait for the inference
+    # worker before answering 202 with a task id
+    SYNC_ANALYSIS_WAIT_SECONDS = float(os.getenv('SYNC_ANALYSIS_WAIT_SECONDS', '25'))
+
+    # Admission control for analysis endpoints (token rates are per second)
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'True').lower() == 'true'
+    ADMISSION_USER_RATE = float(os.getenv('ADMISSION_USER_RATE', '0.2'))
+    ADMISSION_USER_BURST = int(os.getenv('ADMISSION_USER_BURST', '5'))
+    ADMISSION_GLOBAL_RATE = float(os.getenv('ADMISSION_GLOBAL_RATE', '2'))
+    ADMISSION_GLOBAL_BURST = int(os.getenv('ADMISSION_GLOBAL_BURST', '20'))
+    # Inference queue depth at which requests are downgraded / rejected
+    ADMISSION_QUEUE_SOFT_LIMIT = int(os.getenv('ADMISSION_QUEUE_SOFT_LIMIT', '20'))
+    ADMISSION_QUEUE_HARD_LIMIT = int(os.getenv('ADMISSION_QUEUE_HARD_LIMIT', '100'))
+    # 'downgrade' to the fast extractive pipeline or 'reject' with 429
+    ADMISSION_OVERLOAD_POLICY = os.getenv('ADMISSION_OVERLOAD_POLICY', 'downgrade')
+
+    # Shortest-expected-job-first dispatch of inference tasks
+    # score = enqueue time + SCHED_AGING_FACTOR * predicted seconds
+    SCHED_AGING_FACTOR = float(os.getenv('SCHED_AGING_FACTOR', '3'))
+    # Tasks kept in each Celery inference queue; the rest wait in the dispatcher
+    SCHED_DISPATCH_DEPTH = int(os.getenv('SCHED_DISPATCH_DEPTH', '2'))
+    # Concurrent inference slots across workers, used for ETA estimates
+    SCHED_WORKER_SLOTS = int(os.getenv('SCHED_WORKER_SLOTS', '2'))
+    # Optional dedicated queue for jobs predicted to take longer than the threshold
+    SCHED_LONG_QUEUE = os.getenv('SCHED_LONG_QUEUE', '')
+    SCHED_LONG_JOB_SECONDS = float(os.getenv('SCHED_LONG_JOB_SECONDS', '60'))
+
+    # Resumable analysis: stage checkpoints and late acknowledgement
+    CHECKPOINT_TTL_SECONDS = int(os.getenv('CHECKPOINT_TTL_SECONDS', str(24 * 3600)))
+    # Deliveries of one analysis before a document that keeps killing workers is failed
+    CHECKPOINT_MAX_ATTEMPTS = int(os.getenv('CHECKPOINT_MAX_ATTEMPTS', '3'))
+    # Must exceed the longest analysis, or Redis redelivers tasks still running
+    CELERY_VISIBILITY_TIMEOUT = int(os.getenv('CELERY_VISIBILITY_TIMEOUT', '7200'))
+    # Number of 1024-token chunks summarized per document (1 = head only)
+    SUMMARY_MAX_CHUNKS = int(os.getenv('SUMMARY_MAX_CHUNKS', '1'))
+    # Text between reused summary chunks shorter than this joins a neighbouring chunk
+    SUMMARY_MIN_CHUNK_TOKENS = int(os.getenv('SUMMARY_MIN_CHUNK_TOKENS', '128'))
+    # Summary cache: Redis tier plus optional disk tier (empty dir = off)
+    SUMMARY_CACHE_ENABLED = os.getenv('SUMMARY_CACHE_ENABLED', 'True').lower() == 'true'
+    SUMMARY_CACHE_TTL_SECONDS = int(os.getenv('SUMMARY_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', '10000'))
+    SUMMARY_CACHE_DIR = os.getenv('SUMMARY_CACHE_DIR', '')
+    SUMMARY_CACHE_DISK_MAX_MB = int(os.getenv('SUMMARY_CACHE_DISK_MAX_MB', '512'))
+    # Per-clause model outputs (clause spans, risk probabilities) keyed by the
+    # normalized clause text: in-process LRU in front of Redis
+    CLAUSE_CACHE_ENABLED = os.getenv('CLAUSE_CACHE_ENABLED', 'True').lower() == 'true'
+    CLAUSE_CACHE_MEMORY_ENTRIES = int(os.getenv('CLAUSE_CACHE_MEMORY_ENTRIES', '5000'))
+    CLAUSE_CACHE_MAX_ENTRIES = int(os.getenv('CLAUSE_CACHE_MAX_ENTRIES', '200000'))
+    CLAUSE_CACHE_TTL_SECONDS = int(os.getenv('CLAUSE_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
+    # Long documents: 'salience' packs the most salient sentences into the
+    # model window, 'head' keeps plain head truncation
+    SUMMARY_INPUT_MODE = os.getenv('SUMMARY_INPUT_MODE', 'salience')
+    SUMMARY_HEADING_WEIGHT = float(os.getenv('SUMMARY_HEADING_WEIGHT', '0.5'))
+    # Cached token ids + offsets per (model, content hash)
+    TOKEN_CACHE_TTL_SECONDS = int(os.getenv('TOKEN_CACHE_TTL_SECONDS', str(24 * 3600)))
+
+    # Shared inference server (one model copy per node, dynamic batching).
+    # Empty URL = load models in-process, as before.
+    INFERENCE_SERVER_URL = os.getenv('INFERENCE_SERVER_URL', '')
+    INFERENCE_SERVER_HOST = os.getenv('INFERENCE_SERVER_HOST', '127.0.0.1')
+    INFERENCE_SERVER_PORT = int(os.getenv('INFERENCE_SERVER_PORT', '8765'))
+    INFERENCE_MAX_BATCH_SIZE = int(os.getenv('INFERENCE_MAX_BATCH_SIZE', '8'))
+    INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', '25'))
+    INFERENCE_TIMEOUT_SECONDS = float(os.getenv('INFERENCE_TIMEOUT_SECONDS', '300'))
+    # How long a web request relays a summary stream from its inference
+    # worker (capped a few seconds below GUNICORN_TIMEOUT)
+    SUMMARY_STREAM_TIMEOUT_SECONDS = int(os.getenv('SUMMARY_STREAM_TIMEOUT_SECONDS', '90'))
+    INFERENCE_LOCAL_FALLBACK = os.getenv('INFERENCE_LOCAL_FALLBACK', 'True').lower() == 'true'
+
+    # Process/thread topology per role (topology.py); 0 = derive from the
+    # usable cores (CPU affinity capped by the cgroup quota)
+    TOPOLOGY_ENABLED = os.getenv('TOPOLOGY_ENABLED', 'True').lower() == 'true'
+    TOPOLOGY_WEB_WORKERS = int(os.getenv('TOPOLOGY_WEB_WORKERS', '0'))
+    TOPOLOGY_FAST_CONCURRENCY = int(os.getenv('TOPOLOGY_FAST_CONCURRENCY', '0'))
+    TOPOLOGY_INFERENCE_CONCURRENCY = int(os.getenv('TOPOLOGY_INFERENCE_CONCURRENCY', '0'))
+    TOPOLOGY_INFERENCE_THREADS = int(os.getenv('TOPOLOGY_INFERENCE_THREADS', '0'))
+    TOPOLOGY_INTEROP_THREADS = int(os.getenv('TOPOLOGY_INTEROP_THREADS', '1'))
+    TOPOLOGY_PIN_CPUS = os.getenv('TOPOLOGY_PIN_CPUS', 'False').lower() == 'true'
+
+    # Summarizer runtime: pytorch (fp32), pytorch-int8 or onnx
+    SUMMARIZER_BACKEND = os.getenv('SUMMARIZER_BACKEND', 'pytorch')
+    # Clause stage: 'regex' (CLAUSE_PATTERNS) or 'model' (the fine-tuned
+    # token classifier in CLAUSE_MODEL_DIR, run in overlapping windows)
+    CLAUSE_STAGE = os.getenv('CLAUSE_STAGE', 'regex')
+    CLAUSE_MODEL_DIR = os.getenv('CLAUSE_MODEL_DIR', os.path.normpath(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'models', 'clause_extraction_model')))
+    CLAUSE_MODEL_BACKEND = os.getenv('CLAUSE_MODEL_BACKEND', 'pytorch')  # pytorch or pytorch-int8
+    CLAUSE_MODEL_WINDOW = int(os.getenv('CLAUSE_MODEL_WINDOW', '512'))
+    CLAUSE_MODEL_OVERLAP = int(os.getenv('CLAUSE_MODEL_OVERLAP', '128'))
+    CLAUSE_MODEL_BATCH_SIZE = int(os.getenv('CLAUSE_MODEL_BATCH_SIZE', '8'))
+    CLAUSE_MODEL_THRESHOLD = float(os.getenv('CLAUSE_MODEL_THRESHOLD', '0.5'))
+    CLAUSE_MODEL_MIN_TOKENS = int(os.getenv('CLAUSE_MODEL_MIN_TOKENS', '8'))
+    # Risk stage: 'keywords' (risk flags only) or 'model' (the fine-tuned
+    # risk classifier in RISK_MODEL_DIR scores every clause)
+    RISK_STAGE = os.getenv('RISK_STAGE', 'keywords')
+    RISK_MODEL_DIR = os.getenv('RISK_MODEL_DIR', os.path.normpath(os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'models', 'risk_classification_model')))
+    RISK_MODEL_BACKEND = os.getenv('RISK_MODEL_BACKEND', 'pytorch')  # pytorch or pytorch-int8
+    RISK_MODEL_BATCH_SIZE = int(os.getenv('RISK_MODEL_BATCH_SIZE', '32'))
+    RISK_MODEL_MAX_TOKENS = int(os.getenv('RISK_MODEL_MAX_TOKENS', '512'))
+    # Document risk score cut-offs for the medium and high levels
+    RISK_MEDIUM_THRESHOLD = float(os.getenv('RISK_MEDIUM_THRESHOLD', '0.3'))
+    RISK_HIGH_THRESHOLD = float(os.getenv('RISK_HIGH_THRESHOLD', '0.6'))
+    # Template library: documents matching a registered template on at
+    # least TEMPLATE_MIN_COVERAGE of their text only analyze the deviations
+    TEMPLATES_ENABLED = os.getenv('TEMPLATES_ENABLED', 'True').lower() == 'true'
+    TEMPLATE_MIN_COVERAGE = float(os.getenv('TEMPLATE_MIN_COVERAGE', '0.6'))
+    TEMPLATE_INDEX_TTL_SECONDS = int(os.getenv('TEMPLATE_INDEX_TTL_SECONDS', '300'))
+    # Near-duplicate detection: MinHash signatures of word shingles, indexed
+    # per user in Redis with LSH (MINHASH_BANDS bands of the signature)
+    NEAR_DUPLICATES_ENABLED = os.getenv('NEAR_DUPLICATES_ENABLED', 'True').lower() == 'true'
+    MINHASH_NUM_PERM = int(os.getenv('MINHASH_NUM_PERM', '128'))
+    MINHASH_BANDS = int(os.getenv('MINHASH_BANDS', '16'))
+    MINHASH_SHINGLE_SIZE = int(os.getenv('MINHASH_SHINGLE_SIZE', '5'))
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8'))
+    # Analysis router: analyze-document picks fast / bart / multilingual from
+    # the features computed at ingest unless the request names a pipeline
+    ROUTER_ENABLED = os.getenv('ROUTER_ENABLED', 'True').lower() == 'true'
+    ROUTER_FAST_MAX_TOKENS = int(os.getenv('ROUTER_FAST_MAX_TOKENS', '800'))
+    ROUTER_SIMPLE_MAX_SECTIONS = int(os.getenv('ROUTER_SIMPLE_MAX_SECTIONS', '1'))
+    ROUTER_SIMPLE_MAX_TOKENS = int(os.getenv('ROUTER_SIMPLE_MAX_TOKENS', '2500'))
+    ROUTER_INDIC_MIN_RATIO = float(os.getenv('ROUTER_INDIC_MIN_RATIO', '0.2'))
+    ROUTER_MAX_CHUNKS = int(os.getenv('ROUTER_MAX_CHUNKS', '4'))
+    ROUTER_LOG_MAX_ENTRIES = int(os.getenv('ROUTER_LOG_MAX_ENTRIES', '10000'))
+    # Gunicorn kills a web worker that holds a request longer than this
+    GUNICORN_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+    # Deadline-bounded analyze-document requests (deadline_ms): the web
+    # worker answers DEADLINE_RESERVE_MS early with a partial analysis if
+    # needed. DEADLINE_MAX_MS must stay within a quarter of GUNICORN_TIMEOUT,
+    # and at most DEADLINE_MAX_WAITERS requests (0 = half the web workers)
+    # wait at once. The task expects DEADLINE_SECONDS_PER_CHUNK per BART
+    # chunk, DEADLINE_CLAUSE_SECONDS_PER_CHUNK per 1024 tokens of clause
+    # model and DEADLINE_RISK_SECONDS_PER_CLAUSE of risk classifier
+    DEADLINE_MIN_MS = int(os.getenv('DEADLINE_MIN_MS', '1000'))
+    DEADLINE_MAX_MS = int(os.getenv('DEADLINE_MAX_MS', '15000'))
+    DEADLINE_MAX_WAITERS = int(os.getenv('DEADLINE_MAX_WAITERS', '0'))
+    DEADLINE_RESERVE_MS = int(os.getenv('DEADLINE_RESERVE_MS', '800'))
+    DEADLINE_POLL_MS = int(os.getenv('DEADLINE_POLL_MS', '100'))
+    DEADLINE_SECONDS_PER_CHUNK = float(os.getenv('DEADLINE_SECONDS_PER_CHUNK', '4'))
+    DEADLINE_CLAUSE_SECONDS_PER_CHUNK = float(os.getenv('DEADLINE_CLAUSE_SECONDS_PER_CHUNK', '0.5'))
+    DEADLINE_RISK_SECONDS_PER_CLAUSE = float(os.getenv('DEADLINE_RISK_SECONDS_PER_CLAUSE', '0.02'))
+    # Versioned local model artifacts (scripts/snapshot_models.py)
+    MODEL_STORE_DIR = os.getenv('MODEL_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_store'))
+    MODEL_STORE_VERSION = os.getenv('MODEL_STORE_VERSION', '')  # empty = MODEL_STORE_DIR/CURRENT
+    MODEL_STORE_REQUIRED = os.getenv('MODEL_STORE_REQUIRED', 'False').lower() == 'true'
+    MODEL_STORE_MODELS = os.getenv('MODEL_STORE_MODELS', 'facebook/bart-large-cnn')
+    ONNX_MODEL_DIR = os.getenv('ONNX_MODEL_DIR', os.path.join(MODEL_STORE_DIR, 'onnx'))
 
     # File Upload Configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
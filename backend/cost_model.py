@@ -0,0 +1,144 @@
+"""
+Job cost estimator for analysis scheduling.
+
+Fits a small ridge regression of log(processing_time) on document features
+(text length, document type, language, pipeline) using the historical
+``analysis_results`` rows, and predicts how long a new analysis will take.
+The fitted coefficients are kept in Redis so every web worker and the
+dispatcher share one model; until a model has been fitted, per-pipeline
+defaults are used.
+"""
+
+import json
+import math
+import time
+import logging
+
+from redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+COEFFICIENTS_KEY = "cost_model:coefficients"
+
+DOCUMENT_TYPES = ('pdf', 'docx', 'txt')
+LANGUAGES = ('english', 'hindi', 'marathi')
+PIPELINES = ('bart', 'multilingual', 'fast')
+
+# Used until enough history exists: (base seconds, seconds per 1k chars)
+DEFAULT_COSTS = {
+    'bart': (8.0, 0.05),
+    'multilingual': (5.0, 0.05),
+    'fast': (0.3, 0.01),
+}
+
+MIN_TRAINING_ROWS = 20
+RIDGE_ALPHA = 1.0
+
+_cached_model = None
+_cached_at = 0.0
+_CACHE_SECONDS = 60
+
+
+def feature_names():
+    """Names of the columns produced by ``featurize``."""
+    return (['bias', 'log_length', 'log_length_sq']
+            + [f'type_{t}' for t in DOCUMENT_TYPES]
+            + [f'lang_{l}' for l in LANGUAGES]
+            + [f'pipeline_{p}' for p in PIPELINES])
+
+
+def featurize(text_length, document_type, language, pipeline):
+    """Turn one job description into a numeric feature vector."""
+    log_length = math.log1p(max(0, text_length or 0))
+    row = [1.0, log_length, log_length * log_length]
+    row += [1.0 if document_type == t else 0.0 for t in DOCUMENT_TYPES]
+    row += [1.0 if language == l else 0.0 for l in LANGUAGES]
+    row += [1.0 if pipeline == p else 0.0 for p in PIPELINES]
+    return row
+
+
+def pipeline_from_model_versions(model_versions):
+    """Recover which pipeline produced a stored analysis."""
+    model_versions = model_versions or {}
+    if model_versions.get('pipeline'):
+        return model_versions['pipeline']
+    if model_versions.get('analysis_type') == 'fast_multilingual':
+        return 'fast'
+    if 'language' in model_versions:
+        return 'multilingual'
+    return 'bart'
+
+
+def fit(rows, alpha=RIDGE_ALPHA):
+    """
+    Fit the cost model.
+
+    Args:
+        rows: iterable of dicts with text_length, document_type, language,
+              pipeline and processing_time (seconds)
+        alpha: ridge penalty (the bias term is not penalised)
+
+    Returns:
+        dict: {'features', 'coefficients', 'n', 'rmse_log', 'fitted_at'} or
+              None when there is not enough history
+    """
+    import numpy as np
+
+    samples = [r for r in rows if (r.get('processing_time') or 0) > 0]
+    if len(samples) < MIN_TRAINING_ROWS:
+        logger.info(f"Cost model: only {len(samples)} usable rows, keeping defaults")
+        return None
+
+    X = np.array([featurize(r.get('text_length'), r.get('document_type'),
+                            r.get('language'), r.get('pipeline')) for r in samples])
+    y = np.log(np.array([r['processing_time'] for r in samples]))
+
+    penalty = alpha * np.eye(X.shape[1])
+    penalty[0, 0] = 0.0
+    coefficients = np.linalg.solve(X.T @ X + penalty, X.T @ y)
+    rmse = float(np.sqrt(np.mean((X @ coefficients - y) ** 2)))
+
+    return {
+        'features': feature_names(),
+        'coefficients': [float(c) for c in coefficients],
+        'n': len(samples),
+        'rmse_log': round(rmse, 4),
+        'fitted_at': time.time(),
+    }
+
+
+def predict(model, text_length, document_type=None, language=None, pipeline='bart'):
+    """Predicted processing time in seconds for one job."""
+    if model and model.get('features') == feature_names():
+        row = featurize(text_length, document_type, language, pipeline)
+        log_seconds = sum(c * x for c, x in zip(model['coefficients'], row))
+        return round(math.exp(min(log_seconds, 10.0)), 2)
+    base, per_k = DEFAULT_COSTS.get(pipeline, DEFAULT_COSTS['bart'])
+    return round(base + per_k * (text_length or 0) / 1000.0, 2)
+
+
+def save_model(model):
+    """Publish fitted coefficients for every process to use."""
+    global _cached_model, _cached_at
+    get_redis().set(COEFFICIENTS_KEY, json.dumps(model))
+    _cached_model, _cached_at = model, time.time()
+
+
+def load_model():
+    """Return the shared fitted model (cached in-process for a minute), or None."""
+    global _cached_model, _cached_at
+    if _cached_model is not None and time.time() - _cached_at < _CACHE_SECONDS:
+        return _cached_model
+    try:
+        raw = get_redis().get(COEFFICIENTS_KEY)
+        _cached_model = json.loads(raw) if raw else None
+    except Exception as e:
+        logger.warning(f"Could not load cost model, using defaults: {str(e)}")
+        _cached_model = None
+    _cached_at = time.time()
+    return _cached_model
+
+
+def estimate_seconds(text_length, document_type=None, language=None, pipeline='bart'):
+    """Predict a job's duration with the shared model (or defaults)."""
+    return predict(load_model(), text_length, document_type, language, pipeline)
@@ -0,0 +1,152 @@
+"""
+Deadline-bounded analysis requests.
+
+``POST /api/analyze-document`` with ``deadline_ms`` answers within that
+budget whatever the document size:
+
+    1. The analysis task gets the absolute deadline. It runs its stages in
+       order of cost (utils.deadline.STAGES) and, when the abstractive
+       summary will not fit, downgrades the model stages that are over
+       budget (clause model -> clause patterns, risk classifier -> keyword
+       flags), stores a partial analysis with an extractive summary and
+       keeps refining: the complete analysis is stored when it finishes
+       (see tasks.analyze_document_task).
+    2. The web worker waits until DEADLINE_RESERVE_MS before the deadline
+       for the complete analysis or the partial one. Waiting holds a sync
+       gunicorn worker, so DEADLINE_MAX_MS is kept well inside
+       GUNICORN_TIMEOUT (check_limits) and only DEADLINE_MAX_WAITERS
+       requests wait at once (waiter_slot); the others answer at once.
+    3. If neither is ready (e.g. the task is still queued), it answers with
+       a preview computed in-process from the cheap stages only: structure,
+       keyword risk flags and an extractive summary.
+
+Partial answers carry ``partial: true`` and the task id to poll for the
+refined analysis. Every answer is counted in ``deadline_responses_total``
+by budget level and outcome (complete, partial, preview), and the share of
+stages completed in ``deadline_stage_completion``.
+"""
+
+import os
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+
+import metrics
+import topology
+from config import config
+from keywords import risk_flags, scan as scan_keywords
+from utils.deadline import STAGES, budget_level
+from utils.structure import extract_structure
+from redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+COMPLETION_BUCKETS = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+# Largest share of GUNICORN_TIMEOUT a deadline may take
+MAX_TIMEOUT_SHARE = 0.25
+
+# Zset of waiting requests scored by the time they stop waiting
+WAITERS_KEY = 'deadline:waiters'
+
+
+def check_limits(cfg):
+    """Refuse deadline settings under which a waiting request outlives its gunicorn worker."""
+    limit_ms = int(cfg.GUNICORN_TIMEOUT * 1000 * MAX_TIMEOUT_SHARE)
+    if cfg.DEADLINE_MAX_MS > limit_ms:
+        raise ValueError(f"DEADLINE_MAX_MS ({cfg.DEADLINE_MAX_MS}) must be at most {limit_ms} "
+                         f"({MAX_TIMEOUT_SHARE:.0%} of GUNICORN_TIMEOUT={cfg.GUNICORN_TIMEOUT}s)")
+    if not 0 < cfg.DEADLINE_MIN_MS <= cfg.DEADLINE_MAX_MS:
+        raise ValueError(f"DEADLINE_MIN_MS ({cfg.DEADLINE_MIN_MS}) must be between 1 and DEADLINE_MAX_MS")
+
+
+def max_waiters(cfg):
+    """DEADLINE_MAX_WAITERS, or half the web workers when it is 0."""
+    return cfg.DEADLINE_MAX_WAITERS or max(1, topology.plan(topology.WEB, cfg=cfg).processes // 2)
+
+
+@contextmanager
+def waiter_slot(deadline_at):
+    """
+    Claim one of the max_waiters slots shared by all web workers.
+
+    Yields:
+        bool: Whether this request may wait for the task. Slots of workers
+              that died while waiting lapse at their deadline.
+    """
+    cfg = config[env]
+    r = get_redis()
+    token = str(uuid.uuid4())
+    pipe = r.pipeline()
+    pipe.zremrangebyscore(WAITERS_KEY, '-inf', time.time())
+    pipe.zadd(WAITERS_KEY, {token: deadline_at})
+    pipe.zcard(WAITERS_KEY)
+    pipe.expire(WAITERS_KEY, max(1, int(cfg.DEADLINE_MAX_MS / 1000) + 1))
+    waiting = pipe.execute()[2]
+    try:
+        yield waiting <= max_waiters(cfg)
+    finally:
+        r.zrem(WAITERS_KEY, token)
+
+
+def wait_for_analysis(task, deadline_at, load_analysis):
+    """
+    Poll a task until it has a complete or partial analysis, or until
+    DEADLINE_RESERVE_MS before the deadline.
+
+    Args:
+        task: AsyncResult of the analysis task
+        deadline_at: Epoch seconds
+        load_analysis: Callable(analysis_id) -> analysis_results row
+
+    Returns:
+        tuple: ('complete' | 'partial', analysis row) or (None, None)
+    """
+    cfg = config[env]
+    wait_until = deadline_at - cfg.DEADLINE_RESERVE_MS / 1000
+    while True:
+        state, info = task.state, task.info
+        if state == 'SUCCESS' and isinstance(info, dict) and info.get('analysis_id'):
+            return 'complete', load_analysis(info['analysis_id'])
+        if state == 'PROGRESS' and isinstance(info, dict) and info.get('partial_analysis_id'):
+            return 'partial', load_analysis(info['partial_analysis_id'])
+        if state in ('FAILURE', 'REVOKED') or time.time() >= wait_until:
+            return None, None
+        time.sleep(min(cfg.DEADLINE_POLL_MS / 1000, max(0.0, wait_until - time.time())))
+
+
+def preview(text):
+    """Partial analysis from the cheap stages only, computed in the web worker."""
+    from utils.extractive_summary import extractive_summary
+
+    sections = extract_structure(text)
+    completed = ['structure', 'extractive_summary']
+    downgraded = []
+    if config[env].RISK_STAGE == 'model':
+        downgraded.append('risks')
+    else:
+        completed.append('risks')
+    return {
+        'summary': extractive_summary(text, max_sentences=5),
+        'summary_type': 'extractive',
+        'clauses': [],
+        'risks': risk_flags(text, scan_keywords(text)),
+        'section_count': len(sections),
+        'sections': sections,
+        'partial': True,
+        'completed_stages': [stage for stage in STAGES if stage in completed],
+        'downgraded_stages': downgraded,
+        'pending_stages': [stage for stage in STAGES if stage not in completed],
+    }
+
+
+def record_response(deadline_ms, outcome, analysis):
+    """Count a deadline answer and the share of stages it completed."""
+    level = budget_level(deadline_ms)
+    completed = len(analysis.get('completed_stages') or STAGES) if outcome != 'pending' else 0
+    metrics.inc('deadline_responses_total', budget=level, outcome=outcome)
+    metrics.observe('deadline_stage_completion', completed / len(STAGES), buckets=COMPLETION_BUCKETS, budget=level)
+    logger.info(f"Deadline {deadline_ms}ms answered {outcome} with {completed}/{len(STAGES)} stages")
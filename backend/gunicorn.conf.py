@@ -0,0 +1,21 @@
+# Gunicorn settings for the web tier (gunicorn -c gunicorn.conf.py app:app).
+# Worker count and per-worker thread pools come from topology.py.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import topology
+from config import config
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = topology.plan(topology.WEB).processes
+# 120s timeout for ML-heavy requests (deadlines.check_limits keeps
+# deadline-bounded requests well inside it)
+timeout = config[os.getenv('FLASK_ENV', 'development')].GUNICORN_TIMEOUT
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    topology.apply(topology.WEB, index=worker.age % workers)
@@ -0,0 +1,270 @@
+"""
+Single entry point for summarization model calls.
+
+Analysis code (``tasks.py``, ``ml_analysis_sync.py``,
+``multilingual_analysis.py``) calls ``generate`` with token ids from
+``tokenization`` (or ``summarize`` with plain text) instead of building its
+own ``transformers`` pipeline. When ``INFERENCE_SERVER_URL`` is set,
+requests go to the shared inference server (``inference_server.py``), which
+holds one copy of each model per node and batches concurrent requests
+together. Otherwise - or when the server is unreachable and
+``INFERENCE_LOCAL_FALLBACK`` is on - models are loaded in-process and
+cached for the life of the process. Both paths consult the summary cache
+(``summary_cache``) first and only run the model on misses.
+"""
+
+import os
+import json
+import time
+import logging
+import itertools
+import threading
+import urllib.request
+import urllib.error
+
+import summary_cache
+from config import config
+from summarizer_backends import build_summarizer
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+DEFAULT_SUMMARIZER = "facebook/bart-large-cnn"
+
+# In-process pipelines, keyed by model name
+_local_models = {}
+_local_models_lock = threading.Lock()
+
+
+class InferenceError(Exception):
+    """Raised when the inference server rejects or fails a request."""
+
+
+def load_summarizer(model_name=DEFAULT_SUMMARIZER):
+    """Get or create the in-process summarization pipeline for a model."""
+    with _local_models_lock:
+        if model_name not in _local_models:
+            backend = config[env].SUMMARIZER_BACKEND
+            logger.info(f"Loading model: {model_name} ({backend})")
+            _local_models[model_name] = build_summarizer(model_name, backend)
+            logger.info(f"Model {model_name} loaded successfully")
+        return _local_models[model_name]
+
+
+def loaded_models():
+    """Names of the models loaded in this process."""
+    return list(_local_models)
+
+
+def run_local(texts, model=DEFAULT_SUMMARIZER, **params):
+    """Summarize a batch of texts with the in-process pipeline."""
+    summarizer = load_summarizer(model)
+    outputs = summarizer(list(texts), batch_size=len(texts), **params)
+    return [output['summary_text'] for output in outputs]
+
+
+def _post(path, payload):
+    cfg = config[env]
+    request = urllib.request.Request(
+        cfg.INFERENCE_SERVER_URL.rstrip('/') + path,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=cfg.INFERENCE_TIMEOUT_SECONDS) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        detail = e.read().decode('utf-8', 'replace')
+        raise InferenceError(f"Inference server returned {e.code}: {detail}") from e
+
+
+def generate_local(input_ids_batch, model=DEFAULT_SUMMARIZER, **params):
+    """
+    Summarize already-tokenized inputs with the in-process model, calling
+    ``model.generate`` directly so the ids are never decoded and re-encoded.
+    """
+    import torch
+
+    summarizer = load_summarizer(model)
+    tokenizer = summarizer.tokenizer
+    encoded = tokenizer.pad({'input_ids': [list(ids) for ids in input_ids_batch]}, return_tensors='pt')
+    with torch.no_grad():
+        output = summarizer.model.generate(input_ids=encoded['input_ids'],
+                                           attention_mask=encoded['attention_mask'], **params)
+    return tokenizer.batch_decode(output, skip_special_tokens=True)
+
+
+def _dispatch(path, payload, local, inputs, model, params):
+    """Send a request to the inference server, or run it in-process."""
+    cfg = config[env]
+    if cfg.INFERENCE_SERVER_URL:
+        try:
+            return _post(path, {**payload, 'model': model, 'params': params})['summaries']
+        except urllib.error.URLError as e:
+            if not cfg.INFERENCE_LOCAL_FALLBACK:
+                raise InferenceError(f"Inference server unreachable: {str(e)}") from e
+            logger.warning(f"Inference server unreachable ({str(e)}), running {model} in-process")
+    return local(inputs, model=model, **params)
+
+
+def _cached(inputs, model, params, run):
+    """
+    Serve inputs from the summary cache and run ``run`` on the misses only.
+    Generation time is split evenly across a batch when storing entries.
+    """
+    summaries = [summary_cache.get(item, model, params) for item in inputs]
+    misses = [i for i, summary in enumerate(summaries) if summary is None]
+    if misses:
+        started = time.time()
+        generated = run([inputs[i] for i in misses])
+        seconds = (time.time() - started) / len(misses)
+        for i, summary in zip(misses, generated):
+            summary_cache.put(inputs[i], model, params, summary, seconds)
+            summaries[i] = summary
+    return summaries
+
+
+def summarize_batch(texts, model=DEFAULT_SUMMARIZER, **params):
+    """
+    Summarize several texts with the same generation parameters.
+
+    Args:
+        texts: List of input texts (already truncated to the model window)
+        model: Summarization model name
+        **params: Generation parameters (max_length, min_length, num_beams, ...)
+
+    Returns:
+        list: One summary string per input text
+    """
+    if not texts:
+        return []
+    return _cached(list(texts), model, params,
+                   lambda batch: _dispatch('/summarize', {'texts': batch}, run_local, batch, model, params))
+
+
+def summarize(text, model=DEFAULT_SUMMARIZER, **params):
+    """Summarize a single text. See ``summarize_batch``."""
+    return summarize_batch([text], model=model, **params)[0]
+
+
+def generate_batch(input_ids_batch, model=DEFAULT_SUMMARIZER, **params):
+    """
+    Summarize token-id inputs (see ``tokenization.TokenizedDocument``).
+
+    Args:
+        input_ids_batch: List of token id lists, special tokens included,
+            each within the model window
+        model: Summarization model name (must match the tokenizer)
+        **params: Generation parameters (max_length, min_length, num_beams, ...)
+
+    Returns:
+        list: One summary string per input
+    """
+    if not input_ids_batch:
+        return []
+    inputs = [[int(i) for i in ids] for ids in input_ids_batch]
+    return _cached(inputs, model, params,
+                   lambda batch: _dispatch('/generate', {'input_ids': batch}, generate_local, batch, model, params))
+
+
+def generate(input_ids, model=DEFAULT_SUMMARIZER, **params):
+    """Summarize a single token-id input. See ``generate_batch``."""
+    return generate_batch([input_ids], model=model, **params)[0]
+
+
+def stream_local(input_ids, model=DEFAULT_SUMMARIZER, **params):
+    """
+    Generate a summary in-process, yielding text pieces as tokens are
+    produced and finally ``{'summary': ...}`` decoded exactly like
+    ``generate_local``. Streaming requires greedy decoding (num_beams=1).
+    """
+    import torch
+    from transformers import TextIteratorStreamer
+
+    summarizer = load_summarizer(model)
+    tokenizer = summarizer.tokenizer
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    output = {}
+
+    def run():
+        try:
+            with torch.no_grad():
+                output['ids'] = summarizer.model.generate(input_ids=torch.tensor([list(input_ids)]),
+                                                          streamer=streamer, **params)
+        except Exception as e:
+            output['error'] = e
+            streamer.end()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    for text in streamer:
+        if text:
+            yield {'token': text}
+    thread.join()
+    if 'error' in output:
+        raise output['error']
+    yield {'summary': tokenizer.batch_decode(output['ids'], skip_special_tokens=True)[0]}
+
+
+def _stream_remote(input_ids, model, params):
+    cfg = config[env]
+    request = urllib.request.Request(
+        cfg.INFERENCE_SERVER_URL.rstrip('/') + '/generate/stream',
+        data=json.dumps({'model': model, 'input_ids': list(input_ids), 'params': params}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST',
+    )
+    try:
+        response = urllib.request.urlopen(request, timeout=cfg.INFERENCE_TIMEOUT_SECONDS)
+    except urllib.error.HTTPError as e:
+        detail = e.read().decode('utf-8', 'replace')
+        raise InferenceError(f"Inference server returned {e.code}: {detail}") from e
+    with response:
+        for line in response:
+            event = json.loads(line)
+            if 'error' in event:
+                raise InferenceError(event['error'])
+            yield event
+
+
+def stream_generate(input_ids, model=DEFAULT_SUMMARIZER, **params):
+    """
+    Stream a summary for a token-id input.
+
+    Yields ``{'token': text}`` events while generating and ends with
+    ``{'summary': text, 'cached': bool}``. Cached summaries are yielded
+    whole; freshly generated ones are stored in the summary cache.
+    """
+    input_ids = [int(i) for i in input_ids]
+    params = {**params, 'num_beams': 1}
+    cached = summary_cache.get(input_ids, model, params)
+    if cached is not None:
+        yield {'token': cached}
+        yield {'summary': cached, 'cached': True}
+        return
+
+    cfg = config[env]
+    started = time.time()
+    events = None
+    if cfg.INFERENCE_SERVER_URL:
+        events = _stream_remote(input_ids, model, params)
+        try:
+            first = next(events)
+        except urllib.error.URLError as e:
+            if not cfg.INFERENCE_LOCAL_FALLBACK:
+                raise InferenceError(f"Inference server unreachable: {str(e)}") from e
+            logger.warning(f"Inference server unreachable ({str(e)}), streaming {model} in-process")
+            events = None
+        else:
+            events = itertools.chain([first], events)
+    if events is None:
+        events = stream_local(input_ids, model=model, **params)
+
+    for event in events:
+        if 'summary' in event:
+            summary_cache.put(input_ids, model, params, event['summary'], time.time() - started)
+            yield {'summary': event['summary'], 'cached': False}
+        else:
+            yield event
@@ -0,0 +1,221 @@
+"""
+Shared local inference server for Legistra.
+
+Loads each summarization model once per node and serves it over localhost
+HTTP, so gunicorn workers and Celery children no longer hold their own
+copies of BART. Concurrent requests are coalesced into dynamic batches: the
+batcher waits up to ``INFERENCE_MAX_WAIT_MS`` after the first request for
+more to arrive, up to ``INFERENCE_MAX_BATCH_SIZE`` inputs, and runs one
+forward pass per group of requests that share a model and generation
+parameters.
+
+Run one per node and point the other processes at it:
+
+    python backend/inference_server.py
+    INFERENCE_SERVER_URL=http://127.0.0.1:8765
+
+Endpoints:
+    POST /summarize  {"model": ..., "texts": [...], "params": {...}}
+                     -> {"summaries": [...]}
+    POST /generate   {"model": ..., "input_ids": [[...], ...], "params": {...}}
+                     -> {"summaries": [...]}
+    POST /generate/stream {"model": ..., "input_ids": [...], "params": {...}}
+                     -> NDJSON {"token": ...} lines, then {"summary": ...}
+    GET  /health     -> {"status": "ok", "models": [...]}
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import metrics
+import topology
+import inference_client
+from config import config
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class DynamicBatcher:
+    """
+    Collects single-input requests (texts or token id lists) from many
+    threads and runs them in batches.
+
+    ``runner(model, inputs, params)`` must return one output per input.
+    """
+
+    def __init__(self, runner, max_batch_size=8, max_wait_ms=25):
+        self.runner = runner
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name='inference-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, model, text, params):
+        """Queue one input and return a Future for its output."""
+        future = Future()
+        key = (model, json.dumps(params, sort_keys=True))
+        self._queue.put((key, text, future))
+        return future
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            groups = {}
+            for key, text, future in self._collect():
+                groups.setdefault(key, []).append((text, future))
+
+            for (model, params_json), items in groups.items():
+                texts = [text for text, _ in items]
+                started = time.time()
+                try:
+                    outputs = self.runner(model, texts, json.loads(params_json))
+                except Exception as e:
+                    logger.error(f"Batch of {len(texts)} for {model} failed: {str(e)}")
+                    for _, future in items:
+                        future.set_exception(e)
+                    continue
+                metrics.observe('inference_batch_size', len(texts), buckets=BATCH_SIZE_BUCKETS, model=model)
+                metrics.observe('inference_batch_seconds', time.time() - started, model=model)
+                for (_, future), output in zip(items, outputs):
+                    future.set_result(output)
+
+
+def _run_summaries(model, texts, params):
+    return inference_client.run_local(texts, model=model, **params)
+
+
+def _run_generate(model, input_ids_batch, params):
+    return inference_client.generate_local(input_ids_batch, model=model, **params)
+
+
+STREAM_PATH = '/generate/stream'
+
+# Path -> (request field holding the inputs, runner)
+ROUTES = {
+    '/summarize': ('texts', _run_summaries),
+    '/generate': ('input_ids', _run_generate),
+}
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    """JSON request handler; each connection runs on its own thread."""
+
+    batchers = {}
+    timeout_seconds = 300
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok', 'models': inference_client.loaded_models()})
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def _stream(self, payload):
+        """Stream one generation as NDJSON lines (not batched: one sequence per streamer)."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        try:
+            model = payload.get('model') or inference_client.DEFAULT_SUMMARIZER
+            for event in inference_client.stream_local(payload['input_ids'], model=model,
+                                                       **(payload.get('params') or {})):
+                self.wfile.write((json.dumps(event) + '\n').encode('utf-8'))
+                self.wfile.flush()
+        except Exception as e:
+            logger.error(f"Streaming generation failed: {str(e)}")
+            self.wfile.write((json.dumps({'error': str(e)}) + '\n').encode('utf-8'))
+
+    def do_POST(self):
+        if self.path == STREAM_PATH:
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            except ValueError as e:
+                self._send_json(400, {'error': f'Invalid request: {str(e)}'})
+                return
+            self._stream(payload)
+            return
+        if self.path not in ROUTES:
+            self._send_json(404, {'error': 'Not found'})
+            return
+        field, _ = ROUTES[self.path]
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length))
+            inputs = payload[field]
+            model = payload.get('model') or inference_client.DEFAULT_SUMMARIZER
+            params = payload.get('params') or {}
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {'error': f'Invalid request: {str(e)}'})
+            return
+
+        try:
+            batcher = self.batchers[self.path]
+            futures = [batcher.submit(model, item, params) for item in inputs]
+            summaries = [future.result(timeout=self.timeout_seconds) for future in futures]
+        except Exception as e:
+            logger.error(f"Summarization failed: {str(e)}")
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, {'summaries': summaries})
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def create_server(cfg=None):
+    """Build the HTTP server with one batcher per route, configured from ``cfg``."""
+    cfg = cfg or config[env]
+    InferenceHandler.batchers = {
+        path: DynamicBatcher(runner, max_batch_size=cfg.INFERENCE_MAX_BATCH_SIZE,
+                             max_wait_ms=cfg.INFERENCE_MAX_WAIT_MS)
+        for path, (_, runner) in ROUTES.items()
+    }
+    InferenceHandler.timeout_seconds = cfg.INFERENCE_TIMEOUT_SECONDS
+    return ThreadingHTTPServer((cfg.INFERENCE_SERVER_HOST, cfg.INFERENCE_SERVER_PORT), InferenceHandler)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    cfg = config[env]
+    # Thread pools must be sized before torch is imported by the model load
+    topology.apply(topology.SERVER)
+    # Load the default summarizer before accepting traffic
+    inference_client.load_summarizer()
+    server = create_server(cfg)
+    logger.info(f"Inference server listening on {cfg.INFERENCE_SERVER_HOST}:{cfg.INFERENCE_SERVER_PORT} "
+                f"(batch {cfg.INFERENCE_MAX_BATCH_SIZE}, wait {cfg.INFERENCE_MAX_WAIT_MS}ms)")
+    server.serve_forever()
@@ -0,0 +1,129 @@
+"""
+Keyword vocabulary for clause classification and risk flags.
+
+Every clause-category, risk and fast-path clause keyword, in English, Hindi
+and Marathi, is compiled into one keyword automaton at import (see
+utils/keyword_automaton.py). A document is scanned once; risk flags come
+from its per-label hit counts and clause classification from the hit
+offsets that fall inside each clause span, instead of one ``keyword in
+text.lower()`` test per keyword.
+
+Labels are ``(group, name)`` pairs:
+
+    ('clause', category)   CLAUSE_CATEGORIES, used to classify clauses
+    ('risk', name)         RISK_TERMS, flags raised on the whole document
+    ('fast', clause_type)  FAST_CLAUSE_TERMS, clause anchors for the fast
+                           multilingual pipeline
+"""
+
+from bisect import bisect_left
+
+from utils.keyword_automaton import KeywordAutomaton
+
+CLAUSE = 'clause'
+RISK = 'risk'
+FAST = 'fast'
+
+# Keyword lists used to classify extracted clauses
+CLAUSE_CATEGORIES = {
+    'definitions': ['definitions', 'defined terms',
+                    'परिभाषा', 'व्याख्या'],
+    'payment_terms': ['payment', 'fee', 'compensation', 'price', 'cost', 'invoice',
+                      'भुगतान', 'शुल्क', 'फीस', 'मूल्य', 'किंमत', 'रक्कम', 'देयक'],
+    'termination': ['terminate', 'termination', 'cancel', 'cancellation', 'end',
+                    'समाप्ति', 'समाप्त', 'रद्द', 'समाप्ती', 'संपुष्टात'],
+    'liability': ['liability', 'liable', 'responsible', 'indemnify', 'indemnification',
+                  'दायित्व', 'जिम्मेदारी', 'क्षतिपूर्ति', 'हर्जाना', 'जबाबदारी', 'नुकसान भरपाई'],
+    'confidentiality': ['confidential', 'confidentiality', 'secret', 'non-disclosure',
+                        'गोपनीय', 'गुप्त'],
+    'intellectual_property': ['intellectual property', 'copyright', 'patent', 'trademark', 'ip',
+                              'बौद्धिक संपदा', 'बौद्धिक संपत्ती', 'कॉपीराइट', 'पेटेंट', 'ट्रेडमार्क'],
+    'governing_law': ['governing law', 'jurisdiction', 'court', 'arbitration',
+                      'न्यायक्षेत्र', 'अधिकारक्षेत्र', 'न्यायालय', 'मध्यस्थता', 'लवाद'],
+    'warranties': ['warranty', 'warrant', 'represent', 'representation', 'guarantee',
+                   'वारंटी', 'गारंटी', 'हमी'],
+}
+
+# Document-level risk flags, reported by their English name
+RISK_TERMS = {
+    'risk': ['risk', 'जोखिम', 'धोका'],
+    'liability': ['liability', 'दायित्व', 'जबाबदारी'],
+    'penalty': ['penalty', 'दंड', 'जुर्माना'],
+    'breach': ['breach', 'उल्लंघन'],
+    'termination': ['termination', 'समाप्ति', 'समाप्ती'],
+}
+
+RISK_KEYWORDS = list(RISK_TERMS)
+
+# Clause anchors for the fast multilingual pipeline
+FAST_CLAUSE_TERMS = {
+    'confidentiality': ['confidential', 'non-disclosure', 'nda', 'गोपनीय', 'गुप्त'],
+    'termination': ['termination', 'terminate', 'end', 'समाप्ति', 'अंत'],
+    'payment': ['payment', 'fee', 'cost', 'amount', 'भुगतानी', 'भरणे'],
+    'liability': ['liability', 'responsible', 'liable', 'दायित्व', 'जिम्मेदारी'],
+}
+
+VOCABULARY = {
+    **{(CLAUSE, name): terms for name, terms in CLAUSE_CATEGORIES.items()},
+    **{(RISK, name): terms for name, terms in RISK_TERMS.items()},
+    **{(FAST, name): terms for name, terms in FAST_CLAUSE_TERMS.items()},
+}
+
+AUTOMATON = KeywordAutomaton(VOCABULARY)
+
+
+def scan(text):
+    """Scan text once for every keyword; see KeywordAutomaton.scan."""
+    return AUTOMATON.scan(text)
+
+
+def names(hits, group):
+    """{name: count} for one label group of a scan."""
+    return {name: count for (g, name), count in hits.counts.items() if g == group}
+
+
+def classify_clauses(clauses, text, hits=None):
+    """
+    Percentage of clauses that mention each category.
+
+    The document is scanned once and every hit is assigned to the clause
+    span it falls in; a clause counts towards every category it mentions.
+
+    Args:
+        clauses: Clause records with start/end offsets into ``text``
+        text: Document text
+        hits: Scan of ``text``, if the caller already has one
+    """
+    hits = hits if hits is not None else scan(text)
+    starts = {label: [start for start, _, _ in offsets] for label, offsets in hits.offsets.items()}
+    total = len(clauses) if clauses else 1
+    matching = {name: 0 for name in CLAUSE_CATEGORIES}
+    for clause in clauses:
+        if 'start' not in clause:
+            # Legacy record with a copied content string
+            found = names(scan(clause.get('content', '')), CLAUSE)
+        else:
+            found = [name for name in CLAUSE_CATEGORIES
+                     if _hit_within(hits.offsets.get((CLAUSE, name)), starts.get((CLAUSE, name)),
+                                    clause['start'], clause['end'])]
+        for name in found:
+            matching[name] += 1
+    return {name: round((count / total) * 100, 2) for name, count in matching.items()}
+
+
+def _hit_within(offsets, starts, start, end):
+    """Whether any (start-sorted) hit lies entirely inside [start, end)."""
+    if not offsets:
+        return False
+    i = bisect_left(starts, start)
+    while i < len(offsets) and offsets[i][0] < end:
+        if offsets[i][1] <= end:
+            return True
+        i += 1
+    return False
+
+
+def risk_flags(text, hits=None):
+    """Risk names mentioned in a document, in RISK_TERMS order."""
+    found = names(hits if hits is not None else scan(text), RISK)
+    return [name for name in RISK_TERMS if found.get(name)]
@@ -0,0 +1,96 @@
+"""
+Lightweight Redis-backed metrics for Legistra.
+
+Counters, gauges and histograms are kept in Redis hashes so that every
+gunicorn worker and Celery child contributes to the same series. The
+/api/metrics endpoint renders them in the Prometheus text format.
+
+Recording a metric never raises: if Redis is unavailable the sample is
+dropped and a debug message is logged.
+"""
+
+import re
+import logging
+
+from redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+COUNTER_KEY = "metrics:counter"
+GAUGE_KEY = "metrics:gauge"
+HISTOGRAM_KEY = "metrics:histogram"
+
+# Seconds - covers cache hits (ms) up to long BART runs (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _series(name, labels):
+    """Build a Prometheus series name such as ``name{a="1",b="2"}``."""
+    if not labels:
+        return name
+    parts = ",".join(f'{k}="{labels[k]}"' for k in sorted(labels))
+    return f"{name}{{{parts}}}"
+
+
+def inc(name, value=1, **labels):
+    """Increment a counter."""
+    try:
+        get_redis().hincrbyfloat(COUNTER_KEY, _series(name, labels), value)
+    except Exception as e:
+        logger.debug("metrics.inc(%s) dropped: %s", name, e)
+
+
+def set_gauge(name, value, **labels):
+    """Set a gauge to an absolute value."""
+    try:
+        get_redis().hset(GAUGE_KEY, _series(name, labels), value)
+    except Exception as e:
+        logger.debug("metrics.set_gauge(%s) dropped: %s", name, e)
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    """Record one observation in a cumulative histogram."""
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for bound in buckets:
+            if value <= bound:
+                pipe.hincrbyfloat(HISTOGRAM_KEY, _series(f"{name}_bucket", dict(labels, le=bound)), 1)
+        pipe.hincrbyfloat(HISTOGRAM_KEY, _series(f"{name}_bucket", dict(labels, le="+Inf")), 1)
+        pipe.hincrbyfloat(HISTOGRAM_KEY, _series(f"{name}_sum", labels), value)
+        pipe.hincrbyfloat(HISTOGRAM_KEY, _series(f"{name}_count", labels), 1)
+        pipe.execute()
+    except Exception as e:
+        logger.debug("metrics.observe(%s) dropped: %s", name, e)
+
+
+def _base_name(series):
+    name = series.split("{", 1)[0]
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _sort_key(series):
+    """Order series by name/labels, with histogram buckets in ascending ``le``."""
+    match = re.search(r'le="([^"]+)"', series)
+    if not match:
+        return (series, 0.0)
+    le = float("inf") if match.group(1) == "+Inf" else float(match.group(1))
+    return (series.replace(match.group(0), ""), le)
+
+
+def render_prometheus():
+    """Render every stored series in the Prometheus text exposition format."""
+    r = get_redis()
+    lines = []
+    for key, metric_type in ((COUNTER_KEY, "counter"), (GAUGE_KEY, "gauge"), (HISTOGRAM_KEY, "histogram")):
+        values = {k.decode(): v.decode() for k, v in r.hgetall(key).items()}
+        seen = set()
+        for series in sorted(values, key=_sort_key):
+            base = _base_name(series) if metric_type == "histogram" else series.split("{", 1)[0]
+            if base not in seen:
+                lines.append(f"# TYPE {base} {metric_type}")
+                seen.add(base)
+            lines.append(f"{series} {values[series]}")
+    return "\n".join(lines) + "\n"
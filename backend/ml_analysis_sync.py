@@ -1,11 +1,13 @@
 import sys
 import os
-path_to_add = os.path.join(os.path.dirname(__file__), '..')
-print(f"Adding path: {path_to_add}")
-sys.path.append(path_to_add)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from models_supabase import SupabaseDB, DBManager
 from config import config
+import inference_client
+from tokenization import tokenize_document
+from input_compression import compress
+from utils.clause_spans import PageIndex, clause_record, trim_span, HEADING_CONFIDENCE, PHRASE_CONFIDENCE
 import logging
 import time
 
@@ -27,9 +29,15 @@ def get_db_manager():
         db_manager = DBManager(mongo_db)
     return db_manager
 
-def analyze_document_ml_sync(doc_id):
+def analyze_document_ml_sync(doc_id, summary=None):
     """
     Synchronous version of the ML analysis task (without Celery dependencies)
+
+    Args:
+        doc_id: Document ID
+        summary: Summary already generated by the caller (e.g. streamed to
+                 the client); when given, generation is skipped and the rest
+                 of the analysis is stored the same way
     """
     logger.info(f"Starting ML analysis for document: {doc_id}")
     
@@ -45,20 +53,17 @@ def analyze_document_ml_sync(doc_id):
         text = document['content']
         start_time = time.time()
         
-        # Use tokenizer to truncate text to model max length tokens (1024 tokens)
-        logger.info(f"Original text length (chars): {len(text)}")
-        from transformers import AutoTokenizer
-        tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
-        max_tokens = 1024
-        tokens = tokenizer.encode(text, truncation=True, max_length=max_tokens)
-        logger.info(f"Tokenized input length after truncation: {len(tokens)}")
-        truncated_text = tokenizer.decode(tokens, skip_special_tokens=True)
-        logger.info(f"Truncated text length (chars): {len(truncated_text)}")
-        
-        # Generate summary
-        from transformers import pipeline
-        summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-        summary = summarizer(truncated_text, max_length=150, min_length=30, do_sample=False)[0]['summary_text']
+        if summary is None:
+            # Tokenize once and feed the ids (1024 tokens, salience-compressed
+            # when the document is longer) straight to the model
+            logger.info(f"Original text length (chars): {len(text)}")
+            tokens = tokenize_document(text, "facebook/bart-large-cnn")
+            input_ids = compress(tokens, text, 1024).truncated(1024)
+            logger.info(f"Tokenized input length after truncation: {len(input_ids)}")
+
+            # Generate summary
+            summary = inference_client.generate(input_ids, model="facebook/bart-large-cnn",
+                                                max_length=150, min_length=30, do_sample=False)
         
         # Advanced clause extraction and identification
         import re
@@ -117,42 +122,30 @@ def analyze_document_ml_sync(doc_id):
             ]
         }
 
-        # Split text into paragraphs/lines for better clause identification
-        paragraphs = re.split(r'\n\s*\n|\n(?=[A-Z][^a-z]*:|\d+\.)', text)
-
         identified_clauses = []
-        remaining_text = text
+        pages = PageIndex(text)
 
-        # Find and extract each type of clause
+        # Find each clause as a span of the document text
         for clause_type, patterns in clause_patterns.items():
-            for pattern in patterns:
-                matches = list(re.finditer(pattern, remaining_text, re.IGNORECASE))
-                for match in matches:
+            for index, pattern in enumerate(patterns):
+                for match in re.finditer(pattern, text, re.IGNORECASE):
                     # Find the clause boundaries (next section heading or end of text)
                     start_pos = match.start()
                     clause_heading = match.group().strip()
 
                     # Look for the end of this clause (next major heading or end of text)
-                    remaining_after_match = remaining_text[start_pos:]
-                    next_section_match = re.search(r'\n\s*(?:article|section|clause)\s*\d+', remaining_after_match[1:], re.IGNORECASE)
+                    next_section_match = re.search(r'[\n\f]\s*(?:article|section|clause)\s*\d+', text[start_pos + 1:], re.IGNORECASE)
 
                     if next_section_match:
                         end_pos = start_pos + next_section_match.start() + 1
                     else:
-                        end_pos = len(remaining_text)
-
-                    clause_text = remaining_text[start_pos:end_pos].strip()
-                    
-                    # Clean up the clause text
-                    clause_text = re.sub(r'\n+', ' ', clause_text)
-                    clause_text = re.sub(r'\s+', ' ', clause_text)
+                        end_pos = len(text)
 
-                    if len(clause_text) > 50:  # Only include substantial clauses
-                        identified_clauses.append({
-                            'type': clause_type,
-                            'heading': clause_heading,
-                            'content': clause_text[:500] + '...' if len(clause_text) > 500 else clause_text
-                        })
+                    start_pos, end_pos = trim_span(text, start_pos, end_pos)
+                    if end_pos - start_pos > 50:  # Only include substantial clauses
+                        confidence = HEADING_CONFIDENCE if index == 0 else PHRASE_CONFIDENCE
+                        identified_clauses.append(clause_record(text, clause_type, clause_heading,
+                                                                start_pos, end_pos, confidence, pages))
 
         # Remove duplicates and limit to top clauses
         unique_clauses = []
@@ -209,15 +202,16 @@ def analyze_document_ml_sync(doc_id):
         
         # Store results in MongoDB
         db_mgr = get_db_manager()
-        db_mgr.store_analysis_result(doc_id, analysis, processing_time, {
+        analysis_id = db_mgr.store_analysis_result(doc_id, analysis, processing_time, {
             'summarizer': 'facebook/bart-large-cnn',
-            'tokenizer': 'facebook/bart-large-cnn'
+            'tokenizer': 'facebook/bart-large-cnn',
+            'pipeline': 'bart'
         })
         
         # Update document status
         db_mgr.update_document_status(doc_id, 'completed')
         
-        result = {'document_id': doc_id, 'analysis': analysis}
+        result = {'document_id': doc_id, 'analysis_id': analysis_id, 'analysis': analysis}
         logger.info(f"ML analysis completed successfully for document: {doc_id}")
         return result
         
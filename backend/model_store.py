@@ -0,0 +1,148 @@
+"""
+Local model artifact store.
+
+``scripts/snapshot_models.py`` saves every configured summarizer with its
+tokenizer into a versioned directory in safetensors format:
+
+    MODEL_STORE_DIR/
+        CURRENT                       name of the active version
+        <version>/
+            manifest.json             models, kinds, file sizes and hashes
+            facebook--bart-large-cnn/ config, tokenizer, model.safetensors
+
+When a snapshot of a model exists, it is loaded from disk with
+``local_files_only`` (no hub or etag requests) and from safetensors, which
+are memory-mapped instead of unpickled, so worker cold starts no longer
+depend on the network or on deserializing pickled weights. Models missing
+from the store fall back to the Hugging Face cache, with a warning.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+MANIFEST_FILE = 'manifest.json'
+CURRENT_FILE = 'CURRENT'
+
+SEQ2SEQ = 'seq2seq'
+
+_tokenizers = {}
+_tokenizers_lock = threading.Lock()
+
+
+def _model_dir_name(model_name):
+    return model_name.replace('/', '--')
+
+
+def current_version():
+    """The active store version: MODEL_STORE_VERSION, else the CURRENT file."""
+    cfg = config[env]
+    if cfg.MODEL_STORE_VERSION:
+        return cfg.MODEL_STORE_VERSION
+    try:
+        with open(os.path.join(cfg.MODEL_STORE_DIR, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def local_path(model_name, version=None):
+    """Snapshot directory for a model, or None if it is not in the store."""
+    version = version or current_version()
+    if not version:
+        return None
+    path = os.path.join(config[env].MODEL_STORE_DIR, version, _model_dir_name(model_name))
+    return path if os.path.isdir(path) else None
+
+
+def resolve(model_name):
+    """
+    Where to load a model from.
+
+    Returns:
+        tuple: (name or path, from_pretrained kwargs)
+    """
+    if os.path.isdir(model_name):
+        # A local model directory (e.g. the fine-tuned clause model)
+        return model_name, {'local_files_only': True}
+    path = local_path(model_name)
+    if path:
+        return path, {'local_files_only': True, 'use_safetensors': True, 'low_cpu_mem_usage': True}
+    if config[env].MODEL_STORE_REQUIRED:
+        raise RuntimeError(f"{model_name} is not in the model store; run scripts/snapshot_models.py")
+    logger.warning(f"{model_name} is not in the model store, loading from the Hugging Face cache")
+    return model_name, {}
+
+
+def load_tokenizer(model_name):
+    """Load a tokenizer once per process, preferring the local store."""
+    with _tokenizers_lock:
+        if model_name not in _tokenizers:
+            from transformers import AutoTokenizer
+            path, kwargs = resolve(model_name)
+            _tokenizers[model_name] = AutoTokenizer.from_pretrained(
+                path, local_files_only=kwargs.get('local_files_only', False))
+        return _tokenizers[model_name]
+
+
+def load_seq2seq_model(model_name):
+    """Load a seq2seq model (e.g. the summarizer), preferring the local store."""
+    from transformers import AutoModelForSeq2SeqLM
+    path, kwargs = resolve(model_name)
+    return AutoModelForSeq2SeqLM.from_pretrained(path, **kwargs)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot(models, version=None, make_current=True):
+    """
+    Save models and their tokenizers into a new store version.
+
+    Args:
+        models: Seq2seq model names (summarizers)
+        version: Version name (defaults to a timestamp)
+        make_current: Point CURRENT at the new version
+
+    Returns:
+        str: Path of the version directory
+    """
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    version = version or time.strftime('%Y%m%d-%H%M%S')
+    root = os.path.join(config[env].MODEL_STORE_DIR, version)
+    manifest = {'version': version, 'created_at': time.time(), 'models': {}}
+
+    for name in models:
+        path = os.path.join(root, _model_dir_name(name))
+        logger.info(f"Snapshotting {name} to {path}")
+        AutoModelForSeq2SeqLM.from_pretrained(name).save_pretrained(path, safe_serialization=True)
+        AutoTokenizer.from_pretrained(name).save_pretrained(path)
+
+        files = {}
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                full = os.path.join(dirpath, filename)
+                files[os.path.relpath(full, path)] = {'bytes': os.path.getsize(full), 'sha256': _file_digest(full)}
+        manifest['models'][name] = {'kind': SEQ2SEQ, 'path': _model_dir_name(name), 'files': files}
+
+    with open(os.path.join(root, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    if make_current:
+        with open(os.path.join(config[env].MODEL_STORE_DIR, CURRENT_FILE), 'w') as f:
+            f.write(version)
+    return root
@@ -104,8 +104,9 @@ class SupabaseDB:
             return None
 
     # -------------------------------------------------------------- documents
-    def insert_document(self, filename, text, file_path=None):
-        """Insert a document record. Returns the new document id."""
+    def insert_document(self, filename, text, file_path=None, parent_document_id=None, version=1):
+        """Insert a document record, optionally as a new version of ``parent_document_id``.
+        Returns the new document id."""
         try:
             doc_id = str(uuid.uuid4())
             ext = filename.rsplit(".", 1)[1].lower() if "." in filename else "txt"
@@ -125,6 +126,9 @@ class SupabaseDB:
                 "status": "uploaded",
                 "upload_time": datetime.now(timezone.utc).isoformat(),
             }
+            if parent_document_id:
+                row["parent_document_id"] = parent_document_id
+                row["version"] = version
             self.sb.table("documents").insert(row).execute()
             logger.info("Inserted document %s (%s)", doc_id, filename)
             return doc_id
@@ -192,6 +196,84 @@ class SupabaseDB:
             logger.error("get_user_documents failed: %s", e)
             return []
 
+    def get_documents_by_ids(self, doc_ids):
+        """Metadata rows (no content) of the given documents."""
+        try:
+            resp = (self.sb.table("documents").select("id, filename, user_id, upload_time, status")
+                    .in_("id", list(doc_ids)).execute())
+            return resp.data or []
+        except Exception as e:
+            logger.error("get_documents_by_ids failed: %s", e)
+            return []
+
+    def get_document_versions(self, doc_id, max_versions=100):
+        """All versions linked to a document (parents and revisions), oldest first."""
+        columns = "id, filename, version, parent_document_id, status, upload_time, user_id"
+        try:
+            chain = []
+            current = doc_id
+            while current and len(chain) < max_versions:
+                resp = self.sb.table("documents").select(columns).eq("id", current).maybe_single().execute()
+                if not resp.data:
+                    break
+                chain.insert(0, resp.data)
+                current = resp.data.get("parent_document_id")
+            current = doc_id
+            while current and len(chain) < max_versions:
+                resp = (
+                    self.sb.table("documents")
+                    .select(columns)
+                    .eq("parent_document_id", current)
+                    .order("upload_time", desc=False)
+                    .limit(1)
+                    .execute()
+                )
+                rows = resp.data or []
+                if not rows:
+                    break
+                chain.append(rows[0])
+                current = rows[0]["id"]
+            return chain
+        except Exception as e:
+            logger.error("get_document_versions failed: %s", e)
+            return []
+
+    def update_document_template(self, doc_id, template_id, coverage, match_ms):
+        """Record the template a document was matched to at ingest."""
+        try:
+            self.sb.table("documents").update({
+                "template_id": template_id,
+                "template_coverage": coverage,
+                "template_match_ms": match_ms,
+            }).eq("id", doc_id).execute()
+        except Exception as e:
+            logger.error("update_document_template failed: %s", e)
+
+    def update_document_features(self, doc_id, features):
+        """Store the routing features computed at ingest (utils.document_features)."""
+        try:
+            self.sb.table("documents").update(features).eq("id", doc_id).execute()
+        except Exception as e:
+            logger.error("update_document_features failed: %s", e)
+
+    def update_document_minhash(self, doc_id, signature):
+        """Store a document's MinHash signature (near-duplicate detection)."""
+        try:
+            self.sb.table("documents").update({"minhash": signature}).eq("id", doc_id).execute()
+        except Exception as e:
+            logger.error("update_document_minhash failed: %s", e)
+
+    def list_document_signatures(self, offset=0, limit=1000):
+        """[{'id', 'user_id', 'minhash'}] of documents with a signature, one page at a time."""
+        try:
+            resp = (self.sb.table("documents").select("id, user_id, minhash")
+                    .not_.is_("minhash", "null").order("id")
+                    .range(offset, offset + limit - 1).execute())
+            return resp.data or []
+        except Exception as e:
+            logger.error("list_document_signatures failed: %s", e)
+            return []
+
     def find_documents(self, query=None, limit=None):
         """Simple text search on content (ilike)."""
         try:
@@ -223,9 +305,81 @@ class SupabaseDB:
             logger.error("count_documents failed: %s", e)
             return 0
 
+    # -------------------------------------------------------------- templates
+    def insert_template(self, name, content, fingerprint, analysis_results, model_versions,
+                        processing_time=0, source_document_id=None, created_by=None):
+        """Insert a template with its precomputed analysis. Returns the new template id."""
+        try:
+            template_id = str(uuid.uuid4())
+            row = {
+                "id": template_id,
+                "name": name,
+                "content": content,
+                "fingerprint": fingerprint,            # JSONB [[hash, length], ...]
+                "analysis_results": analysis_results,  # JSONB
+                "model_versions": model_versions,      # JSONB
+                "processing_time": processing_time,
+                "source_document_id": source_document_id,
+                "created_by": created_by,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            self.sb.table("templates").insert(row).execute()
+            logger.info("Inserted template %s (%s)", template_id, name)
+            return template_id
+        except Exception as e:
+            logger.error("insert_template failed: %s", e)
+            raise
+
+    def get_template(self, template_id):
+        try:
+            resp = self.sb.table("templates").select("*").eq("id", template_id).maybe_single().execute()
+            return resp.data
+        except Exception as e:
+            logger.error("get_template failed: %s", e)
+            return None
+
+    def list_templates(self):
+        """Template metadata (no content or analysis), newest first."""
+        try:
+            resp = (
+                self.sb.table("templates")
+                .select("id, name, source_document_id, processing_time, created_by, created_at")
+                .order("created_at", desc=True)
+                .execute()
+            )
+            return resp.data or []
+        except Exception as e:
+            logger.error("list_templates failed: %s", e)
+            return []
+
+    def list_template_fingerprints(self):
+        """[{'id', 'fingerprint'}] of every template, for the match index."""
+        try:
+            resp = self.sb.table("templates").select("id, fingerprint").execute()
+            return resp.data or []
+        except Exception as e:
+            logger.error("list_template_fingerprints failed: %s", e)
+            return []
+
+    def delete_template(self, template_id):
+        """Delete a template. Returns the number of rows deleted, or None on error."""
+        try:
+            resp = self.sb.table("templates").delete().eq("id", template_id).execute()
+            return len(resp.data or [])
+        except Exception as e:
+            logger.error("delete_template failed: %s", e)
+            return None
+
     # -------------------------------------------------------- analysis results
-    def insert_analysis_result(self, document_id, analysis_results, processing_time, model_versions):
-        """Insert an analysis result. Returns the new analysis id."""
+    def insert_analysis_result(self, document_id, analysis_results, processing_time, model_versions,
+                               status="completed"):
+        """
+        Insert an analysis result. Returns the new analysis id.
+
+        Deadline-bounded analyses are first stored with status 'partial';
+        those rows are only read by id and are left out of the document's
+        analysis, the user's results and the processing history.
+        """
         try:
             analysis_id = str(uuid.uuid4())
             row = {
@@ -234,7 +388,7 @@ class SupabaseDB:
                 "analysis_results": analysis_results,  # JSONB
                 "processing_time": processing_time,
                 "model_versions": model_versions,       # JSONB
-                "status": "completed",
+                "status": status,
                 "created_at": datetime.now(timezone.utc).isoformat(),
             }
             self.sb.table("analysis_results").insert(row).execute()
@@ -251,6 +405,7 @@ class SupabaseDB:
                 self.sb.table("analysis_results")
                 .select("*")
                 .eq("document_id", document_id)
+                .neq("status", "partial")
                 .order("created_at", desc=True)
                 .limit(1)
                 .maybe_single()
@@ -264,6 +419,24 @@ class SupabaseDB:
             logger.error("get_analysis_result failed: %s", e)
             return None
 
+    def get_analysis_result_by_id(self, analysis_id):
+        """Get a single analysis result by its own id."""
+        try:
+            resp = (
+                self.sb.table("analysis_results")
+                .select("*")
+                .eq("id", analysis_id)
+                .maybe_single()
+                .execute()
+            )
+            row = resp.data
+            if row:
+                row["_id"] = row["id"]
+            return row
+        except Exception as e:
+            logger.error("get_analysis_result_by_id failed: %s", e)
+            return None
+
     def update_analysis_result_with_user(self, analysis_id, user_id):
         """Associate an analysis result with a user."""
         try:
@@ -288,6 +461,7 @@ class SupabaseDB:
                 self.sb.table("analysis_results")
                 .select("*")
                 .in_("document_id", doc_ids)
+                .neq("status", "partial")
                 .execute()
             )
             rows = resp.data or []
@@ -298,6 +472,22 @@ class SupabaseDB:
             logger.error("get_user_analysis_results failed: %s", e)
             return []
 
+    def get_processing_history(self, limit=5000):
+        """Recent processing times with the document features the cost model uses."""
+        try:
+            resp = (
+                self.sb.table("analysis_results")
+                .select("processing_time, model_versions, documents(text_length, document_type)")
+                .neq("status", "partial")
+                .order("created_at", desc=True)
+                .limit(limit)
+                .execute()
+            )
+            return resp.data or []
+        except Exception as e:
+            logger.error("get_processing_history failed: %s", e)
+            return []
+
     # find_one compat used by compatibility_endpoints export
     def find_one(self, query):
         """Generic find_one on whichever table matches the query keys."""
@@ -388,8 +578,8 @@ class DBManager:
     def __init__(self, db: SupabaseDB):
         self.db = db
 
-    def store_document_metadata_and_content(self, filename, text, file_path=None):
-        return self.db.insert_document(filename, text, file_path)
+    def store_document_metadata_and_content(self, filename, text, file_path=None, parent_document_id=None, version=1):
+        return self.db.insert_document(filename, text, file_path, parent_document_id, version)
 
     def get_document(self, document_id):
         return self.db.get_document(document_id)
@@ -397,8 +587,16 @@ class DBManager:
     def update_document_status(self, document_id, status):
         return self.db.update_document_status(document_id, status)
 
-    def store_analysis_result(self, document_id, analysis_results, processing_time, model_versions):
-        return self.db.insert_analysis_result(document_id, analysis_results, processing_time, model_versions)
+    def store_analysis_result(self, document_id, analysis_results, processing_time, model_versions,
+                              status="completed"):
+        return self.db.insert_analysis_result(document_id, analysis_results, processing_time, model_versions,
+                                              status)
 
     def get_analysis_result(self, document_id):
         return self.db.get_analysis_result(document_id)
+
+    def get_analysis_result_by_id(self, analysis_id):
+        return self.db.get_analysis_result_by_id(analysis_id)
+
+    def get_template(self, template_id):
+        return self.db.get_template(template_id)
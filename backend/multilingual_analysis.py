@@ -1,8 +1,6 @@
 import sys
 import os
-path_to_add = os.path.join(os.path.dirname(__file__), '..')
-print(f"Adding path: {path_to_add}")
-sys.path.append(path_to_add)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from models_supabase import SupabaseDB, DBManager
 from config import config
@@ -10,8 +8,13 @@ import logging
 import time
 import re
 from langdetect import detect
-import threading
-from transformers import AutoTokenizer, pipeline
+import inference_client
+from tokenization import tokenize_document
+from input_compression import compress
+from utils.extractive_summary import extractive_summary
+import keywords
+from utils.clause_spans import (PageIndex, clause_record, trim_span, HEADING_CONFIDENCE, PHRASE_CONFIDENCE,
+                                KEYWORD_CONFIDENCE)
 
 # Set up logging for tasks
 logger = logging.getLogger(__name__)
@@ -23,23 +26,6 @@ env = os.getenv('FLASK_ENV', 'development')
 mongo_db = None
 db_manager = None
 
-# Global model cache to avoid reloading
-_model_cache = {}
-_model_cache_lock = threading.Lock()
-
-def get_cached_model(model_name):
-    """Get or create cached model to avoid reloading"""
-    with _model_cache_lock:
-        if model_name not in _model_cache:
-            logger.info(f"Loading model: {model_name}")
-            try:
-                _model_cache[model_name] = pipeline("summarization", model=model_name)
-                logger.info(f"Model {model_name} loaded successfully")
-            except Exception as e:
-                logger.error(f"Failed to load model {model_name}: {str(e)}")
-                raise
-        return _model_cache[model_name]
-
 def get_db_manager():
     """Get or create DB manager instance"""
     global mongo_db, db_manager
@@ -150,45 +136,39 @@ def analyze_document_multilingual_sync(doc_id):
         logger.info(f"Loading {detected_language} summarization model...")
         model_config = get_multilingual_model(detected_language)
         
-        # Step 4: Tokenize and truncate text
+        # Step 4: Tokenize once; the summary input is 512 tokens of the most
+        # salient sentences (or the whole text when it fits)
         logger.info(f"Original text length (chars): {len(processed_text)}")
-        tokenizer = AutoTokenizer.from_pretrained(model_config['tokenizer'])
-        max_tokens = 1024
-        tokens = tokenizer.encode(processed_text, truncation=True, max_length=max_tokens)
-        logger.info(f"Tokenized input length after truncation: {len(tokens)}")
-        truncated_text = tokenizer.decode(tokens, skip_special_tokens=True)
-        logger.info(f"Truncated text length (chars): {len(truncated_text)}")
+        tokens = tokenize_document(processed_text, model_config['tokenizer'])
+        max_input_length = 512  # Reduced from 1024 for faster processing
+        input_ids = compress(tokens, processed_text, max_input_length).truncated(max_input_length)
+        logger.info(f"Tokenized input length after truncation: {len(input_ids)} of {len(tokens)}")
         
         # Step 5: Generate summary in the detected language
         logger.info(f"Generating {detected_language} summary...")
         try:
-            # Use cached model for faster processing
-            summarizer = get_cached_model(model_config['summarizer'])
-            
-            # Reduce input size for faster processing
-            max_input_length = 512  # Reduced from 1024
-            tokens = tokenizer.encode(processed_text, truncation=True, max_length=max_input_length)
-            truncated_text = tokenizer.decode(tokens, skip_special_tokens=True)
-            
             # Generate summary with reduced parameters for speed
-            summary = summarizer(
-                truncated_text, 
+            summary = inference_client.generate(
+                input_ids,
+                model=model_config['summarizer'],
                 max_length=min(model_config['max_length'], 100),  # Reduced max length
                 min_length=min(model_config['min_length'], 20),   # Reduced min length
                 do_sample=False,
                 num_beams=1  # Reduced beams for speed
-            )[0]['summary_text']
+            )
         except Exception as model_error:
             logger.warning(f"Language-specific model failed: {str(model_error)}, falling back to English model")
-            # Fallback to English model with cached version
-            summarizer = get_cached_model("facebook/bart-large-cnn")
-            summary = summarizer(
-                truncated_text, 
-                max_length=80, 
-                min_length=20, 
+            # Fallback to the English model (same cached tokenization when the tokenizers match)
+            fallback_tokens = tokenize_document(processed_text, "facebook/bart-large-cnn")
+            fallback_ids = compress(fallback_tokens, processed_text, max_input_length).truncated(max_input_length)
+            summary = inference_client.generate(
+                fallback_ids,
+                model="facebook/bart-large-cnn",
+                max_length=80,
+                min_length=20,
                 do_sample=False,
                 num_beams=1
-            )[0]['summary_text']
+            )
         
         logger.info(f"Generated summary: {summary[:100]}...")
         
@@ -241,43 +221,32 @@ def analyze_document_multilingual_sync(doc_id):
             ]
         }
 
-        # Split text into paragraphs for better clause identification
-        paragraphs = re.split(r'\n\s*\n|\n(?=[A-Z][^a-z]*:|\d+\.)', processed_text)
-
+        # Clauses are spans of the stored text, so match on the original
+        # (preprocessing collapses whitespace and would shift offsets)
         identified_clauses = []
-        remaining_text = processed_text
+        pages = PageIndex(text)
 
         # Find and extract each type of clause
         for clause_type, patterns in clause_patterns.items():
-            for pattern in patterns:
-                matches = list(re.finditer(pattern, remaining_text, re.IGNORECASE))
-                for match in matches:
+            for index, pattern in enumerate(patterns):
+                for match in re.finditer(pattern, text, re.IGNORECASE):
                     # Find the clause boundaries
                     start_pos = match.start()
                     clause_heading = match.group().strip()
 
                     # Look for the end of this clause
-                    remaining_after_match = remaining_text[start_pos:]
-                    next_section_match = re.search(r'\n\s*(?:article|section|clause|धार|अनुच्छेद)\s*\d+', remaining_after_match[1:], re.IGNORECASE)
+                    next_section_match = re.search(r'[\n\f]\s*(?:article|section|clause|धार|अनुच्छेद)\s*\d+', text[start_pos + 1:], re.IGNORECASE)
 
                     if next_section_match:
                         end_pos = start_pos + next_section_match.start() + 1
                     else:
-                        end_pos = len(remaining_text)
+                        end_pos = len(text)
 
-                    clause_text = remaining_text[start_pos:end_pos].strip()
-                    
-                    # Clean up the clause text
-                    clause_text = re.sub(r'\n+', ' ', clause_text)
-                    clause_text = re.sub(r'\s+', ' ', clause_text)
-
-                    if len(clause_text) > 50:  # Only include substantial clauses
-                        identified_clauses.append({
-                            'type': clause_type,
-                            'heading': clause_heading,
-                            'content': clause_text[:500] + '...' if len(clause_text) > 500 else clause_text,
-                            'language': detected_language
-                        })
+                    start_pos, end_pos = trim_span(text, start_pos, end_pos)
+                    if end_pos - start_pos > 50:  # Only include substantial clauses
+                        confidence = HEADING_CONFIDENCE if index == 0 else PHRASE_CONFIDENCE
+                        identified_clauses.append(clause_record(text, clause_type, clause_heading, start_pos, end_pos,
+                                                                confidence, pages, language=detected_language))
 
         # Remove duplicates and limit to top clauses
         unique_clauses = []
@@ -334,10 +303,11 @@ def analyze_document_multilingual_sync(doc_id):
         
         # Store results in MongoDB
         db_mgr = get_db_manager()
-        db_mgr.store_analysis_result(doc_id, analysis, processing_time, {
+        analysis_id = db_mgr.store_analysis_result(doc_id, analysis, processing_time, {
             'summarizer': model_config['summarizer'],
             'tokenizer': model_config['tokenizer'],
-            'language': detected_language
+            'language': detected_language,
+            'pipeline': 'multilingual'
         })
         
         # Update document status
@@ -345,6 +315,7 @@ def analyze_document_multilingual_sync(doc_id):
         
         result = {
             'document_id': doc_id, 
+            'analysis_id': analysis_id,
             'analysis': analysis,
             'language_info': {
                 'detected_language': detected_language,
@@ -399,69 +370,32 @@ def analyze_document_fast_multilingual_sync(doc_id):
         # Step 3: Fast summary generation (using extractive summarization)
         logger.info(f"Generating fast {detected_language} summary...")
         
-        # Simple extractive summarization for speed
-        sentences = re.split(r'[.!?।॥]', processed_text)
-        sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
-        
-        # Take first few sentences as summary
-        summary_sentences = sentences[:3]
-        summary = '. '.join(summary_sentences) + '.'
-        
-        if len(summary) < 50 and len(sentences) > 3:
-            summary = '. '.join(sentences[:5]) + '.'
+        # Extractive summarization: TextRank over TF-IDF sentence vectors picks
+        # the most central sentences instead of the opening recitals
+        summary = extractive_summary(processed_text, max_sentences=3)
+        if len(summary) < 50:
+            summary = extractive_summary(processed_text, max_sentences=5)
         
         logger.info(f"Generated fast summary: {summary[:100]}...")
         
         # Step 4: Fast clause extraction (reduced patterns)
         logger.info("Extracting legal clauses (fast mode)...")
         
-        # Simplified clause patterns for speed
-        fast_clause_patterns = {
-            'confidentiality': [
-                r'(?i)(?:confidential|गोपनीय|गुप्त)',
-                r'(?i)(?:non-disclosure|nda)',
-            ],
-            'termination': [
-                r'(?i)(?:termination|समाप्ति|अंत)',
-                r'(?i)(?:terminate|end)',
-            ],
-            'payment': [
-                r'(?i)(?:payment|भुगतानी|भरणे)',
-                r'(?i)(?:fee|cost|amount)',
-            ],
-            'liability': [
-                r'(?i)(?:liability|दायित्व|जिम्मेदारी)',
-                r'(?i)(?:responsible|liable)',
-            ]
-        }
-
-        # Fast clause identification
+        # One keyword-automaton scan of the stored text gives the first
+        # anchor of every fast clause type
+        hits = keywords.scan(text)
         identified_clauses = []
-        remaining_text = processed_text
-
-        # Find and extract each type of clause (limited to first match per type)
-        for clause_type, patterns in fast_clause_patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern, remaining_text, re.IGNORECASE)
-                if match:
-                    start_pos = match.start()
-                    
-                    # Extract a small context around the match
-                    context_start = max(0, start_pos - 50)
-                    context_end = min(len(remaining_text), start_pos + 200)
-                    clause_text = remaining_text[context_start:context_end].strip()
-                    
-                    clause_text = re.sub(r'\n+', ' ', clause_text)
-                    clause_text = re.sub(r'\s+', ' ', clause_text)
-
-                    if len(clause_text) > 30:
-                        identified_clauses.append({
-                            'type': clause_type,
-                            'heading': f"{clause_type.title()} Clause",
-                            'content': clause_text[:300] + '...' if len(clause_text) > 300 else clause_text,
-                            'language': detected_language
-                        })
-                    break  # Only take first match per type for speed
+        pages = PageIndex(text)
+
+        # A small context around each type's first match
+        for clause_type in keywords.FAST_CLAUSE_TERMS:
+            first = hits.first((keywords.FAST, clause_type))
+            if first:
+                context_start, context_end = trim_span(text, max(0, first[0] - 50), min(len(text), first[0] + 200))
+                if context_end - context_start > 30:
+                    identified_clauses.append(clause_record(text, clause_type, f"{clause_type.title()} Clause",
+                                                            context_start, context_end, KEYWORD_CONFIDENCE, pages,
+                                                            language=detected_language))
 
         # Limit to top 5 clauses for speed
         identified_clauses = identified_clauses[:5]
@@ -512,10 +446,11 @@ def analyze_document_fast_multilingual_sync(doc_id):
         
         # Store results in MongoDB
         db_mgr = get_db_manager()
-        db_mgr.store_analysis_result(doc_id, analysis, processing_time, {
+        analysis_id = db_mgr.store_analysis_result(doc_id, analysis, processing_time, {
             'summarizer': 'extractive',
             'language': detected_language,
-            'analysis_type': 'fast_multilingual'
+            'analysis_type': 'fast_multilingual',
+            'pipeline': 'fast'
         })
         
         # Update document status
@@ -523,6 +458,7 @@ def analyze_document_fast_multilingual_sync(doc_id):
         
         result = {
             'document_id': doc_id, 
+            'analysis_id': analysis_id,
             'analysis': analysis,
             'language_info': {
                 'detected_language': detected_language,
@@ -0,0 +1,107 @@
+"""
+Near-duplicate contract detection.
+
+At upload each document gets a MinHash signature of its word shingles
+(utils.minhash), stored base64-encoded in ``documents.minhash`` (512 bytes
+at the default 128 positions) and filed in an LSH index in Redis:
+
+    lsh:{user_id}:{band}:{bucket}   set of document ids sharing that band
+    lsh:{user_id}:sigs              hash of document id -> raw signature
+
+Indexes are per user, so lookups never cross accounts. A query reads one
+bucket per band and ranks the candidates by estimated Jaccard similarity,
+so its cost depends on the number of near-duplicates rather than on the
+number of documents. scripts/build_lsh_index.py rebuilds the index from
+the stored signatures.
+"""
+
+import os
+import time
+import logging
+from functools import lru_cache
+
+import metrics
+from config import config
+from redis_client import get_redis
+from utils.minhash import MinHasher, LSHIndex, encode_signature, decode_signature
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+
+@lru_cache(maxsize=1)
+def get_hasher():
+    cfg = config[env]
+    return MinHasher(cfg.MINHASH_NUM_PERM, cfg.MINHASH_SHINGLE_SIZE)
+
+
+class RedisLSHIndex(LSHIndex):
+    """LSHIndex whose buckets and signatures are kept in Redis under ``lsh:{scope}:``."""
+
+    def __init__(self, scope, redis=None, bands=None):
+        super().__init__(bands or config[env].MINHASH_BANDS)
+        self.redis = redis or get_redis()
+        self.prefix = f"lsh:{scope}"
+
+    def add(self, doc_id, signature):
+        pipe = self.redis.pipeline()
+        for key in self.band_keys(signature):
+            pipe.sadd(f"{self.prefix}:{key}", doc_id)
+        pipe.hset(f"{self.prefix}:sigs", doc_id, signature.astype('<u4').tobytes())
+        pipe.execute()
+
+    def remove(self, doc_id):
+        raw = self.redis.hget(f"{self.prefix}:sigs", doc_id)
+        if raw is None:
+            return
+        pipe = self.redis.pipeline()
+        for key in self.band_keys(decode_signature(raw)):
+            pipe.srem(f"{self.prefix}:{key}", doc_id)
+        pipe.hdel(f"{self.prefix}:sigs", doc_id)
+        pipe.execute()
+
+    def _candidates(self, keys):
+        members = self.redis.sunion([f"{self.prefix}:{key}" for key in keys])
+        return {member.decode() for member in members}
+
+    def _signatures(self, doc_ids):
+        doc_ids = sorted(doc_ids)
+        if not doc_ids:
+            return {}
+        raws = self.redis.hmget(f"{self.prefix}:sigs", doc_ids)
+        return {doc_id: decode_signature(raw) for doc_id, raw in zip(doc_ids, raws) if raw is not None}
+
+
+def compute_signature(text):
+    """Base64 MinHash signature of a document text (the documents.minhash value)."""
+    started = time.time()
+    signature = encode_signature(get_hasher().signature(text))
+    metrics.observe('minhash_signature_seconds', time.time() - started)
+    return signature
+
+
+def index_document(user_id, doc_id, signature):
+    """File a document's stored signature in its owner's LSH index."""
+    RedisLSHIndex(user_id).add(doc_id, decode_signature(signature))
+
+
+def find_similar(user_id, doc_id, signature, threshold=None, limit=20):
+    """
+    Indexed documents of a user that are near-duplicates of a document.
+
+    Args:
+        user_id: Owner (index scope)
+        doc_id: The document itself (excluded from the results)
+        signature: Its stored signature
+        threshold: Minimum estimated Jaccard similarity (NEAR_DUPLICATE_THRESHOLD)
+        limit: Maximum number of results
+
+    Returns:
+        list: [(document_id, jaccard)], most similar first
+    """
+    threshold = config[env].NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+    started = time.time()
+    similar = RedisLSHIndex(user_id).query(decode_signature(signature), threshold, limit, exclude=doc_id)
+    metrics.observe('near_duplicate_query_seconds', time.time() - started)
+    return similar
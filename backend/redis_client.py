@@ -0,0 +1,33 @@
+"""
+Redis client initializer for Legistra.
+Provides a singleton Redis client shared by admission control, metrics and
+caches. Celery keeps its own connections to the same server.
+"""
+
+import os
+import logging
+
+import redis
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Singleton client
+# ---------------------------------------------------------------------------
+_redis_client: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    """Return (and lazily create) the Redis client singleton."""
+    global _redis_client
+    if _redis_client is None:
+        env = os.getenv("FLASK_ENV", "development")
+        url = config[env].REDIS_URL
+        _redis_client = redis.Redis.from_url(
+            url,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+        logger.info("Redis client initialised (%s)", url)
+    return _redis_client
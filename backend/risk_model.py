@@ -0,0 +1,148 @@
+"""
+Per-clause risk scoring with the fine-tuned risk classifier.
+
+The sequence classifier trained by ``ml/models/fine_tune_risk_classification.py``
+(labels low / medium / high, see utils.risk_scores) scores every extracted
+clause of a document. Clause texts are sorted by length and run in padded
+batches of RISK_MODEL_BATCH_SIZE, so a typical document is a single forward
+pass and long and short clauses are not padded to each other's length.
+
+The (clauses x labels) probability matrix is stored with the analysis as
+float16 bytes (``pack_probs``) and aggregated into a document risk score
+and level, which the dashboard uses instead of counting risk strings.
+RISK_MODEL_BACKEND=pytorch-int8 quantizes the Linear layers to int8, as
+for the clause model; ``scripts/benchmark_risk_model.py`` compares
+backends and batch sizes.
+
+Probabilities are cached per normalized clause text (clause_cache.py), so
+boilerplate clauses seen in any earlier document skip the model.
+"""
+
+import os
+import time
+import logging
+import threading
+
+import numpy as np
+
+import metrics
+import model_store
+import clause_cache
+from config import config
+from summarizer_backends import PYTORCH, PYTORCH_INT8
+from utils.clause_spans import clause_text
+from utils.risk_scores import RISK_LABELS, pack_probs, document_score, risk_level
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+BACKENDS = (PYTORCH, PYTORCH_INT8)
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def load_model(model_dir=None, backend=None):
+    """Load the risk classifier once per process and backend (eval mode, CPU)."""
+    model_dir = model_dir or config[env].RISK_MODEL_DIR
+    backend = backend or config[env].RISK_MODEL_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown risk model backend '{backend}', expected one of {', '.join(BACKENDS)}")
+    with _models_lock:
+        if (model_dir, backend) not in _models:
+            import torch
+            from transformers import AutoModelForSequenceClassification
+            path, kwargs = model_store.resolve(model_dir)
+            model = AutoModelForSequenceClassification.from_pretrained(path, **kwargs)
+            model.eval()
+            if backend == PYTORCH_INT8:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info(f"Loaded risk model from {path} ({backend})")
+            _models[(model_dir, backend)] = model
+        return _models[(model_dir, backend)]
+
+
+def length_batches(lengths, batch_size):
+    """Index batches of at most ``batch_size`` items with similar lengths."""
+    order = np.argsort(lengths, kind='stable')
+    return [order[i:i + batch_size].tolist() for i in range(0, len(order), batch_size)]
+
+
+def score_texts(texts, model, tokenizer, batch_size, max_tokens=512):
+    """
+    Class probabilities of every text.
+
+    Returns:
+        numpy.ndarray: (len(texts), num_labels) float32, in input order
+    """
+    import torch
+
+    probs = np.zeros((len(texts), model.config.num_labels), dtype=np.float32)
+    if not texts:
+        return probs
+    encoded = tokenizer(texts, truncation=True, max_length=max_tokens)['input_ids']
+    for batch in length_batches([len(ids) for ids in encoded], batch_size):
+        inputs = tokenizer.pad({'input_ids': [encoded[i] for i in batch]}, return_tensors='pt')
+        with torch.inference_mode():
+            logits = model(**inputs).logits
+        probs[batch] = torch.softmax(logits, dim=-1).numpy()
+    return probs
+
+
+def score_clauses(text, clauses, backend=None, known=None):
+    """
+    Score every clause of a document and aggregate a document risk score.
+
+    Args:
+        text: Document text the clause spans refer to
+        clauses: Clause records (see utils.clause_spans)
+        backend: One of BACKENDS (defaults to RISK_MODEL_BACKEND)
+        known: {clause index: probabilities} already computed (e.g. for
+               clauses unchanged since the previous version); the other
+               clauses are looked up in the clause cache and only the
+               misses are run through the model
+
+    Returns:
+        dict: {'probs': packed float16 matrix (clauses x labels),
+               'clause_levels': most likely label per clause,
+               'score': document score in [0, 1], 'level': low/medium/high}
+    """
+    cfg = config[env]
+    backend = backend or cfg.RISK_MODEL_BACKEND
+    known = dict(known or {})
+    pending = [i for i in range(len(clauses)) if i not in known]
+
+    # Boilerplate clauses scored in any earlier document
+    revision = clause_cache.model_revision(cfg.RISK_MODEL_DIR, backend, max_tokens=cfg.RISK_MODEL_MAX_TOKENS)
+    pending_texts = [clause_text(text, clauses[i]) for i in pending]
+    cached = clause_cache.get_many('risk', revision, pending_texts)
+    known.update({i: row for i, row in zip(pending, cached) if row is not None})
+    texts = [t for t, row in zip(pending_texts, cached) if row is None]
+    pending = [i for i, row in zip(pending, cached) if row is None]
+
+    started = time.time()
+    if texts:
+        model = load_model(cfg.RISK_MODEL_DIR, backend)
+        tokenizer = model_store.load_tokenizer(cfg.RISK_MODEL_DIR)
+        scored = score_texts(texts, model, tokenizer, cfg.RISK_MODEL_BATCH_SIZE, cfg.RISK_MODEL_MAX_TOKENS)
+        clause_cache.put_many('risk', revision, texts, scored.tolist())
+    else:
+        scored = np.zeros((0, len(RISK_LABELS)), dtype=np.float32)
+    elapsed = max(time.time() - started, 1e-6)
+
+    probs = np.zeros((len(clauses), scored.shape[1]), dtype=np.float32)
+    probs[pending] = scored
+    for i, row in known.items():
+        probs[i] = row
+
+    metrics.inc('risk_model_clauses_total', len(texts), backend=backend)
+    metrics.set_gauge('risk_model_clauses_per_second', len(texts) / elapsed, backend=backend)
+    logger.info(f"Risk model ({backend}): {len(texts)} clauses in {elapsed:.2f}s, "
+                f"{len(known)} reused or cached")
+
+    score = document_score(probs)
+    return {'probs': pack_probs(probs),
+            'clause_levels': [RISK_LABELS[i] for i in probs.argmax(axis=1)] if len(clauses) else [],
+            'score': score,
+            'level': risk_level(score, cfg.RISK_MEDIUM_THRESHOLD, cfg.RISK_HIGH_THRESHOLD)}
@@ -0,0 +1,236 @@
+"""
+Shortest-expected-job-first dispatcher for model-backed analysis tasks.
+
+Instead of pushing every analysis straight onto the FIFO Celery queue,
+jobs are held in a Redis sorted set scored by
+
+    score = enqueued_at + SCHED_AGING_FACTOR * predicted_seconds
+
+so short jobs overtake long ones that arrived shortly before them, while a
+long job can be overtaken for at most ``SCHED_AGING_FACTOR * predicted``
+seconds - it ages into the front of the queue instead of starving.
+
+The dispatcher keeps each Celery queue (the inference queue and the
+optional long-job queue) at most ``SCHED_DISPATCH_DEPTH`` deep and moves
+the best-scored jobs into it whenever a job is submitted, an inference
+task finishes, or the periodic dispatch task runs. A full long-job queue
+never holds back short jobs. Jobs are claimed by a Lua script that checks
+the depth and removes them from the pending set atomically, so concurrent
+dispatchers cannot overfill a queue. Task ids are
+assigned at submission, so callers get a normal AsyncResult immediately.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+
+import cost_model
+from config import config
+from redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+PENDING_KEY = "sched:pending"
+JOB_KEY = "sched:job:{}"
+JOB_TTL_SECONDS = 24 * 3600
+
+# Jobs claimed for a queue but not yet sent to Celery; lapses if a
+# dispatcher dies between claiming and sending
+RESERVED_KEY = "sched:reserved:{}"
+RESERVED_TTL_SECONDS = 60
+
+# Claims the best-scored pending jobs whose target queue has room, in score
+# order, counting claimed-but-unsent jobs against the queue depth. Returns
+# [task_id, queue, ...]; the queue is '' for jobs whose hash expired.
+# KEYS[1] pending zset
+# ARGV: depth, number of queues, job key prefix, reserved key prefix, reserved TTL
+DISPATCH_SCRIPT = """
+local depth = tonumber(ARGV[1])
+local queue_count = tonumber(ARGV[2])
+local claimed = {}
+local full, full_count = {}, 0
+local offset = 0
+while full_count < queue_count do
+    local page = redis.call('ZRANGE', KEYS[1], offset, offset + 99)
+    if #page == 0 then break end
+    local removed = 0
+    for _, task_id in ipairs(page) do
+        local queue = redis.call('HGET', ARGV[3] .. task_id, 'queue')
+        if not queue then
+            redis.call('ZREM', KEYS[1], task_id)
+            removed = removed + 1
+            table.insert(claimed, task_id)
+            table.insert(claimed, '')
+        elseif not full[queue] then
+            local reserved_key = ARGV[4] .. queue
+            local used = redis.call('LLEN', queue) + tonumber(redis.call('GET', reserved_key) or '0')
+            if used < depth then
+                redis.call('ZREM', KEYS[1], task_id)
+                removed = removed + 1
+                redis.call('INCR', reserved_key)
+                redis.call('EXPIRE', reserved_key, tonumber(ARGV[5]))
+                table.insert(claimed, task_id)
+                table.insert(claimed, queue)
+            else
+                full[queue] = true
+                full_count = full_count + 1
+                if full_count >= queue_count then break end
+            end
+        end
+    end
+    offset = offset + #page - removed
+end
+return claimed
+"""
+
+_dispatch_script = None
+
+
+def _cfg():
+    return config[env]
+
+
+def _queue_for(predicted_seconds):
+    """Route long jobs to a dedicated queue when one is configured."""
+    cfg = _cfg()
+    if cfg.SCHED_LONG_QUEUE and predicted_seconds >= cfg.SCHED_LONG_JOB_SECONDS:
+        return cfg.SCHED_LONG_QUEUE
+    return cfg.INFERENCE_QUEUE
+
+
+def submit(task_name, args, text_length=0, document_type=None, language=None, pipeline='bart', deadline_at=None):
+    """
+    Schedule a model-backed task by its predicted cost.
+
+    A job with a deadline (epoch seconds) is scored no later than the
+    deadline, so it overtakes long jobs that would make it miss it.
+
+    Returns:
+        AsyncResult for the (not yet dispatched) task
+    """
+    from celery_app import celery_app
+
+    predicted = cost_model.estimate_seconds(text_length, document_type, language, pipeline)
+    task_id = str(uuid.uuid4())
+    now = time.time()
+    score = now + _cfg().SCHED_AGING_FACTOR * predicted
+    if deadline_at is not None:
+        score = min(score, deadline_at)
+
+    r = get_redis()
+    pipe = r.pipeline()
+    pipe.hset(JOB_KEY.format(task_id), mapping={
+        'task_name': task_name,
+        'args': json.dumps(args),
+        'predicted': predicted,
+        'enqueued_at': now,
+        'queue': _queue_for(predicted),
+        'pipeline': pipeline,
+    })
+    pipe.expire(JOB_KEY.format(task_id), JOB_TTL_SECONDS)
+    pipe.zadd(PENDING_KEY, {task_id: score})
+    pipe.execute()
+    logger.info(f"Scheduled {task_name} {task_id} (predicted {predicted}s, pipeline {pipeline})")
+
+    dispatch()
+    return celery_app.AsyncResult(task_id)
+
+
+def dispatch():
+    """Move the best-scored pending jobs into Celery while their queues are shallow."""
+    from celery_app import celery_app
+    global _dispatch_script
+
+    r = get_redis()
+    cfg = _cfg()
+    queues = [cfg.INFERENCE_QUEUE] + ([cfg.SCHED_LONG_QUEUE] if cfg.SCHED_LONG_QUEUE else [])
+    if _dispatch_script is None:
+        _dispatch_script = r.register_script(DISPATCH_SCRIPT)
+    claimed = _dispatch_script(keys=[PENDING_KEY], client=r, args=[
+        cfg.SCHED_DISPATCH_DEPTH, len(queues), JOB_KEY.format(''), RESERVED_KEY.format(''), RESERVED_TTL_SECONDS])
+    claimed = [c.decode() if isinstance(c, bytes) else c for c in claimed]
+
+    dispatched = 0
+    for task_id, queue in zip(claimed[::2], claimed[1::2]):
+        if not queue:
+            logger.warning(f"Scheduled job {task_id} expired before dispatch")
+            continue
+        try:
+            job = {k.decode(): v.decode() for k, v in r.hgetall(JOB_KEY.format(task_id)).items()}
+            if not job:
+                logger.warning(f"Scheduled job {task_id} expired before dispatch")
+                continue
+            celery_app.send_task(job['task_name'], args=json.loads(job['args']),
+                                 task_id=task_id, queue=queue)
+            r.hset(JOB_KEY.format(task_id), 'dispatched_at', time.time())
+            dispatched += 1
+        finally:
+            r.decr(RESERVED_KEY.format(queue))
+    return dispatched
+
+
+def mark_started(task_id):
+    """Record when a scheduled task started running (for ETAs)."""
+    r = get_redis()
+    if r.exists(JOB_KEY.format(task_id)):
+        r.hset(JOB_KEY.format(task_id), 'started_at', time.time())
+
+
+def complete(task_id):
+    """
+    Forget a finished job and return (predicted, actual) seconds, or None if
+    the task was not scheduled through this dispatcher.
+    """
+    r = get_redis()
+    job = {k.decode(): v.decode() for k, v in r.hgetall(JOB_KEY.format(task_id)).items()}
+    if not job:
+        return None
+    r.delete(JOB_KEY.format(task_id))
+    started = float(job.get('started_at') or job.get('dispatched_at') or job['enqueued_at'])
+    return float(job['predicted']), time.time() - started
+
+
+def eta(task_id):
+    """
+    Predicted timing for a scheduled task, for the task-status response.
+
+    Returns:
+        dict with predicted_seconds, eta_seconds and (while waiting)
+        queue_position; empty if the task is unknown to the scheduler
+    """
+    try:
+        r = get_redis()
+        job = {k.decode(): v.decode() for k, v in r.hgetall(JOB_KEY.format(task_id)).items()}
+        if not job:
+            return {}
+        predicted = float(job['predicted'])
+        now = time.time()
+        slots = max(1, _cfg().SCHED_WORKER_SLOTS)
+
+        if job.get('started_at'):
+            remaining = max(0.0, predicted - (now - float(job['started_at'])))
+            return {'predicted_seconds': predicted, 'eta_seconds': round(remaining, 1)}
+
+        rank = r.zrank(PENDING_KEY, task_id)
+        if rank is None:
+            # Dispatched to Celery, waiting for a worker slot
+            return {'predicted_seconds': predicted, 'eta_seconds': round(predicted, 1), 'queue_position': 0}
+
+        ahead = r.zrange(PENDING_KEY, 0, rank - 1) if rank > 0 else []
+        pipe = r.pipeline()
+        for other in ahead:
+            other_id = other.decode() if isinstance(other, bytes) else other
+            pipe.hget(JOB_KEY.format(other_id), 'predicted')
+        wait = sum(float(p) for p in pipe.execute() if p) / slots if ahead else 0.0
+        return {
+            'predicted_seconds': predicted,
+            'eta_seconds': round(wait + predicted, 1),
+            'queue_position': rank + 1,
+        }
+    except Exception as e:
+        logger.warning(f"Could not compute ETA for {task_id}: {str(e)}")
+        return {}
@@ -0,0 +1,99 @@
+"""
+Benchmark the sliding-window clause model on held-out contracts.
+
+Runs ``clause_model`` on the same documents for every backend and batch
+size and reports, per run:
+
+    * windows per second and documents per second
+    * clause-character agreement (F1) with the fp32 batch-size-1 spans
+
+The fp32 run at batch size 1 is the reference, so its agreement is 1.0 by
+definition; padding and int8 quantization should stay close to it.
+
+Usage:
+    python scripts/benchmark_clause_model.py --contracts DIR [--backends pytorch,pytorch-int8]
+        [--batch-sizes 1,8] [--limit N] [--json OUT]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import clause_model
+from clause_model import BACKENDS, PYTORCH
+from benchmark_summarizer import load_contracts
+from config import config
+
+env = os.getenv('FLASK_ENV', 'development')
+
+
+def _covered(clauses):
+    return {i for clause in clauses for i in range(clause['start'], clause['end'])}
+
+
+def agreement(clauses, reference):
+    """F1 of the characters covered by clauses against the reference clauses."""
+    predicted, expected = _covered(clauses), _covered(reference)
+    if not predicted and not expected:
+        return 1.0
+    overlap = len(predicted & expected)
+    return round(2 * overlap / (len(predicted) + len(expected)), 4)
+
+
+def run(texts, backend, batch_size):
+    """Extract clauses from every text on one backend/batch size and time it."""
+    cfg = config[env]
+    cfg.CLAUSE_MODEL_BATCH_SIZE = batch_size
+    clause_model.load_model(cfg.CLAUSE_MODEL_DIR, backend)
+    # Tokenize (and cache) up front so only windowing and inference are timed
+    for text in texts:
+        clause_model.tokenize_document(text, cfg.CLAUSE_MODEL_DIR)
+
+    windows, results = 0, []
+    started = time.time()
+    for text in texts:
+        results.append(clause_model.extract_clauses(text, backend=backend))
+        tokens = clause_model.tokenize_document(text, cfg.CLAUSE_MODEL_DIR)
+        windows += len(clause_model.window_bounds(len(tokens), tokens.window_size(cfg.CLAUSE_MODEL_WINDOW),
+                                                  cfg.CLAUSE_MODEL_OVERLAP))
+    seconds = time.time() - started
+    return results, {'windows': windows,
+                     'windows_per_second': round(windows / seconds, 2),
+                     'documents_per_second': round(len(texts) / seconds, 3)}
+
+
+def benchmark(texts, backends, batch_sizes):
+    """Return per (backend, batch size) throughput and agreement with fp32 at batch size 1."""
+    reference, _ = run(texts, PYTORCH, 1)
+    report = {}
+    for backend in backends:
+        for batch_size in batch_sizes:
+            results, stats = run(texts, backend, batch_size)
+            stats['agreement'] = round(sum(agreement(r, ref) for r, ref in zip(results, reference)) / len(texts), 4)
+            report[f'{backend}@{batch_size}'] = stats
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the clause model backends and batch sizes')
+    parser.add_argument('--contracts', required=True, help='Directory of held-out contract .txt files')
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--batch-sizes', default='1,8')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--json', default=None, help='Also write the report to this file')
+    args = parser.parse_args()
+
+    texts = load_contracts(args.contracts, args.limit)
+    report = benchmark(texts, args.backends.split(','), [int(b) for b in args.batch_sizes.split(',')])
+
+    print(f"{'run':<18}{'windows':>9}{'win/s':>9}{'docs/s':>9}{'agree':>8}")
+    for name, s in report.items():
+        print(f"{name:<18}{s['windows']:>9}{s['windows_per_second']:>9}{s['documents_per_second']:>9}"
+              f"{s['agreement']:>8}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
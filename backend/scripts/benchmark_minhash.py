@@ -0,0 +1,124 @@
+"""
+Benchmark MinHash signatures and the LSH index on synthetic corpora.
+
+Generates documents of random words from a fixed vocabulary and plants a
+near-duplicate (a copy with ``--edit-rate`` of its words replaced) for one
+document in every hundred. For each corpus size it reports:
+
+    * signature time per document
+    * index build time (every signature filed in the index)
+    * query latency p50/p95 and the mean number of candidates read
+    * recall of the planted pairs at NEAR_DUPLICATE_THRESHOLD (a 1% word
+      edit rate with 5-word shingles leaves a Jaccard similarity near 0.9), and
+      the time of a brute-force scan of all signatures for comparison
+
+The in-memory index is used by default; ``--redis`` builds the same index
+in Redis under the ``lsh:benchmark`` scope (removed afterwards).
+
+Usage:
+    python scripts/benchmark_minhash.py [--sizes 1000,10000,100000] [--words 600]
+        [--edit-rate 0.01] [--queries 1000] [--redis] [--json OUT]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import config
+from utils.minhash import MinHasher, LSHIndex, jaccard
+
+env = os.getenv('FLASK_ENV', 'development')
+
+
+def corpus(size, words, edit_rate, seed=0):
+    """({doc_id: text}, [(original, near-duplicate)]) with one planted pair per hundred documents."""
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"w{i}" for i in range(20000)])
+    texts, pairs = {}, []
+    for i in range(size - size // 100):
+        texts[f"d{i}"] = rng.choice(vocabulary, words)
+    for i in range(size // 100):
+        copy = texts[f"d{i}"].copy()
+        edits = rng.choice(words, int(words * edit_rate), replace=False)
+        copy[edits] = rng.choice(vocabulary, len(edits))
+        texts[f"n{i}"] = copy
+        pairs.append((f"d{i}", f"n{i}"))
+    return {doc_id: ' '.join(tokens) for doc_id, tokens in texts.items()}, pairs
+
+
+def make_index(bands, redis):
+    if not redis:
+        return LSHIndex(bands)
+    from near_duplicates import RedisLSHIndex
+    return RedisLSHIndex('benchmark', bands=bands)
+
+
+def benchmark(size, words, edit_rate, queries, redis=False):
+    cfg = config[env]
+    hasher = MinHasher(cfg.MINHASH_NUM_PERM, cfg.MINHASH_SHINGLE_SIZE)
+    texts, pairs = corpus(size, words, edit_rate)
+
+    started = time.time()
+    signatures = {doc_id: hasher.signature(text) for doc_id, text in texts.items()}
+    signature_seconds = time.time() - started
+
+    index = make_index(cfg.MINHASH_BANDS, redis)
+    started = time.time()
+    for doc_id, signature in signatures.items():
+        index.add(doc_id, signature)
+    build_seconds = time.time() - started
+
+    threshold = cfg.NEAR_DUPLICATE_THRESHOLD
+    latencies, candidates, found = [], [], 0
+    for original, duplicate in pairs[:queries]:
+        started = time.time()
+        results = index.query(signatures[original], threshold, exclude=original)
+        latencies.append(time.time() - started)
+        candidates.append(len(index._candidates(index.band_keys(signatures[original]))))
+        found += duplicate in {doc_id for doc_id, _ in results}
+    probe = signatures[pairs[0][0]] if pairs else next(iter(signatures.values()))
+    started = time.time()
+    for signature in signatures.values():
+        jaccard(probe, signature)
+    scan_seconds = time.time() - started
+
+    if redis:
+        for doc_id in signatures:
+            index.remove(doc_id)
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {'documents': len(texts),
+            'signature_ms_per_doc': round(signature_seconds * 1000 / len(texts), 3),
+            'build_seconds': round(build_seconds, 3),
+            'query_p50_ms': round(float(np.percentile(ms, 50)), 3),
+            'query_p95_ms': round(float(np.percentile(ms, 95)), 3),
+            'mean_candidates': round(float(np.mean(candidates)), 2) if candidates else 0.0,
+            'recall': round(found / len(latencies), 4) if latencies else None,
+            'brute_force_scan_ms': round(scan_seconds * 1000, 3)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark MinHash signatures and LSH lookups')
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--words', type=int, default=600, help='Words per synthetic document')
+    parser.add_argument('--edit-rate', type=float, default=0.01, help='Share of words changed in duplicates')
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--redis', action='store_true', help='Build the index in Redis')
+    parser.add_argument('--json', default=None, help='Also write the report to this file')
+    args = parser.parse_args()
+
+    report = {size: benchmark(int(size), args.words, args.edit_rate, args.queries, args.redis)
+              for size in args.sizes.split(',')}
+
+    print(f"{'docs':>8}{'sig ms':>9}{'build s':>9}{'p50 ms':>9}{'p95 ms':>9}{'cands':>8}{'recall':>8}{'scan ms':>10}")
+    for s in report.values():
+        print(f"{s['documents']:>8}{s['signature_ms_per_doc']:>9}{s['build_seconds']:>9}{s['query_p50_ms']:>9}"
+              f"{s['query_p95_ms']:>9}{s['mean_candidates']:>8}{s['recall']:>8}{s['brute_force_scan_ms']:>10}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
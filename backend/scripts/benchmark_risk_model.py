@@ -0,0 +1,88 @@
+"""
+Benchmark the risk classifier on the clauses of held-out contracts.
+
+Extracts clauses from every contract with the regex clause stage, then
+scores them with ``risk_model`` for every backend and batch size and
+reports, per run:
+
+    * clauses per second and documents per second
+    * the largest absolute probability difference from fp32 at batch
+      size 1, and how often the most likely label agrees with it
+
+Usage:
+    python scripts/benchmark_risk_model.py --contracts DIR [--backends pytorch,pytorch-int8]
+        [--batch-sizes 1,8,32] [--limit N] [--json OUT]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import model_store
+import risk_model
+from risk_model import BACKENDS, PYTORCH
+from benchmark_summarizer import load_contracts
+from config import config
+from tasks import extract_clauses
+from utils.clause_spans import clause_text
+
+env = os.getenv('FLASK_ENV', 'development')
+
+
+def run(documents, backend, batch_size):
+    """Score every document's clauses on one backend/batch size and time it."""
+    cfg = config[env]
+    model = risk_model.load_model(cfg.RISK_MODEL_DIR, backend)
+    tokenizer = model_store.load_tokenizer(cfg.RISK_MODEL_DIR)
+
+    results = []
+    started = time.time()
+    for texts in documents:
+        results.append(risk_model.score_texts(texts, model, tokenizer, batch_size, cfg.RISK_MODEL_MAX_TOKENS))
+    seconds = time.time() - started
+    clauses = sum(len(texts) for texts in documents)
+    return np.concatenate(results), {'clauses': clauses,
+                                     'clauses_per_second': round(clauses / seconds, 2),
+                                     'documents_per_second': round(len(documents) / seconds, 3)}
+
+
+def benchmark(texts, backends, batch_sizes):
+    """Return per (backend, batch size) throughput and parity with fp32 at batch size 1."""
+    documents = [[clause_text(text, clause) for clause in extract_clauses(text)] for text in texts]
+    reference, _ = run(documents, PYTORCH, 1)
+    report = {}
+    for backend in backends:
+        for batch_size in batch_sizes:
+            probs, stats = run(documents, backend, batch_size)
+            stats['max_prob_diff'] = round(float(np.abs(probs - reference).max()), 4) if len(probs) else 0.0
+            stats['label_agreement'] = round(float((probs.argmax(1) == reference.argmax(1)).mean()), 4) \
+                if len(probs) else 1.0
+            report[f'{backend}@{batch_size}'] = stats
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the risk classifier backends and batch sizes')
+    parser.add_argument('--contracts', required=True, help='Directory of held-out contract .txt files')
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--batch-sizes', default='1,8,32')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--json', default=None, help='Also write the report to this file')
+    args = parser.parse_args()
+
+    texts = load_contracts(args.contracts, args.limit)
+    report = benchmark(texts, args.backends.split(','), [int(b) for b in args.batch_sizes.split(',')])
+
+    print(f"{'run':<18}{'clauses':>9}{'clause/s':>10}{'docs/s':>9}{'max diff':>10}{'agree':>8}")
+    for name, s in report.items():
+        print(f"{name:<18}{s['clauses']:>9}{s['clauses_per_second']:>10}{s['documents_per_second']:>9}"
+              f"{s['max_prob_diff']:>10}{s['label_agreement']:>8}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
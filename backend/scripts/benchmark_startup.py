@@ -0,0 +1,108 @@
+"""
+Measure import time and memory of each process entry point.
+
+Each entry point is imported in a fresh interpreter, like a newly forked
+gunicorn worker or Celery child, and the script reports:
+
+    * wall time of the import (median over --runs)
+    * resident set size after the import
+    * which heavy ML modules the import pulled in
+
+The web tier only enqueues tasks by name, so ``app`` must not load any of
+HEAVY_MODULES. Exits non-zero when an entry point breaks its budget, so CI
+can run it directly (``tests/test_startup.py`` does the same through pytest).
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 5] [--json OUT]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that belong to model workers only
+HEAVY_MODULES = ('torch', 'transformers', 'sentence_transformers', 'pandas', 'evidently',
+                 'onnxruntime', 'optimum', 'reportlab')
+
+# module: (max import seconds, max RSS in MB, heavy modules allowed)
+BUDGETS = {
+    'app': (3.0, 200, False),
+    'tasks': (5.0, 300, False),
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+rss_kb = 0
+with open('/proc/self/status') as f:
+    for line in f:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+if not rss_kb:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+heavy = {heavy!r}
+print(json.dumps({{'seconds': seconds, 'rss_mb': rss_kb / 1024,
+                  'heavy': sorted(m for m in heavy if m in sys.modules)}}))
+"""
+
+
+def measure(module, runs=3):
+    """Import ``module`` in ``runs`` fresh interpreters and summarise."""
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                             cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        'module': module,
+        'seconds': round(statistics.median(s['seconds'] for s in samples), 3),
+        'rss_mb': round(statistics.median(s['rss_mb'] for s in samples), 1),
+        'heavy': samples[-1]['heavy'],
+    }
+
+
+def violations(result):
+    """Budget violations for one measurement, as readable strings."""
+    max_seconds, max_rss_mb, heavy_allowed = BUDGETS[result['module']]
+    problems = []
+    if result['seconds'] > max_seconds:
+        problems.append(f"import took {result['seconds']}s (budget {max_seconds}s)")
+    if result['rss_mb'] > max_rss_mb:
+        problems.append(f"RSS {result['rss_mb']}MB (budget {max_rss_mb}MB)")
+    if result['heavy'] and not heavy_allowed:
+        problems.append(f"imported {', '.join(result['heavy'])}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    report, failed = [], False
+    for module in BUDGETS:
+        result = measure(module, args.runs)
+        result['violations'] = violations(result)
+        failed = failed or bool(result['violations'])
+        report.append(result)
+        print(f"{module:<6} {result['seconds']:>6.2f}s  {result['rss_mb']:>7.1f}MB  "
+              f"heavy: {', '.join(result['heavy']) or '-'}  "
+              f"{'; '.join(result['violations']) or 'within budget'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
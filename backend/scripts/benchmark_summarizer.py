@@ -0,0 +1,133 @@
+"""
+Compare summarizer backends on held-out contracts.
+
+Runs every backend on the same model inputs (compressed and truncated like
+``analyze_document_task``'s) with its generation parameters and reports,
+per backend:
+
+    * latency per document (mean / p50 / p95, batch size 1)
+    * throughput in documents per second at ``--batch-size``
+    * ROUGE-1/2/L of its summaries against the fp32 PyTorch summaries
+
+The fp32 backend is the reference, so its ROUGE is 1.0 by definition. A
+backend with ROUGE-L parity close to 1.0 can be switched to without a
+visible change in summaries.
+
+Usage:
+    python scripts/benchmark_summarizer.py --contracts DIR [--backends pytorch,pytorch-int8,onnx]
+        [--limit N] [--batch-size N] [--json OUT]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from inference_client import DEFAULT_SUMMARIZER
+from summarizer_backends import BACKENDS, PYTORCH, build_summarizer
+
+GENERATION_PARAMS = {'max_length': 150, 'min_length': 30, 'do_sample': False}
+
+
+def load_contracts(directory, limit=None):
+    """Read held-out contracts (.txt files) from a directory."""
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.txt'):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                texts.append(f.read())
+        if limit and len(texts) >= limit:
+            break
+    return texts
+
+
+def truncate(texts, model_name, max_tokens=1024):
+    """
+    Fit each text into the model window the same way the analysis tasks do:
+    compressed per SUMMARY_INPUT_MODE (salience by default), then truncated.
+    """
+    import model_store
+    from input_compression import compress
+    from tokenization import tokenize_document
+
+    tokenizer = model_store.load_tokenizer(model_name)
+    fitted = []
+    for text in texts:
+        input_ids = compress(tokenize_document(text, model_name), text, max_tokens).truncated(max_tokens)
+        fitted.append(tokenizer.decode(input_ids, skip_special_tokens=True))
+    return fitted
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def run_backend(backend, texts, model_name, batch_size):
+    """Summarize every text on one backend and time it."""
+    started = time.time()
+    summarizer = build_summarizer(model_name, backend)
+    load_seconds = time.time() - started
+
+    summaries, latencies = [], []
+    for text in texts:
+        started = time.time()
+        summaries.append(summarizer(text, **GENERATION_PARAMS)[0]['summary_text'])
+        latencies.append(time.time() - started)
+
+    started = time.time()
+    summarizer(texts, batch_size=batch_size, **GENERATION_PARAMS)
+    batch_seconds = time.time() - started
+
+    return summaries, {
+        'load_seconds': round(load_seconds, 2),
+        'latency_mean': round(statistics.mean(latencies), 3),
+        'latency_p50': round(_percentile(latencies, 0.5), 3),
+        'latency_p95': round(_percentile(latencies, 0.95), 3),
+        'throughput_docs_per_second': round(len(texts) / batch_seconds, 3),
+    }
+
+
+def benchmark(texts, backends, model_name=DEFAULT_SUMMARIZER, batch_size=4):
+    """Return per-backend timing and ROUGE parity against fp32."""
+    import evaluate
+    rouge = evaluate.load('rouge')
+
+    texts = truncate(texts, model_name)
+    reference, report = None, {}
+    for backend in [PYTORCH] + [b for b in backends if b != PYTORCH]:
+        summaries, stats = run_backend(backend, texts, model_name, batch_size)
+        if reference is None:
+            reference = summaries
+        scores = rouge.compute(predictions=summaries, references=reference)
+        stats.update({k: round(float(scores[k]), 4) for k in ('rouge1', 'rouge2', 'rougeL')})
+        report[backend] = stats
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark summarizer backends')
+    parser.add_argument('--contracts', required=True, help='Directory of held-out contract .txt files')
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--model', default=DEFAULT_SUMMARIZER)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--json', default=None, help='Also write the report to this file')
+    args = parser.parse_args()
+
+    texts = load_contracts(args.contracts, args.limit)
+    report = benchmark(texts, args.backends.split(','), args.model, args.batch_size)
+
+    print(f"{'backend':<14}{'load s':>8}{'mean s':>9}{'p50 s':>9}{'p95 s':>9}{'docs/s':>9}"
+          f"{'R-1':>8}{'R-2':>8}{'R-L':>8}")
+    for backend, s in report.items():
+        print(f"{backend:<14}{s['load_seconds']:>8}{s['latency_mean']:>9}{s['latency_p50']:>9}"
+              f"{s['latency_p95']:>9}{s['throughput_docs_per_second']:>9}"
+              f"{s['rouge1']:>8}{s['rouge2']:>8}{s['rougeL']:>8}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,139 @@
+"""
+Compare aggregate inference throughput with and without the CPU topology.
+
+Runs the same CPU-bound workload in two configurations on this node:
+
+    default   --default-processes workers (the prefork default, one per
+              core) with the libraries' default thread pools, i.e. every
+              process starts one intra-op thread per visible core
+    topology  the ``inference`` role plan from topology.py (processes x
+              intra-op threads sized from the usable cores)
+
+and reports operations per second across all processes plus per-operation
+latency (p50 / p95). The workload is a BART-sized linear stack in torch
+when it is installed, else a numpy matmul of the same shape.
+
+Usage:
+    python scripts/benchmark_topology.py [--seconds 20] [--default-processes N]
+        [--hidden 1024] [--tokens 256] [--json OUT]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import topology
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def worker(threads, seconds, hidden, tokens, start, results):
+    """Run the workload until the deadline; report per-op latencies."""
+    # Thread pools read these at import, so set them before importing
+    for var in topology.THREAD_ENV_VARS:
+        if threads:
+            os.environ[var] = str(threads)
+        else:
+            os.environ.pop(var, None)
+    try:
+        import torch
+        if threads:
+            torch.set_num_threads(threads)
+            torch.set_num_interop_threads(1)
+        layers = [torch.nn.Linear(hidden, hidden) for _ in range(4)]
+        x = torch.randn(tokens, hidden)
+
+        def step():
+            with torch.no_grad():
+                y = x
+                for layer in layers:
+                    y = torch.relu(layer(y))
+    except ImportError:
+        import numpy as np
+        weights = [np.random.rand(hidden, hidden).astype(np.float32) for _ in range(4)]
+        x = np.random.rand(tokens, hidden).astype(np.float32)
+
+        def step():
+            y = x
+            for w in weights:
+                y = np.maximum(y @ w, 0)
+
+    step()  # warm up
+    start.wait()
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        began = time.perf_counter()
+        step()
+        latencies.append(time.perf_counter() - began)
+    results.put(latencies)
+
+
+def run(processes, threads, args):
+    ctx = multiprocessing.get_context('spawn')
+    start = ctx.Event()
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(threads, args.seconds, args.hidden, args.tokens, start, results))
+             for _ in range(processes)]
+    for p in procs:
+        p.start()
+    time.sleep(2)  # let every process import and warm up
+    start.set()
+    latencies = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    flat = [l for per_process in latencies for l in per_process]
+    return {
+        'processes': processes,
+        'threads_per_process': threads or 'library default',
+        'ops_per_second': round(len(flat) / args.seconds, 2),
+        'latency_mean_ms': round(statistics.mean(flat) * 1000, 1),
+        'latency_p50_ms': round(_percentile(flat, 0.5) * 1000, 1),
+        'latency_p95_ms': round(_percentile(flat, 0.95) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--default-processes', type=int, default=os.cpu_count() or 1,
+                        help='Processes in the default configuration (Celery prefork default: os.cpu_count())')
+    parser.add_argument('--hidden', type=int, default=1024, help='Hidden size (BART-large: 1024)')
+    parser.add_argument('--tokens', type=int, default=256, help='Rows per forward pass')
+    parser.add_argument('--json', help='Write the report to this file')
+    args = parser.parse_args()
+
+    plan = topology.plan(topology.INFERENCE)
+    print(f"Usable cores: {plan.cores} (cgroup quota: {topology.cgroup_cpu_limit() or 'none'}, "
+          f"os.cpu_count(): {os.cpu_count()})")
+
+    report = {
+        'cores': plan.cores,
+        'default': run(args.default_processes, None, args),
+        'topology': run(plan.processes, plan.intra_op_threads, args),
+    }
+    report['speedup'] = round(report['topology']['ops_per_second'] / max(report['default']['ops_per_second'], 1e-9), 2)
+
+    for name in ('default', 'topology'):
+        r = report[name]
+        print(f"{name:<9} {r['processes']:>3} procs x {str(r['threads_per_process']):<15} "
+              f"{r['ops_per_second']:>8.2f} ops/s  p50 {r['latency_p50_ms']:>7.1f}ms  p95 {r['latency_p95_ms']:>7.1f}ms")
+    print(f"Aggregate throughput: {report['speedup']}x the default")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Rebuild the near-duplicate LSH index in Redis from the stored signatures.
+
+Documents uploaded before near-duplicate detection, or whose signature was
+lost, are hashed from their content first with ``--backfill``. Run after
+changing MINHASH_BANDS, or with ``--clear`` to drop the existing
+``lsh:*`` keys first (required after changing MINHASH_NUM_PERM or
+MINHASH_SHINGLE_SIZE, together with ``--rehash``).
+
+Usage:
+    python scripts/build_lsh_index.py [--clear] [--backfill] [--rehash] [--page-size N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import near_duplicates
+from models_supabase import SupabaseDB
+from redis_client import get_redis
+
+
+def clear(redis):
+    """Delete every lsh:* key and return how many were removed."""
+    removed = 0
+    for key in redis.scan_iter(match='lsh:*', count=1000):
+        removed += redis.delete(key)
+    return removed
+
+
+def hash_documents(db, rehash, page_size):
+    """Compute signatures of documents without one (or all with ``rehash``)."""
+    hashed, offset = 0, 0
+    while True:
+        query = db.sb.table("documents").select("id, content, minhash").order("id")
+        rows = query.range(offset, offset + page_size - 1).execute().data or []
+        for row in rows:
+            if rehash or not row.get('minhash'):
+                db.update_document_minhash(row['id'], near_duplicates.compute_signature(row.get('content') or ''))
+                hashed += 1
+        if len(rows) < page_size:
+            return hashed
+        offset += page_size
+
+
+def build(db, page_size):
+    """File every stored signature in its owner's index; returns the document count."""
+    indexed, offset = 0, 0
+    while True:
+        rows = db.list_document_signatures(offset, page_size)
+        for row in rows:
+            if row.get('user_id'):
+                near_duplicates.index_document(row['user_id'], row['id'], row['minhash'])
+                indexed += 1
+        if len(rows) < page_size:
+            return indexed
+        offset += page_size
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild the near-duplicate LSH index')
+    parser.add_argument('--clear', action='store_true', help='Delete the existing index first')
+    parser.add_argument('--backfill', action='store_true', help='Hash documents without a signature')
+    parser.add_argument('--rehash', action='store_true', help='Recompute every signature')
+    parser.add_argument('--page-size', type=int, default=500)
+    args = parser.parse_args()
+
+    db = SupabaseDB()
+    started = time.time()
+    if args.clear:
+        print(f"Removed {clear(get_redis())} index keys")
+    if args.backfill or args.rehash:
+        print(f"Hashed {hash_documents(db, args.rehash, args.page_size)} documents")
+    print(f"Indexed {build(db, args.page_size)} documents in {time.time() - started:.1f}s")
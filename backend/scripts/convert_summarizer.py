@@ -0,0 +1,29 @@
+"""
+Export the summarizer to ONNX for the ``onnx`` summarizer backend.
+
+Writes the encoder, decoder and KV-cache decoder (``decoder_with_past``)
+graphs plus the tokenizer to ``ONNX_MODEL_DIR/<model>``, where
+``summarizer_backends`` loads them when ``SUMMARIZER_BACKEND=onnx``.
+
+Usage:
+    python scripts/convert_summarizer.py [--model NAME] [--output DIR]
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from inference_client import DEFAULT_SUMMARIZER
+from summarizer_backends import export_onnx
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the summarizer to ONNX')
+    parser.add_argument('--model', default=DEFAULT_SUMMARIZER)
+    parser.add_argument('--output', default=None, help='Defaults to ONNX_MODEL_DIR/<model>')
+    args = parser.parse_args()
+
+    path = export_onnx(args.model, args.output)
+    print(f"ONNX export written to {path}")
@@ -0,0 +1,68 @@
+"""
+Measure how much Redis memory Celery task results occupy.
+
+Scans the result backend for ``celery-task-meta-*`` keys and reports the
+stored payload size and Redis' own ``MEMORY USAGE`` per key. Run it while a
+bulk analysis is in flight, before and after a change to the task result
+format, to compare memory per in-flight task.
+
+Usage:
+    python scripts/measure_result_backend.py [--redis-url URL] [--sample N]
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import redis
+from config import config
+
+RESULT_KEY_PATTERN = 'celery-task-meta-*'
+
+
+def measure(redis_url, sample=None):
+    """Return payload/memory statistics for stored Celery results."""
+    client = redis.Redis.from_url(redis_url)
+    payload_sizes = []
+    memory_sizes = []
+    for key in client.scan_iter(match=RESULT_KEY_PATTERN, count=1000):
+        payload_sizes.append(client.strlen(key))
+        usage = client.memory_usage(key)
+        if usage is not None:
+            memory_sizes.append(usage)
+        if sample and len(payload_sizes) >= sample:
+            break
+
+    def _stats(values):
+        if not values:
+            return {'count': 0, 'total': 0, 'avg': 0, 'max': 0}
+        return {
+            'count': len(values),
+            'total': sum(values),
+            'avg': round(sum(values) / len(values), 1),
+            'max': max(values),
+        }
+
+    return {
+        'payload_bytes': _stats(payload_sizes),
+        'memory_usage_bytes': _stats(memory_sizes),
+        'used_memory': client.info('memory').get('used_memory'),
+    }
+
+
+if __name__ == '__main__':
+    env = os.getenv('FLASK_ENV', 'development')
+    parser = argparse.ArgumentParser(description='Measure Celery result backend memory')
+    parser.add_argument('--redis-url', default=config[env].REDIS_URL)
+    parser.add_argument('--sample', type=int, default=None, help='Stop after N keys')
+    args = parser.parse_args()
+
+    stats = measure(args.redis_url, args.sample)
+    print(f"Result keys:          {stats['payload_bytes']['count']}")
+    print(f"Payload bytes:        total={stats['payload_bytes']['total']} "
+          f"avg={stats['payload_bytes']['avg']} max={stats['payload_bytes']['max']}")
+    print(f"MEMORY USAGE bytes:   total={stats['memory_usage_bytes']['total']} "
+          f"avg={stats['memory_usage_bytes']['avg']} max={stats['memory_usage_bytes']['max']}")
+    print(f"Redis used_memory:    {stats['used_memory']}")
@@ -0,0 +1,65 @@
+"""
+Summarize logged routing decisions for tuning the router thresholds.
+
+Reads the latest completed decisions from Redis (see analysis_router.py) and
+reports, per pipeline and estimated-token band: the number of analyses,
+the routing reasons, the p50/p95 end-to-end latency and the failure rate.
+
+Usage:
+    python scripts/routing_report.py [--limit 10000] [--bands 800,2500,10000,50000] [--json OUT]
+"""
+
+import os
+import sys
+import json
+import argparse
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import analysis_router
+
+
+def band_label(tokens, bands):
+    index = bisect_left(bands, tokens)
+    lower = bands[index - 1] if index else 0
+    return f"<={bands[index]}" if index < len(bands) else f">{lower}"
+
+
+def report(decisions, bands):
+    """{(pipeline, token band): stats} of completed decisions."""
+    groups = {}
+    for entry in decisions:
+        key = (entry['pipeline'], band_label(entry['features']['estimated_tokens'], bands))
+        groups.setdefault(key, []).append(entry)
+    result = {}
+    for (pipeline, band), entries in sorted(groups.items()):
+        latencies = np.array([e['latency_seconds'] for e in entries])
+        result[f"{pipeline} {band}"] = {
+            'analyses': len(entries),
+            'reasons': dict(Counter(e['reason'] for e in entries)),
+            'p50_seconds': round(float(np.percentile(latencies, 50)), 2),
+            'p95_seconds': round(float(np.percentile(latencies, 95)), 2),
+            'failure_rate': round(sum(e['state'] != 'SUCCESS' for e in entries) / len(entries), 4),
+        }
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Latency of routed analyses by pipeline and size')
+    parser.add_argument('--limit', type=int, default=10000)
+    parser.add_argument('--bands', default='800,2500,10000,50000', help='Estimated-token band edges')
+    parser.add_argument('--json', default=None, help='Also write the report to this file')
+    args = parser.parse_args()
+
+    stats = report(analysis_router.recent_decisions(args.limit), [int(b) for b in args.bands.split(',')])
+    print(f"{'pipeline / tokens':<26}{'n':>6}{'p50 s':>9}{'p95 s':>9}{'failed':>8}  reasons")
+    for name, s in stats.items():
+        print(f"{name:<26}{s['analyses']:>6}{s['p50_seconds']:>9}{s['p95_seconds']:>9}{s['failure_rate']:>8}  "
+              f"{s['reasons']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(stats, f, indent=2)
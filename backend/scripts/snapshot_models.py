@@ -0,0 +1,62 @@
+"""
+Snapshot the configured models into the local model artifact store.
+
+Saves MODEL_STORE_MODELS (summarizers, with their tokenizers) into
+``MODEL_STORE_DIR/<version>`` as safetensors, writes a manifest and makes the version current. With ``--verify`` each
+model is then reloaded from the store with the hub disabled and its cold
+load time is reported.
+
+Usage:
+    python scripts/snapshot_models.py [--version NAME] [--models a,b]
+        [--no-current] [--verify]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import model_store
+from config import config
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def verify(models, version):
+    """Reload each snapshot offline and return its load time in seconds."""
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    os.environ['HF_HUB_OFFLINE'] = '1'
+    timings = {}
+    for name in models:
+        path = model_store.local_path(name, version)
+        started = time.time()
+        AutoTokenizer.from_pretrained(path, local_files_only=True)
+        AutoModelForSeq2SeqLM.from_pretrained(path, local_files_only=True, use_safetensors=True,
+                                              low_cpu_mem_usage=True)
+        timings[name] = round(time.time() - started, 2)
+    return timings
+
+
+if __name__ == '__main__':
+    env = os.getenv('FLASK_ENV', 'development')
+    cfg = config[env]
+    parser = argparse.ArgumentParser(description='Snapshot models into the local artifact store')
+    parser.add_argument('--version', default=None, help='Defaults to a timestamp')
+    parser.add_argument('--models', default=cfg.MODEL_STORE_MODELS)
+    parser.add_argument('--no-current', action='store_true', help='Do not make this version current')
+    parser.add_argument('--verify', action='store_true', help='Reload each model offline and time it')
+    args = parser.parse_args()
+
+    models = _split(args.models)
+    root = model_store.snapshot(models, args.version, make_current=not args.no_current)
+    print(f"Snapshot written to {root}")
+
+    if args.verify:
+        version = os.path.basename(root)
+        for name, seconds in verify(models, version).items():
+            print(f"{name:<50} cold load {seconds}s (offline)")
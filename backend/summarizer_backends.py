@@ -0,0 +1,106 @@
+"""
+Summarizer runtime backends for CPU-only nodes.
+
+``SUMMARIZER_BACKEND`` selects how ``inference_client`` builds the
+summarization pipeline:
+
+    pytorch       fp32 PyTorch (reference quality, slowest on CPU)
+    pytorch-int8  PyTorch with dynamic int8 quantization of the Linear layers
+    onnx          ONNX Runtime export with a KV-cache decoder
+                  (``decoder_with_past``), produced by
+                  ``scripts/convert_summarizer.py``
+
+All backends return a ``transformers`` summarization pipeline, so callers
+and generation parameters stay the same. Use
+``scripts/benchmark_summarizer.py`` to compare latency, throughput and ROUGE
+parity against fp32 before switching.
+"""
+
+import os
+import logging
+
+import model_store
+from config import config
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+PYTORCH = 'pytorch'
+PYTORCH_INT8 = 'pytorch-int8'
+ONNX = 'onnx'
+BACKENDS = (PYTORCH, PYTORCH_INT8, ONNX)
+
+
+def onnx_model_dir(model_name):
+    """Directory holding the ONNX export of a model."""
+    return os.path.join(config[env].ONNX_MODEL_DIR, model_name.replace('/', '--'))
+
+
+def _load_onnx_model(model_name):
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError("The onnx summarizer backend needs optimum[onnxruntime] installed") from e
+
+    path = onnx_model_dir(model_name)
+    if not os.path.isdir(path):
+        raise RuntimeError(f"No ONNX export at {path}; run scripts/convert_summarizer.py --model {model_name}")
+    return ORTModelForSeq2SeqLM.from_pretrained(path, use_cache=True), path
+
+
+def build_summarizer(model_name, backend=None):
+    """
+    Build a summarization pipeline for a model on the given backend.
+
+    Args:
+        model_name: Hugging Face model name
+        backend: One of BACKENDS (defaults to SUMMARIZER_BACKEND)
+
+    Returns:
+        transformers summarization pipeline
+    """
+    backend = backend or config[env].SUMMARIZER_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown summarizer backend '{backend}', expected one of {', '.join(BACKENDS)}")
+
+    from transformers import pipeline, AutoTokenizer
+
+    if backend == PYTORCH:
+        return pipeline("summarization", model=model_store.load_seq2seq_model(model_name),
+                        tokenizer=model_store.load_tokenizer(model_name))
+
+    if backend == PYTORCH_INT8:
+        import torch
+        tokenizer = model_store.load_tokenizer(model_name)
+        model = model_store.load_seq2seq_model(model_name)
+        model.eval()
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("summarization", model=quantized, tokenizer=tokenizer)
+
+    model, path = _load_onnx_model(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+def export_onnx(model_name, output_dir=None):
+    """
+    Export a seq2seq model to ONNX with a KV-cache decoder.
+
+    Returns:
+        str: Directory containing the encoder, decoder and
+        decoder-with-past graphs plus the tokenizer
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError("ONNX export needs optimum[onnxruntime] installed") from e
+    from transformers import AutoTokenizer
+
+    output_dir = output_dir or onnx_model_dir(model_name)
+    source = model_store.local_path(model_name) or model_name
+    logger.info(f"Exporting {source} to ONNX in {output_dir}")
+    model = ORTModelForSeq2SeqLM.from_pretrained(source, export=True, use_cache=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(source).save_pretrained(output_dir)
+    return output_dir
@@ -0,0 +1,196 @@
+"""
+Two-tier cache of generated summaries.
+
+Entries are keyed by ``(input hash, model id, model revision, generation
+params)``. The input hash covers the exact model input (the truncated or
+chunked token ids), so a change in truncation is a different entry, and the
+revision covers the model store version and summarizer backend, so a new
+snapshot or an int8/ONNX switch never serves summaries from another model.
+
+    Redis tier  entries expire after SUMMARY_CACHE_TTL_SECONDS; an access
+                index (sorted set) evicts the least recently used entries
+                beyond SUMMARY_CACHE_MAX_ENTRIES
+    Disk tier   optional (SUMMARY_CACHE_DIR); one JSON file per entry, same
+                TTL, oldest files removed beyond SUMMARY_CACHE_DISK_MAX_MB.
+                Each process tracks the directory size incrementally and
+                only lists it to evict (down to DISK_LOW_WATER of the limit)
+                or every DISK_RESCAN_SECONDS to pick up other writers.
+                Disk hits are promoted back to Redis.
+
+Every lookup is counted in ``summary_cache_requests_total`` by tier, and the
+generation time a hit avoided is added to ``summary_cache_seconds_saved_total``.
+Cache failures are logged and treated as misses.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+
+import metrics
+import model_store
+from config import config
+from redis_client import get_redis
+from utils.hashing import params_hash
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+ENTRY_KEY = "summary_cache:{}"
+INDEX_KEY = "summary_cache:index"
+
+# Eviction empties the disk tier down to this share of its size limit
+DISK_LOW_WATER = 0.9
+DISK_RESCAN_SECONDS = 300
+
+# This process's estimate of the disk tier size
+_disk_usage = {'bytes': None, 'scanned_at': 0.0}
+
+
+def _cfg():
+    return config[env]
+
+
+def model_revision(model_name):
+    """Store version (or 'hub') plus backend that produced a model's outputs."""
+    version = model_store.current_version() if model_store.local_path(model_name) else None
+    return f"{version or 'hub'}:{_cfg().SUMMARIZER_BACKEND}"
+
+
+def input_hash(model_input):
+    """Hash a text or token id list exactly as it is fed to the model."""
+    if isinstance(model_input, str):
+        data = model_input.encode('utf-8')
+    else:
+        data = ','.join(str(int(i)) for i in model_input).encode('ascii')
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(model_input, model_name, params):
+    parts = [input_hash(model_input), model_name, model_revision(model_name), params_hash(params)]
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _disk_path(key):
+    return os.path.join(_cfg().SUMMARY_CACHE_DIR, f"{key}.json")
+
+
+def _read_disk(key):
+    path = _disk_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > _cfg().SUMMARY_CACHE_TTL_SECONDS:
+            os.remove(path)
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _scan_disk(target=None):
+    """
+    Total size of the disk tier, after removing the oldest files until it
+    is at most ``target`` bytes (when given).
+    """
+    directory = _cfg().SUMMARY_CACHE_DIR
+    stats = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.json'):
+            stat = entry.stat()
+            stats.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in stats)
+    if target is not None:
+        for _, size, path in sorted(stats):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+    _disk_usage.update(bytes=total, scanned_at=time.time())
+    return total
+
+
+def _write_disk(key, entry):
+    cfg = _cfg()
+    os.makedirs(cfg.SUMMARY_CACHE_DIR, exist_ok=True)
+    data = json.dumps(entry)
+    path = _disk_path(key)
+    replaced = os.path.getsize(path) if os.path.exists(path) else 0
+    with open(path, 'w') as f:
+        f.write(data)
+
+    if _disk_usage['bytes'] is None or time.time() - _disk_usage['scanned_at'] > DISK_RESCAN_SECONDS:
+        _scan_disk()
+    else:
+        _disk_usage['bytes'] += len(data) - replaced
+    limit = cfg.SUMMARY_CACHE_DISK_MAX_MB * 1024 * 1024
+    if _disk_usage['bytes'] > limit:
+        _scan_disk(target=int(limit * DISK_LOW_WATER))
+
+
+def _write_redis(key, entry):
+    cfg = _cfg()
+    r = get_redis()
+    pipe = r.pipeline()
+    pipe.set(ENTRY_KEY.format(key), json.dumps(entry), ex=cfg.SUMMARY_CACHE_TTL_SECONDS)
+    pipe.zadd(INDEX_KEY, {key: time.time()})
+    pipe.execute()
+
+    excess = r.zcard(INDEX_KEY) - cfg.SUMMARY_CACHE_MAX_ENTRIES
+    if excess > 0:
+        evicted = [k.decode() if isinstance(k, bytes) else k for k in r.zrange(INDEX_KEY, 0, excess - 1)]
+        pipe = r.pipeline()
+        pipe.delete(*[ENTRY_KEY.format(k) for k in evicted])
+        pipe.zrem(INDEX_KEY, *evicted)
+        pipe.execute()
+
+
+def get(model_input, model_name, params):
+    """Return the cached summary for a model input, or None."""
+    if not _cfg().SUMMARY_CACHE_ENABLED:
+        return None
+    key = cache_key(model_input, model_name, params)
+    entry, tier = None, 'miss'
+    try:
+        raw = get_redis().get(ENTRY_KEY.format(key))
+        if raw is not None:
+            entry, tier = json.loads(raw), 'redis'
+            get_redis().zadd(INDEX_KEY, {key: time.time()})
+    except Exception as e:
+        logger.warning(f"Summary cache read failed: {str(e)}")
+
+    if entry is None and _cfg().SUMMARY_CACHE_DIR:
+        try:
+            entry = _read_disk(key)
+            if entry is not None:
+                tier = 'disk'
+                _write_redis(key, entry)
+        except Exception as e:
+            logger.warning(f"Summary cache disk read failed: {str(e)}")
+
+    metrics.inc('summary_cache_requests_total', tier=tier, model=model_name)
+    if entry is None:
+        return None
+    metrics.inc('summary_cache_seconds_saved_total', entry.get('seconds', 0), model=model_name)
+    return entry['summary']
+
+
+def put(model_input, model_name, params, summary, seconds):
+    """Store a generated summary with the time it took to generate."""
+    if not _cfg().SUMMARY_CACHE_ENABLED:
+        return
+    key = cache_key(model_input, model_name, params)
+    entry = {'summary': summary, 'seconds': round(seconds, 3), 'created_at': time.time()}
+    try:
+        _write_redis(key, entry)
+    except Exception as e:
+        logger.warning(f"Summary cache write failed: {str(e)}")
+    if _cfg().SUMMARY_CACHE_DIR:
+        try:
+            _write_disk(key, entry)
+        except Exception as e:
+            logger.warning(f"Summary cache disk write failed: {str(e)}")
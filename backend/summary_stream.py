@@ -0,0 +1,136 @@
+"""
+Server-sent events for streaming a document summary as it is generated.
+
+Generation never runs in the web tier. The endpoint sends
+``tasks.stream_summary_task`` to an inference worker, which pushes each
+event onto the Redis list ``summary_stream:<stream id>``
+(publish_summary_events). The web request relays that list to the client
+as SSE (relay_events), so it only waits on Redis.
+
+The stream sends ``token`` events with text pieces as BART produces them,
+then persists the full analysis exactly as ``analyze_document_ml_sync`` does
+(with the streamed summary) and sends a final ``done`` event carrying the
+analysis id. Time to first token, as seen by the client, is recorded as
+``summary_ttft_seconds``, the latency metric for interactive analysis.
+A relay that gets no final event within SUMMARY_STREAM_TIMEOUT_SECONDS
+(kept below GUNICORN_TIMEOUT) ends with an ``error`` event.
+"""
+
+import os
+import json
+import time
+import logging
+
+import metrics
+from config import config
+from redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+SUMMARIZER_MODEL = "facebook/bart-large-cnn"
+GENERATION_PARAMS = {'max_length': 150, 'min_length': 30, 'do_sample': False}
+
+STREAM_KEY = 'summary_stream:{}'
+FINAL_EVENTS = ('done', 'error')
+
+
+def sse(event, data):
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def summary_events(doc_id, text):
+    """
+    Generate the summary of one document and store its analysis.
+
+    Yields:
+        tuple: (event, data) for ``token`` events, then ``done`` (or ``error``)
+    """
+    import inference_client
+    from ml_analysis_sync import analyze_document_ml_sync
+    from tokenization import tokenize_document
+    from input_compression import compress
+
+    try:
+        tokens = tokenize_document(text, SUMMARIZER_MODEL)
+        input_ids = compress(tokens, text, 1024).truncated(1024)
+        summary, cached = '', False
+        for event in inference_client.stream_generate(input_ids, model=SUMMARIZER_MODEL, **GENERATION_PARAMS):
+            if 'token' in event:
+                yield 'token', {'text': event['token']}
+            else:
+                summary, cached = event['summary'], event['cached']
+
+        result = analyze_document_ml_sync(doc_id, summary=summary)
+        if 'error' in result:
+            yield 'error', {'error': result['error']}
+            return
+        yield 'done', {
+            'document_id': doc_id,
+            'analysis_id': result.get('analysis_id'),
+            'summary': summary,
+            'cached': cached,
+        }
+    except Exception as e:
+        logger.error(f"Summary stream failed for {doc_id}: {str(e)}", exc_info=True)
+        yield 'error', {'error': 'Summary generation failed'}
+
+
+def publish_summary_events(doc_id, text, stream_id, events=None):
+    """Push the events of one summary stream for the web request relaying them (worker side)."""
+    r = get_redis()
+    key = STREAM_KEY.format(stream_id)
+    ttl = config[env].SUMMARY_STREAM_TIMEOUT_SECONDS + 60
+    for event, data in events if events is not None else summary_events(doc_id, text):
+        pipe = r.pipeline()
+        pipe.rpush(key, json.dumps({'event': event, 'data': data}))
+        pipe.expire(key, ttl)
+        pipe.execute()
+
+
+def relay_events(stream_id, started=None, timeout=None):
+    """
+    Relay one summary stream to the client as SSE (web side).
+
+    Args:
+        stream_id: Id the stream task publishes under
+        started: Request start (epoch seconds) the latency metrics are measured from
+        timeout: Seconds to wait for the final event (SUMMARY_STREAM_TIMEOUT_SECONDS)
+
+    Yields:
+        str: SSE-formatted events, ending with ``done`` or ``error``
+    """
+    r = get_redis()
+    key = STREAM_KEY.format(stream_id)
+    cfg = config[env]
+    started = started or time.time()
+    give_up = started + (timeout or min(cfg.SUMMARY_STREAM_TIMEOUT_SECONDS, cfg.GUNICORN_TIMEOUT - 5))
+    ttft = None
+    try:
+        while True:
+            remaining = give_up - time.time()
+            if remaining <= 0:
+                logger.warning(f"Summary stream {stream_id} timed out")
+                yield sse('error', {'error': 'Summary generation timed out'})
+                return
+            item = r.blpop([key], timeout=max(1, min(5, int(remaining))))
+            if item is None:
+                continue
+            message = json.loads(item[1])
+            event, data = message['event'], message['data']
+            if event == 'token' and ttft is None:
+                ttft = time.time() - started
+                metrics.observe('summary_ttft_seconds', ttft, endpoint='stream_summary')
+            if event == 'done':
+                total = time.time() - started
+                metrics.observe('summary_stream_seconds', total, endpoint='stream_summary')
+                logger.info(f"Streamed summary {stream_id}: ttft {ttft or 0:.2f}s, total {total:.2f}s, "
+                            f"cached={data.get('cached')}")
+                data = {**data, 'ttft_seconds': round(ttft or 0, 3)}
+            yield sse(event, data)
+            if event in FINAL_EVENTS:
+                return
+    finally:
+        r.delete(key)
@@ -26,9 +26,15 @@ CREATE TABLE IF NOT EXISTS documents (
     text_length   INTEGER DEFAULT 0,
     document_type TEXT DEFAULT 'txt',
     status        TEXT DEFAULT 'uploaded',  -- uploaded | processing | completed | error
-    upload_time   TIMESTAMPTZ DEFAULT now()
+    upload_time   TIMESTAMPTZ DEFAULT now(),
+    parent_document_id UUID REFERENCES documents(id) ON DELETE SET NULL,  -- previous version
+    version       INTEGER DEFAULT 1
 );
 
+-- Existing databases: link document versions
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS parent_document_id UUID REFERENCES documents(id) ON DELETE SET NULL;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1;
+
 -- 3. ANALYSIS RESULTS
 CREATE TABLE IF NOT EXISTS analysis_results (
     id               UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -41,7 +47,35 @@ CREATE TABLE IF NOT EXISTS analysis_results (
     created_at       TIMESTAMPTZ DEFAULT now()
 );
 
--- 4. USER SESSIONS
+-- 4. TEMPLATES — firm templates with their precomputed analyses
+CREATE TABLE IF NOT EXISTS templates (
+    id                 UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name               TEXT NOT NULL,
+    content            TEXT NOT NULL,
+    fingerprint        JSONB NOT NULL DEFAULT '[]',  -- [[section hash, length], ...]
+    analysis_results   JSONB NOT NULL DEFAULT '{}',
+    model_versions     JSONB DEFAULT '{}',
+    processing_time    REAL DEFAULT 0,
+    source_document_id UUID REFERENCES documents(id) ON DELETE SET NULL,
+    created_by         UUID REFERENCES users(id) ON DELETE SET NULL,
+    created_at         TIMESTAMPTZ DEFAULT now()
+);
+
+-- Template each document was matched to at upload
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS template_id UUID REFERENCES templates(id) ON DELETE SET NULL;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS template_coverage REAL;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS template_match_ms REAL;
+
+-- MinHash signature of each document (base64, near-duplicate detection)
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS minhash TEXT;
+
+-- Routing features computed at ingest (see analysis_router.py)
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS estimated_tokens INTEGER;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS script_ratio REAL;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS section_count INTEGER;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS language TEXT;
+
+-- 5. USER SESSIONS
 CREATE TABLE IF NOT EXISTS user_sessions (
     id             UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     session_token  TEXT UNIQUE NOT NULL,
@@ -57,6 +91,7 @@ CREATE INDEX IF NOT EXISTS idx_users_email            ON users(email);
 CREATE INDEX IF NOT EXISTS idx_documents_user_id      ON documents(user_id);
 CREATE INDEX IF NOT EXISTS idx_documents_status       ON documents(status);
 CREATE INDEX IF NOT EXISTS idx_documents_upload_time  ON documents(upload_time DESC);
+CREATE INDEX IF NOT EXISTS idx_documents_parent       ON documents(parent_document_id);
 CREATE INDEX IF NOT EXISTS idx_analysis_document_id   ON analysis_results(document_id);
 CREATE INDEX IF NOT EXISTS idx_analysis_user_id       ON analysis_results(user_id);
 CREATE INDEX IF NOT EXISTS idx_analysis_status        ON analysis_results(status);
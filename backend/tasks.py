@@ -1,18 +1,32 @@
 import sys
 import os
-path_to_add = os.path.join(os.path.dirname(__file__), '..')
-print(f"Adding path: {path_to_add}")
-sys.path.append(path_to_add)
-print(f"sys.path: {sys.path}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from celery_app import celery_app
+from celery.signals import task_prerun, task_postrun
 from models_supabase import SupabaseDB, DBManager
 from config import config
+from checkpoints import AnalysisCheckpoint
+from utils.hashing import content_hash
+import re
+import math
+from bisect import bisect_right
 import time
-import torch
-import pandas as pd
-from transformers import pipeline, AutoTokenizer
-from ml.monitoring.drift_detection import detect_drift, retrain_trigger
+import inference_client
+import clause_model
+import risk_model
+import template_library
+from tokenization import tokenize_document
+from input_compression import compress
+from keywords import classify_clauses, risk_flags, scan as scan_keywords
+from utils.clause_spans import (PageIndex, clause_record, trim_span, HEADING_CONFIDENCE, PHRASE_CONFIDENCE,
+                                FALLBACK_CONFIDENCE)
+from utils.deadline import STAGES, Budget, budget_level, partial_quality
+from utils.extractive_summary import extractive_summary
+from utils.risk_scores import unpack_probs
+from utils.section_diff import SectionDiff, plan_chunks
+from utils.structure import SECTION_HEADING, extract_structure
+import metrics
 import logging
 
 # Set up logging for tasks
@@ -33,16 +47,447 @@ def get_db_manager():
         db_manager = DBManager(mongo_db)
     return db_manager
 
-@celery_app.task(bind=True, name='tasks.analyze_document_task')
-def analyze_document_task(self, doc_id):
+# Bump whenever a stage's output changes so old checkpoints are ignored
+PIPELINE_VERSION = 'bart-v5'
+
+SUMMARIZER_MODEL = "facebook/bart-large-cnn"
+
+# Define clause patterns and their corresponding types
+CLAUSE_PATTERNS = {
+    'confidentiality': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:confidentiality|confidential|non-disclosure|nda)',
+        r'(?i)confidentiality\s*(?:agreement|clause|provision)',
+        r'(?i)non-disclosure\s*(?:agreement|clause|provision)'
+    ],
+    'indemnity': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:indemnity|indemnification)',
+        r'(?i)indemnity\s*(?:clause|provision|agreement)',
+        r'(?i)indemnification\s*(?:clause|provision|agreement)'
+    ],
+    'liability': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:liability|limitation of liability)',
+        r'(?i)liability\s*(?:clause|provision|limitation)',
+        r'(?i)limitation\s*of\s*liability'
+    ],
+    'termination': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:termination|termination of agreement)',
+        r'(?i)termination\s*(?:clause|provision|rights|conditions)',
+        r'(?i)term\s*and\s*termination'
+    ],
+    'governing_law': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:governing law|governing law and jurisdiction)',
+        r'(?i)governing\s*(?:law|jurisdiction)',
+        r'(?i)applicable\s*law'
+    ],
+    'dispute_resolution': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:dispute|arbitration|dispute resolution)',
+        r'(?i)dispute\s*(?:resolution|settlement)',
+        r'(?i)arbitration\s*(?:clause|agreement|provision)'
+    ],
+    'payment_terms': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:payment|compensation|fees)',
+        r'(?i)payment\s*(?:terms|conditions|schedule)',
+        r'(?i)compensation\s*(?:clause|provision)'
+    ],
+    'intellectual_property': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:intellectual property|ip|copyright|patent)',
+        r'(?i)intellectual\s*property\s*(?:rights|clause|provision)',
+        r'(?i)ip\s*(?:rights|clause|provision)'
+    ],
+    'warranties': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:warranty|warranties|representations)',
+        r'(?i)warranty\s*(?:clause|provision|disclaimer)',
+        r'(?i)representations?\s*and\s*warranties?'
+    ],
+    'definitions': [
+        r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:definitions?|defined terms)',
+        r'(?i)definitions?\s*(?:clause|section)',
+        r'(?i)defined\s*terms?'
+    ]
+}
+
+def run_stage(checkpoint, stage, compute):
+    """Return a stage's checkpointed output, or compute and checkpoint it."""
+    saved = checkpoint.load(stage)
+    if saved is not None:
+        return saved
+    started = time.time()
+    value = compute()
+    checkpoint.save(stage, value, time.time() - started)
+    return value
+
+def extract_clauses(text, fallback=True):
+    """
+    Advanced clause extraction and identification with CLAUSE_PATTERNS.
+
+    Args:
+        text: Document (or section) text
+        fallback: Return the first sentences as 'general' clauses when no
+                  clause pattern matches
+
+    Returns:
+        list: Clause records as spans of ``text`` (see utils.clause_spans),
+              at most one per clause type
+    """
+    identified_clauses = []
+    taken = []
+    pages = PageIndex(text)
+
+    # Find and extract each type of clause
+    for clause_type, patterns in CLAUSE_PATTERNS.items():
+        for index, pattern in enumerate(patterns):
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                # Skip text already claimed by an earlier clause
+                start_pos = match.start()
+                if any(start <= start_pos < end for start, end in taken):
+                    continue
+                clause_heading = match.group().strip()
+
+                # The clause runs to the next major heading, else ten lines
+                next_section_match = re.search(SECTION_HEADING, text[start_pos + 1:], re.IGNORECASE)
+                if next_section_match:
+                    end_pos = start_pos + 1 + next_section_match.start()
+                else:
+                    lines = text[start_pos:].split('\n')[:10]
+                    end_pos = start_pos + len('\n'.join(lines))
+
+                start_pos, end_pos = trim_span(text, start_pos, end_pos)
+                if end_pos - start_pos > len(clause_heading) + 10:  # Ensure we have substantial content
+                    confidence = HEADING_CONFIDENCE if index == 0 else PHRASE_CONFIDENCE
+                    identified_clauses.append(clause_record(text, clause_type, clause_heading, start_pos, end_pos,
+                                                            confidence, pages))
+                    taken.append((start_pos, end_pos))
+                    break  # Only take the first match for each pattern
+            else:
+                continue
+            break
+
+    # If no clauses were identified, provide basic sentence-based extraction
+    if not identified_clauses and fallback:
+        sentences = [m for m in re.finditer(r'[^.!?]+', text) if m.group().strip()]
+        for i, sentence in enumerate(sentences[:20]):  # Limit to first 20 sentences
+            identified_clauses.append(clause_record(text, 'general', f'Clause {i+1}', sentence.start(),
+                                                    sentence.end(), FALLBACK_CONFIDENCE, pages))
+    return identified_clauses
+
+def find_clauses(text, text_hash=None, fallback=True, sections=None):
+    """
+    Run the configured clause stage (CLAUSE_STAGE): the fine-tuned clause
+    model, or CLAUSE_PATTERNS. A model that cannot be loaded or run falls
+    back to the patterns. With the document's ``sections``, the model is
+    only run on sections missing from the clause cache.
+    """
+    if config[env].CLAUSE_STAGE == 'model':
+        try:
+            if sections:
+                return clause_model.extract_section_clauses(text, sections, text_hash)
+            return clause_model.extract_clauses(text, text_hash)
+        except Exception as e:
+            logger.warning(f"Clause model failed, falling back to clause patterns: {str(e)}")
+    return extract_clauses(text, fallback)
+
+def _reusable_base(row):
+    """
+    The stored analysis of ``row`` (an analysis_results or templates row) as
+    a base to reuse, if it came from the same pipeline version, summarizer
+    and clause stage (otherwise its results cannot be reused).
+
+    Returns:
+        dict: {'analysis', 'risk_probs'} or None; 'risk_probs' is None unless
+              both analyses ran the risk model
+    """
+    versions = row.get('model_versions') or {}
+    analysis = row.get('analysis_results') or {}
+    cfg = config[env]
+    if (versions.get('pipeline_version') != PIPELINE_VERSION or versions.get('summarizer') != SUMMARIZER_MODEL
+            or versions.get('clause_stage') != cfg.CLAUSE_STAGE or not analysis.get('sections')):
+        return None
+    same_risk_stage = versions.get('risk_stage') == cfg.RISK_STAGE == 'model'
+    return {'analysis': analysis, 'risk_probs': analysis.get('risk_probs') if same_risk_stage else None}
+
+def load_revision_base(db_mgr, document):
+    """
+    The previous version's analysis when ``document`` is a revision of an
+    analyzed document (see _reusable_base).
+
+    Returns:
+        dict: {'kind': 'revision', 'document_id', 'analysis_id', 'analysis', 'risk_probs'} or None
+    """
+    parent_id = document.get('parent_document_id')
+    if not parent_id:
+        return None
+    row = db_mgr.get_analysis_result(parent_id)
+    base = _reusable_base(row) if row else None
+    if not base:
+        logger.info(f"Previous version {parent_id} has no reusable analysis, analyzing from scratch")
+        return None
+    return {**base, 'kind': 'revision', 'document_id': parent_id, 'analysis_id': row.get('id')}
+
+def load_template_base(db_mgr, document, sections):
+    """
+    The analysis of the template ``document`` was matched to at upload
+    (matched now for documents uploaded before the template existed).
+
+    Returns:
+        dict: {'kind': 'template', 'template_id', 'name', 'coverage', 'match_ms',
+               'processing_time', 'analysis', 'risk_probs'} or None
+    """
+    if not config[env].TEMPLATES_ENABLED:
+        return None
+    match = {'template_id': document.get('template_id'), 'coverage': document.get('template_coverage'),
+             'match_ms': document.get('template_match_ms')}
+    if not match['template_id']:
+        try:
+            match = template_library.match_document(db_mgr.db, document['content'], sections)
+        except Exception as e:
+            logger.warning(f"Template matching failed: {str(e)}")
+            return None
+        if not match['template_id']:
+            return None
+    row = db_mgr.get_template(match['template_id'])
+    base = _reusable_base(row) if row else None
+    if not base:
+        logger.info(f"Template {match['template_id']} has no reusable analysis, analyzing in full")
+        return None
+    return {**base, **match, 'kind': 'template', 'name': row.get('name'),
+            'processing_time': row.get('processing_time') or 0}
+
+def _one_per_type(clauses, parent_index):
+    """
+    The clause extract_clauses would pick for each type: a heading match
+    before a phrase match, then the earliest.
+    """
+    best = {}
+    for i, clause in enumerate(clauses):
+        rank = (clause.get('confidence') != HEADING_CONFIDENCE, clause['start'])
+        if clause['type'] not in best or rank < best[clause['type']][0]:
+            best[clause['type']] = (rank, i)
+    keep = sorted(i for _, i in best.values())
+    return [clauses[i] for i in keep], [parent_index[i] for i in keep]
+
+def revise_clauses(text, text_hash, sections, diff, parent_clauses):
+    """
+    Clauses of a revision: the previous version's clauses lying in unchanged
+    sections, moved to their new offsets, plus the clause stage run again
+    over the changed sections and the unchanged sections a dropped clause
+    (one reaching into a changed section) covered. Consecutive sections are
+    re-extracted as one block, so clauses may span them. With the clause
+    patterns, only the clause extract_clauses would pick is kept per type,
+    so the result matches an analysis of the revision from scratch.
+
+    Returns:
+        dict: {'clauses': records in document order,
+               'parent_index': index of each reused clause in ``parent_clauses``
+                               (None for recomputed clauses)}
+    """
+    pages = PageIndex(text)
+    starts = [section['start'] for section in sections]
+    region = set(diff.changed)
+    moved = []
+    for i, clause in enumerate(parent_clauses):
+        if 'start' not in clause:
+            continue
+        span = diff.shift(clause['start'], clause['end'])
+        if span:
+            moved.append((i, clause, span))
+        else:
+            region |= diff.touched(sections, clause['start'], clause['end'])
+
+    clauses, parent_index = [], []
+    for i, clause, (start, end) in moved:
+        first, last = bisect_right(starts, start) - 1, bisect_right(starts, end - 1) - 1
+        if any(index in region for index in range(first, last + 1)):
+            continue
+        record = {key: value for key, value in clause.items() if key != 'risk_level'}
+        record.update(start=start, end=end, page=pages.page(start))
+        clauses.append(record)
+        parent_index.append(i)
+
+    blocks = []
+    for index in sorted(region):
+        if blocks and blocks[-1][1] == index - 1:
+            blocks[-1][1] = index
+        else:
+            blocks.append([index, index])
+    for first, last in blocks:
+        offset, end = sections[first]['start'], sections[last]['end']
+        # Include the next heading line, so a clause ends where it would in the whole text
+        lookahead = end
+        if last + 1 < len(sections):
+            lookahead = text.find('\n', sections[last + 1]['start'])
+            lookahead = sections[last + 1]['end'] if lookahead < 0 else lookahead
+        for clause in find_clauses(text[offset:lookahead], fallback=False):
+            if clause['start'] >= end - offset:
+                continue
+            start = clause['start'] + offset
+            clauses.append({**clause, 'start': start, 'end': clause['end'] + offset, 'page': pages.page(start)})
+            parent_index.append(None)
+
+    if config[env].CLAUSE_STAGE != 'model':
+        clauses, parent_index = _one_per_type(clauses, parent_index)
+    if not clauses:
+        clauses = find_clauses(text, text_hash)
+        return {'clauses': clauses, 'parent_index': [None] * len(clauses)}
+    order = sorted(range(len(clauses)), key=lambda i: clauses[i]['start'])
+    return {'clauses': [clauses[i] for i in order], 'parent_index': [parent_index[i] for i in order]}
+
+def score_risk(text, clauses, known=None):
+    """
+    Per-clause risk probabilities and the document risk score from the
+    risk classifier (see risk_model.py), or None when RISK_STAGE is not
+    'model' or the classifier is unavailable. ``known`` holds probabilities
+    already computed for some clauses ({clause index: row}).
+    """
+    if config[env].RISK_STAGE != 'model':
+        return None
+    try:
+        return risk_model.score_clauses(text, clauses, known=known)
+    except Exception as e:
+        logger.warning(f"Risk model failed, keeping keyword risk flags only: {str(e)}")
+        return None
+
+def apply_risk_scores(analysis, risk_scores):
+    """Add the risk classifier's per-clause levels and document score to an analysis."""
+    if not risk_scores:
+        return analysis
+    analysis['clauses'] = [{**clause, 'risk_level': level}
+                           for clause, level in zip(analysis['clauses'], risk_scores['clause_levels'])]
+    analysis['risk_probs'] = risk_scores['probs']
+    analysis['risk_score'] = risk_scores['score']
+    analysis['risk_level'] = risk_scores['level']
+    return analysis
+
+def deadline_preview(text, sections, token_count, budget, compute_clauses, compute_risk):
+    """
+    The cheap-first pass of a deadline-bounded analysis: the stages in
+    order of cost up to the extractive summary. A model stage that no
+    fit the time left by its estimated cost is downgraded (clause model ->
+    CLAUSE_PATTERNS, risk classifier -> keyword flags only) and left to the
+    refinement.
+    Stages that do run share their checkpoints with the full analysis.
+
+    Args:
+        text: Document text
+        sections: Structure index of ``text``
+        token_count: Summarizer tokens of ``text``
+        budget: utils.deadline.Budget
+        compute_clauses: Callable() -> (clauses, parent_index), checkpointed
+        compute_risk: Callable(clauses, parent_index) -> risk scores, checkpointed
+
+    Returns:
+        dict: Partial analysis with 'partial', 'completed_stages',
+              'downgraded_stages' and 'pending_stages'
+    """
+    cfg = config[env]
+    completed, downgraded = ['structure'], []
+    clause_seconds = math.ceil(token_count / 1024) * cfg.DEADLINE_CLAUSE_SECONDS_PER_CHUNK
+    if cfg.CLAUSE_STAGE == 'model' and not budget.allows(clause_seconds):
+        clauses, parent_index = extract_clauses(text), None
+        downgraded.append('clauses')
+    else:
+        clauses, parent_index = compute_clauses()
+        completed.append('clauses')
+
+    hits = scan_keywords(text)
+    analysis = {'clauses': clauses, 'risks': risk_flags(text, hits),
+                'classification': classify_clauses(clauses, text, hits),
+                'section_count': len(sections), 'sections': sections}
+    risk_seconds = len(clauses) * cfg.DEADLINE_RISK_SECONDS_PER_CLAUSE
+    if cfg.RISK_STAGE == 'model' and (downgraded or not budget.allows(risk_seconds)):
+        downgraded.append('risks')
+    else:
+        apply_risk_scores(analysis, compute_risk(clauses, parent_index))
+        completed.append('risks')
+
+    analysis.update(summary=extractive_summary(text, max_sentences=5), summary_type='extractive')
+    completed.append('extractive_summary')
+    analysis.update(partial=True, completed_stages=completed, downgraded_stages=downgraded,
+                    pending_stages=[stage for stage in STAGES if stage not in completed])
+    return analysis
+
+def summarize_chunks(tokens, text, checkpoint, max_chunks, reused=None):
+    """
+    Summarize the document in model-window sized chunks (at most
+    ``max_chunks`` of them), checkpointing every chunk summary so a retried
+    task only runs BART on the chunks that are still missing. Chunks are
+    token windows of the document's single tokenization, passed to the
+    model as ids; documents longer than the chunk budget are first
+    compressed to their most salient sentences.
+
+    ``reused`` lists (start, end, summary) character spans of a previous
+    version's chunks that lie in unchanged sections: their summaries are
+    kept, and only the text between them is chunked and summarized (see
+    plan_chunks). When that would take more than ``max_chunks`` chunks,
+    the whole document is chunked again.
+
+    Returns:
+        tuple: (summary, chunk records [{'start', 'end', 'summary'}] or None
+                for a compressed document, {'chunks_reused', 'chunks_generated'})
+    """
+    # Model max length windows (1024 tokens)
+    logger.info(f"Tokenized input length: {len(tokens)}")
+    full = tokens
+    tokens = compress(tokens, text, 1024, windows=max_chunks)
+    fits = tokens is full and len(full) <= full.window_size(1024) * max_chunks
+    chunks = None
+    if reused and fits:
+        spans = [(tokens.token_span(start, end), summary) for start, end, summary in reused]
+        spans = [(span, summary) for span, summary in spans if span[1] > span[0]]
+        plan = plan_chunks(len(tokens), [span for span, _ in spans], tokens.window_size(1024),
+                           config[env].SUMMARY_MIN_CHUNK_TOKENS, max_chunks)
+        if plan is None:
+            logger.info(f"Reusing summaries would take more than {max_chunks} chunks, chunking the whole text")
+        else:
+            chunks = [(start, end, spans[index][1] if index is not None else None) for start, end, index in plan]
+    if chunks is None:
+        chunks = [(start, end, None) for start, end in tokens.chunk_bounds(1024, max_chunks)]
+
+    summaries, records = [], []
+    for i, (chunk_start, chunk_end, summary) in enumerate(chunks):
+        if summary is None:
+            stage = f'summary_chunk:{i}'
+            summary = checkpoint.load(stage)
+            if summary is None:
+                started = time.time()
+                logger.info(f"Summarizing chunk {i + 1}/{len(chunks)} ({chunk_end - chunk_start} tokens)")
+                summary = inference_client.generate(tokens.chunk(chunk_start, chunk_end), model=SUMMARIZER_MODEL,
+                                                    max_length=150, min_length=30, do_sample=False)
+                checkpoint.save(stage, summary, time.time() - started)
+        summaries.append(summary)
+        start, end = tokens.char_span(chunk_start, chunk_end)
+        records.append({'start': start, 'end': end, 'summary': summary})
+    reused_count = sum(1 for chunk in chunks if chunk[2] is not None)
+    return (' '.join(summaries), records if tokens is full else None,
+            {'chunks_reused': reused_count, 'chunks_generated': len(chunks) - reused_count})
+
+@celery_app.task(bind=True, name='tasks.analyze_document_task', acks_late=True, reject_on_worker_lost=True)
+def analyze_document_task(self, doc_id, max_chunks=None, deadline_at=None, deadline_ms=None):
     """
     Analyze a legal document asynchronously.
+
+    Every stage checkpoints its output (see checkpoints.py), and the task
+    is acknowledged only after it finishes (acks_late), so a task that is
+    redelivered after a worker crash resumes from the last completed stage.
+    A document whose analysis has started CHECKPOINT_MAX_ATTEMPTS times
+    without finishing (e.g. one that OOM-kills every worker) is failed
+    instead of being run again.
+
+    With a deadline, a document whose abstractive summary will not fit the
+    budget first gets a partial analysis (see deadline_preview), stored and
+    announced as ``partial_analysis_id`` in the task's PROGRESS meta, and
+    the task then carries on to the complete analysis.
     
     Args:
         doc_id: Document ID from MongoDB
+        max_chunks: Summary chunks to generate (SUMMARY_MAX_CHUNKS by default;
+                    the router raises it for long documents)
+        deadline_at: Epoch seconds by which the requester needs an answer
+        deadline_ms: The requested budget (labels the deadline metrics)
         
     Returns:
-        dict: Analysis results with document_id and analysis data
+        dict: Reference to the stored analysis ({document_id, analysis_id, status}).
+              The full analysis lives in the analysis_results table, so the
+              result backend only ever holds this small payload.
     """
     logger.info(f"Starting analysis task for document: {doc_id}")
     self.update_state(state='STARTED', meta={'status': 'Analysis started'})
@@ -59,170 +504,158 @@ def analyze_document_task(self, doc_id):
         logger.info(f"Document found, content length: {len(document.get('content', ''))}")
         text = document['content']
         start_time = time.time()
+        text_hash = content_hash(text)
+        checkpoint = AnalysisCheckpoint(doc_id, text_hash, PIPELINE_VERSION)
+        attempt = checkpoint.start_attempt()
+        if attempt > config[env].CHECKPOINT_MAX_ATTEMPTS:
+            error_msg = f'Analysis of {doc_id} abandoned after {attempt - 1} interrupted attempts'
+            logger.error(error_msg)
+            checkpoint.clear()
+            db_mgr.update_document_status(doc_id, 'error')
+            self.update_state(state='FAILURE', meta={'error': error_msg})
+            return {'error': error_msg}
+
+        max_chunks = max_chunks or config[env].SUMMARY_MAX_CHUNKS
+        budget = Budget(deadline_at)
+        partial_ref = {}
+
+        def progress(status, percent):
+            self.update_state(state='PROGRESS', meta={'status': status, 'progress': percent, **checkpoint.summary(),
+                                                      **partial_ref})
         
         # Update status to PROGRESS
-        self.update_state(state='PROGRESS', meta={'status': 'Processing document...', 'progress': 10})
+        progress('Processing document...', 10)
         
         try:
             # Log original text length
             logger.info(f"Original text length (chars): {len(text)}")
-            # Use tokenizer to truncate text to model max length tokens (1024 tokens)
-            self.update_state(state='PROGRESS', meta={'status': 'Tokenizing text...', 'progress': 20})
-            tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
-            max_tokens = 1024
-            tokens = tokenizer.encode(text, truncation=True, max_length=max_tokens)
-            logger.info(f"Tokenized input length after truncation: {len(tokens)}")
-            truncated_text = tokenizer.decode(tokens, skip_special_tokens=True)
-            logger.info(f"Truncated text length (chars): {len(truncated_text)}")
-            
-            # Generate summary
-            self.update_state(state='PROGRESS', meta={'status': 'Generating summary...', 'progress': 40})
-            summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-            summary = summarizer(truncated_text, max_length=150, min_length=30, do_sample=False)[0]['summary_text']
-            # Advanced clause extraction and identification
-            self.update_state(state='PROGRESS', meta={'status': 'Extracting clauses...', 'progress': 60})
-            import re
-
-            # Define clause patterns and their corresponding types
-            clause_patterns = {
-                'confidentiality': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:confidentiality|confidential|non-disclosure|nda)',
-                    r'(?i)confidentiality\s*(?:agreement|clause|provision)',
-                    r'(?i)non-disclosure\s*(?:agreement|clause|provision)'
-                ],
-                'indemnity': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:indemnity|indemnification)',
-                    r'(?i)indemnity\s*(?:clause|provision|agreement)',
-                    r'(?i)indemnification\s*(?:clause|provision|agreement)'
-                ],
-                'liability': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:liability|limitation of liability)',
-                    r'(?i)liability\s*(?:clause|provision|limitation)',
-                    r'(?i)limitation\s*of\s*liability'
-                ],
-                'termination': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:termination|termination of agreement)',
-                    r'(?i)termination\s*(?:clause|provision|rights|conditions)',
-                    r'(?i)term\s*and\s*termination'
-                ],
-                'governing_law': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:governing law|governing law and jurisdiction)',
-                    r'(?i)governing\s*(?:law|jurisdiction)',
-                    r'(?i)applicable\s*law'
-                ],
-                'dispute_resolution': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:dispute|arbitration|dispute resolution)',
-                    r'(?i)dispute\s*(?:resolution|settlement)',
-                    r'(?i)arbitration\s*(?:clause|agreement|provision)'
-                ],
-                'payment_terms': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:payment|compensation|fees)',
-                    r'(?i)payment\s*(?:terms|conditions|schedule)',
-                    r'(?i)compensation\s*(?:clause|provision)'
-                ],
-                'intellectual_property': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:intellectual property|ip|copyright|patent)',
-                    r'(?i)intellectual\s*property\s*(?:rights|clause|provision)',
-                    r'(?i)ip\s*(?:rights|clause|provision)'
-                ],
-                'warranties': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:warranty|warranties|representations)',
-                    r'(?i)warranty\s*(?:clause|provision|disclaimer)',
-                    r'(?i)representations?\s*and\s*warranties?'
-                ],
-                'definitions': [
-                    r'(?i)(?:article|section|clause)\s*\d*\.?\s*(?:definitions?|defined terms)',
-                    r'(?i)definitions?\s*(?:clause|section)',
-                    r'(?i)defined\s*terms?'
-                ]
-            }
+            # Tokenize once; structure and summary chunks share these offsets
+            tokens = tokenize_document(text, SUMMARIZER_MODEL, text_hash)
+            progress('Extracting document structure...', 20)
+            sections = run_stage(checkpoint, 'structure', lambda: extract_structure(text, tokens))
 
-            # Split text into paragraphs/lines for better clause identification
-            paragraphs = re.split(r'\n\s*\n|\n(?=[A-Z][^a-z]*:|\d+\.)', text)
-
-            identified_clauses = []
-            remaining_text = text
-
-            # Find and extract each type of clause
-            for clause_type, patterns in clause_patterns.items():
-                for pattern in patterns:
-                    matches = list(re.finditer(pattern, remaining_text, re.IGNORECASE))
-                    for match in matches:
-                        # Find the clause boundaries (next section heading or end of text)
-                        start_pos = match.start()
-                        clause_heading = match.group().strip()
-
-                        # Look for the end of this clause (next major heading or end of text)
-                        remaining_after_match = remaining_text[start_pos:]
-                        next_section_match = re.search(r'\n\s*(?:article|section|clause)\s*\d+', remaining_after_match[1:], re.IGNORECASE)
-
-                        if next_section_match:
-                            end_pos = start_pos + next_section_match.start()
-                            clause_content = remaining_text[start_pos:end_pos].strip()
-                        else:
-                            # Take reasonable amount of text after the heading
-                            lines = remaining_after_match.split('\n')[:10]  # Take first 10 lines
-                            clause_content = '\n'.join(lines).strip()
-
-                        if clause_content and len(clause_content) > len(clause_heading) + 10:  # Ensure we have substantial content
-                            identified_clauses.append({
-                                'type': clause_type,
-                                'heading': clause_heading,
-                                'content': clause_content
-                            })
-
-                            # Remove this clause from remaining text to avoid duplicates
-                            remaining_text = remaining_text.replace(clause_content, '', 1)
-                            break  # Only take the first match for each pattern
-                    else:
-                        continue
-                    break
-
-            # If no clauses were identified, provide basic sentence-based extraction
-            if not identified_clauses:
-                sentences = [s.strip() for s in re.split(r'[.!?]+', text) if s.strip()]
-                for i, sentence in enumerate(sentences[:20]):  # Limit to first 20 sentences
-                    identified_clauses.append({
-                        'type': 'general',
-                        'heading': f'Clause {i+1}',
-                        'content': sentence
-                    })
-
-            # Simple risk identification: keyword search
-            risk_keywords = ['risk', 'liability', 'penalty', 'breach', 'termination']
-            risks = [word for word in risk_keywords if word in text.lower()]
-
-            # Calculate classification percentages based on identified clauses
-            clause_categories = {
-                'definitions': ['definitions', 'defined terms'],
-                'payment_terms': ['payment', 'fee', 'compensation', 'price', 'cost', 'invoice'],
-                'termination': ['terminate', 'termination', 'cancel', 'cancellation', 'end'],
-                'liability': ['liability', 'liable', 'responsible', 'indemnify', 'indemnification'],
-                'confidentiality': ['confidential', 'confidentiality', 'secret', 'non-disclosure'],
-                'intellectual_property': ['intellectual property', 'copyright', 'patent', 'trademark', 'ip'],
-                'governing_law': ['governing law', 'jurisdiction', 'court', 'arbitration'],
-                'warranties': ['warranty', 'warrant', 'represent', 'representation', 'guarantee']
-            }
+            # A revision of an analyzed document, or a copy of a registered
+            # template, only recomputes the sections whose hashes changed
+            base = load_revision_base(db_mgr, document) or load_template_base(db_mgr, document, sections)
+            diff = SectionDiff(base['analysis']['sections'], sections) if base else None
+
+            # Clause extraction is cheap, but checkpointing it keeps a resumed
+            # task consistent with the chunks summarized before the crash
+            def compute_clauses():
+                if diff:
+                    revised = run_stage(checkpoint, f'clauses:{config[env].CLAUSE_STAGE}:revision',
+                                        lambda: revise_clauses(text, text_hash, sections, diff,
+                                                               base['analysis'].get('clauses') or []))
+                    return revised['clauses'], revised['parent_index']
+                clauses = run_stage(checkpoint, f'clauses:{config[env].CLAUSE_STAGE}',
+                                    lambda: find_clauses(text, text_hash, sections=sections))
+                return clauses, [None] * len(clauses)
+
+            # One batched classifier pass over every clause not scored before
+            def compute_risk(clauses, parent_index):
+                known = None
+                if diff and base['risk_probs']:
+                    parent_probs = unpack_probs(base['risk_probs'])
+                    known = {i: parent_probs[p].tolist() for i, p in enumerate(parent_index)
+                             if p is not None and p < len(parent_probs)}
+                return run_stage(checkpoint, 'risk_scores', lambda: score_risk(text, clauses, known))
+
+            # Under a deadline the abstractive summary comes last; if it will
+            # not fit, answer with the cheap stages first and keep refining
+            partial = None
+            if deadline_at is not None:
+                chunks = min(max_chunks, math.ceil(len(tokens) / 1024)) or 1
+                if not budget.allows(chunks * config[env].DEADLINE_SECONDS_PER_CHUNK):
+                    progress('Preparing partial analysis...', 25)
+                    partial = deadline_preview(text, sections, len(tokens), budget, compute_clauses,
+                                               compute_risk)
+                    partial_id = db_mgr.store_analysis_result(
+                        doc_id, partial, time.time() - start_time,
+                        {"pipeline": "bart", "pipeline_version": PIPELINE_VERSION}, status='partial')
+                    partial_ref.update(partial_analysis_id=partial_id, partial=True)
+                    metrics.inc('deadline_analyses_total', budget=budget_level(deadline_ms), outcome='partial')
+                    logger.info(f"Stored partial analysis {partial_id} of {doc_id} "
+                                f"({partial['completed_stages']}), refining")
+
+            progress('Extracting clauses...', 30)
+            identified_clauses, parent_index = compute_clauses()
+            progress('Scoring clause risk...', 35)
+            risk_scores = compute_risk(identified_clauses, parent_index)
 
-            classification = {}
-            total_clauses = len(identified_clauses) if identified_clauses else 1
+            # Generate summary
+            progress('Generating summary...', 40)
+            reused_chunks = None
+            if diff:
+                reused_chunks = []
+                for chunk in base['analysis'].get('summary_chunks') or []:
+                    span = diff.shift(chunk['start'], chunk['end'])
+                    if span:
+                        reused_chunks.append((span[0], span[1], chunk['summary']))
+            summary, summary_chunks, chunk_counts = summarize_chunks(
+                tokens, text, checkpoint, max_chunks, reused_chunks)
 
-            for category, keywords in clause_categories.items():
-                matching_clauses = sum(1 for clause in identified_clauses
-                                     if any(keyword in clause['content'].lower() for keyword in keywords))
-                percentage = round((matching_clauses / total_clauses) * 100, 2) if total_clauses > 0 else 0.0
-                classification[category] = percentage
+            # Risk flags and classification from single keyword-automaton scans
+            hits = scan_keywords(text)
+            risks = risk_flags(text, hits)
+            classification = classify_clauses(identified_clauses, text, hits)
 
             analysis = {
                 'summary': summary,
                 'clauses': identified_clauses,
                 'risks': risks,
-                'classification': classification
+                'classification': classification,
+                'section_count': len(sections),
+                'sections': sections,
+                'summary_chunks': summary_chunks
             }
-            model_versions = {"summarizer": "facebook/bart-large-cnn"}
+            if diff:
+                clauses_reused = sum(1 for p in parent_index if p is not None)
+                reuse = {
+                    'sections_total': len(sections),
+                    'sections_recomputed': diff.changed,
+                    'sections_reused': len(diff.reused),
+                    'clauses_reused': clauses_reused,
+                    'clauses_recomputed': len(identified_clauses) - clauses_reused,
+                    **chunk_counts,
+                }
+                if base['kind'] == 'revision':
+                    analysis['revision'] = {'parent_document_id': base['document_id'],
+                                            'parent_analysis_id': base['analysis_id'], **reuse}
+                else:
+                    # Summaries dominate the template's own analysis time
+                    template_chunks = len(base['analysis'].get('summary_chunks') or []) or 1
+                    saved = base['processing_time'] * min(1.0, chunk_counts['chunks_reused'] / template_chunks)
+                    analysis['template'] = {'template_id': base['template_id'], 'name': base['name'],
+                                            'coverage': base['coverage'], 'match_ms': base['match_ms'],
+                                            'estimated_seconds_saved': round(saved, 2), **reuse}
+                    metrics.inc('template_seconds_saved_total', saved)
+                metrics.inc('incremental_sections_total', len(diff.reused), source=base['kind'], outcome='reused')
+                metrics.inc('incremental_sections_total', len(diff.changed), source=base['kind'], outcome='recomputed')
+                metrics.inc('incremental_chunks_total', chunk_counts['chunks_reused'], source=base['kind'],
+                            outcome='reused')
+                metrics.inc('incremental_chunks_total', chunk_counts['chunks_generated'], source=base['kind'],
+                            outcome='generated')
+                logger.info(f"Reused {base['kind']} analysis: recomputed sections {diff.changed} "
+                            f"of {len(sections)}, reused {chunk_counts['chunks_reused']} summary chunks")
+            apply_risk_scores(analysis, risk_scores)
+            if deadline_at is not None:
+                level = budget_level(deadline_ms)
+                if partial:
+                    quality = partial_quality(partial, analysis)
+                    analysis['refined_from'] = {'analysis_id': partial_ref['partial_analysis_id'], **quality}
+                    metrics.observe('deadline_partial_summary_f1', quality['summary_f1'],
+                                    buckets=(0.2, 0.4, 0.6, 0.8, 1.0), budget=level)
+                    metrics.observe('deadline_partial_clause_recall', quality['clause_recall'],
+                                    buckets=(0.2, 0.4, 0.6, 0.8, 1.0), budget=level)
+                else:
+                    metrics.inc('deadline_analyses_total', budget=level,
+                                outcome='late' if budget.expired() else 'in_time')
+            model_versions = {"summarizer": SUMMARIZER_MODEL, "pipeline": "bart",
+                              "pipeline_version": PIPELINE_VERSION, "clause_stage": config[env].CLAUSE_STAGE,
+                              "risk_stage": config[env].RISK_STAGE}
             
             # Update progress
-            self.update_state(state='PROGRESS', meta={'status': 'Saving results...', 'progress': 90})
+            progress('Saving results...', 90)
             
         except Exception as e:
             error_msg = f"Error in analyze_document_task: {str(e)}"
@@ -246,17 +679,23 @@ def analyze_document_task(self, doc_id):
             }
             model_versions = {}
         
-        processing_time = time.time() - start_time
-        logger.info(f"Analysis completed in {processing_time:.2f} seconds")
+        # The full duration, including the stages a resumed task skipped, so
+        # the cost model never learns from the tail of an interrupted run
+        processing_time = time.time() - start_time + checkpoint.recompute_avoided_seconds
+        logger.info(f"Analysis completed in {processing_time:.2f} seconds "
+                    f"(resumed {checkpoint.summary()['resumed_stages']})")
         
         # Store results in MongoDB
         db_mgr = get_db_manager()
-        db_mgr.store_analysis_result(doc_id, analysis, processing_time, model_versions)
+        analysis_id = db_mgr.store_analysis_result(doc_id, analysis, processing_time, model_versions)
         
         # Update document status
         db_mgr.update_document_status(doc_id, 'completed')
+        checkpoint.clear()
         
-        result = {'document_id': doc_id, 'analysis': analysis}
+        # Return a reference only - readers fetch the full analysis from the DB
+        result = {'document_id': doc_id, 'analysis_id': analysis_id, 'status': 'completed',
+                  'checkpoint': checkpoint.summary()}
         logger.info(f"Task completed successfully for document: {doc_id}")
         return result
         
@@ -272,8 +711,132 @@ def analyze_document_task(self, doc_id):
             pass
         raise  # Re-raise to mark task as FAILURE
 
+def _analysis_reference(result):
+    """Reduce a synchronous analysis result to the reference stored in Redis."""
+    if not result or 'error' in result:
+        return result or {'error': 'Analysis failed'}
+    reference = {
+        'document_id': result['document_id'],
+        'analysis_id': result.get('analysis_id'),
+        'status': 'completed'
+    }
+    if 'language_info' in result:
+        reference['language_info'] = result['language_info']
+    return reference
+
+@celery_app.task(bind=True, name='tasks.analyze_document_ml_task')
+def analyze_document_ml_task(self, doc_id):
+    """Run the BART analysis behind /api/analyze-document-temp on an inference worker."""
+    from ml_analysis_sync import analyze_document_ml_sync
+    self.update_state(state='PROGRESS', meta={'status': 'Analysis started'})
+    return _analysis_reference(analyze_document_ml_sync(doc_id))
+
+@celery_app.task(bind=True, name='tasks.analyze_document_multilingual_task')
+def analyze_document_multilingual_task(self, doc_id):
+    """Run the multilingual BART analysis on an inference worker."""
+    from multilingual_analysis import analyze_document_multilingual_sync
+    self.update_state(state='PROGRESS', meta={'status': 'Analysis started'})
+    return _analysis_reference(analyze_document_multilingual_sync(doc_id))
+
+@celery_app.task(name='tasks.stream_summary_task')
+def stream_summary_task(doc_id, stream_id):
+    """Generate a streamed summary on an inference worker for the web request relaying it."""
+    from summary_stream import publish_summary_events
+    document = get_db_manager().get_document(doc_id) or {}
+    publish_summary_events(doc_id, document.get('content') or '', stream_id)
+
+@celery_app.task(bind=True, name='tasks.analyze_document_fast_task')
+def analyze_document_fast_task(self, doc_id):
+    """Run the fast extractive multilingual analysis (used when admission control downgrades)."""
+    from multilingual_analysis import analyze_document_fast_multilingual_sync
+    return _analysis_reference(analyze_document_fast_multilingual_sync(doc_id))
+
+# Tasks submitted through the SEJF dispatcher (scheduler.py)
+SCHEDULED_TASKS = {
+    'tasks.analyze_document_task',
+    'tasks.analyze_document_ml_task',
+    'tasks.analyze_document_multilingual_task',
+}
+
+@task_prerun.connect
+def mark_scheduled_task_started(task_id=None, task=None, **kwargs):
+    """Record the start of a scheduled task so ETAs count down from it."""
+    if task is None or task.name not in SCHEDULED_TASKS:
+        return
+    try:
+        import scheduler
+        scheduler.mark_started(task_id)
+    except Exception as e:
+        logger.warning(f"Could not mark scheduled task {task_id} started: {str(e)}")
+
+@task_postrun.connect
+def dispatch_after_scheduled_task(task_id=None, task=None, **kwargs):
+    """Free the slot of a finished inference task and dispatch the next job."""
+    if task is None or task.name not in SCHEDULED_TASKS:
+        return
+    try:
+        import scheduler
+        timing = scheduler.complete(task_id)
+        if timing:
+            predicted, actual = timing
+            metrics.observe('analysis_duration_prediction_error_seconds', abs(actual - predicted), task=task.name)
+        scheduler.dispatch()
+    except Exception as e:
+        logger.warning(f"Dispatch after task {task_id} failed: {str(e)}")
+
+# Tasks the analysis router can pick (analysis_router.py)
+ROUTED_TASKS = {
+    'tasks.analyze_document_task',
+    'tasks.analyze_document_multilingual_task',
+    'tasks.analyze_document_fast_task',
+}
+
+@task_postrun.connect
+def record_route_outcome(task_id=None, task=None, state=None, **kwargs):
+    """Log the latency of a routed analysis against its routing decision."""
+    if task is None or task.name not in ROUTED_TASKS:
+        return
+    try:
+        import analysis_router
+        analysis_router.complete(task_id, state)
+    except Exception as e:
+        logger.warning(f"Recording the route outcome of task {task_id} failed: {str(e)}")
+
+@celery_app.task(name='tasks.dispatch_scheduled_task')
+def dispatch_scheduled_task():
+    """Periodic safety net that keeps the inference queue fed."""
+    import scheduler
+    return {'dispatched': scheduler.dispatch()}
+
+@celery_app.task(name='tasks.refit_cost_model_task')
+def refit_cost_model_task():
+    """Refit the job cost model on recent analysis_results processing times."""
+    import cost_model
+    history = get_db_manager().db.get_processing_history()
+    rows = []
+    for row in history:
+        document = row.get('documents') or {}
+        model_versions = row.get('model_versions') or {}
+        rows.append({
+            'processing_time': row.get('processing_time'),
+            'text_length': document.get('text_length'),
+            'document_type': document.get('document_type'),
+            'language': model_versions.get('language', 'english'),
+            'pipeline': cost_model.pipeline_from_model_versions(model_versions),
+        })
+    model = cost_model.fit(rows)
+    if model is None:
+        return {'fitted': False, 'rows': len(rows)}
+    cost_model.save_model(model)
+    logger.info(f"Cost model refitted on {model['n']} rows (rmse_log={model['rmse_log']})")
+    return {'fitted': True, 'rows': model['n'], 'rmse_log': model['rmse_log']}
+
 @celery_app.task(bind=True)
 def monitor_drift_task(self):
+    # pandas and evidently are only needed here; keep them out of worker startup
+    import pandas as pd
+    from ml.monitoring.drift_detection import detect_drift, retrain_trigger
+
     # Load reference data (assume CSV with features)
     reference_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/reference_data.csv")
     if os.path.exists(reference_path):
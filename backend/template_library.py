@@ -0,0 +1,103 @@
+"""
+Template library.
+
+Admins register a firm template from an analyzed document: its text, the
+analysis (clauses, risk scores, summary chunks, sections) and its section
+fingerprint (the content hash and length of every section) are stored in
+the ``templates`` table.
+
+At upload each document is fingerprinted with the same structure index and
+looked up in an in-process inverted index of all template fingerprints
+(utils.template_index), refreshed every TEMPLATE_INDEX_TTL_SECONDS. A
+match covering at least TEMPLATE_MIN_COVERAGE of the text is stored on the
+document, and the analysis task then treats the template's analysis like a
+previous version (see tasks.load_template_base): only deviating sections
+are analyzed and the rest is merged from the template.
+"""
+
+import os
+import time
+import logging
+import threading
+
+import metrics
+from config import config
+from utils.structure import extract_structure
+from utils.template_index import TemplateIndex, fingerprint
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+_index = None
+_loaded_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_index(db):
+    """The template fingerprint index, reloaded from the database when stale."""
+    global _index, _loaded_at
+    with _index_lock:
+        if _index is None or time.time() - _loaded_at > config[env].TEMPLATE_INDEX_TTL_SECONDS:
+            rows = db.list_template_fingerprints()
+            _index = TemplateIndex({row['id']: row.get('fingerprint') or [] for row in rows})
+            _loaded_at = time.time()
+            logger.info(f"Loaded fingerprints of {len(_index)} templates")
+        return _index
+
+
+def invalidate():
+    """Reload the index on next use (after a template is added or removed)."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def match_document(db, text, sections=None):
+    """
+    Closest registered template of a document.
+
+    Args:
+        db: SupabaseDB
+        text: Document text
+        sections: Structure index of ``text`` (computed if not given)
+
+    Returns:
+        dict: {'template_id' (None below TEMPLATE_MIN_COVERAGE), 'coverage',
+               'match_ms'}
+    """
+    started = time.time()
+    sections = sections if sections is not None else extract_structure(text)
+    template_id, coverage = get_index(db).match(fingerprint(sections))
+    seconds = time.time() - started
+    matched = template_id is not None and coverage >= config[env].TEMPLATE_MIN_COVERAGE
+    metrics.observe('template_match_seconds', seconds)
+    metrics.inc('template_matches_total', outcome='matched' if matched else 'unmatched')
+    return {'template_id': template_id if matched else None, 'coverage': coverage,
+            'match_ms': round(seconds * 1000, 3)}
+
+
+def register(db, name, document, analysis_row, user_id=None):
+    """
+    Register an analyzed document as a template.
+
+    Args:
+        db: SupabaseDB
+        name: Template name
+        document: Document row (its content becomes the template text)
+        analysis_row: The document's analysis_results row; its analysis must
+                      come from the BART pipeline (it carries sections)
+        user_id: Registering admin
+
+    Returns:
+        str: New template id
+    """
+    analysis = analysis_row.get('analysis_results') or {}
+    versions = analysis_row.get('model_versions') or {}
+    if versions.get('pipeline') != 'bart' or not analysis.get('sections'):
+        raise ValueError('Templates need an analysis from the BART pipeline (analyze-document)')
+    text = document.get('content') or ''
+    template_id = db.insert_template(name, text, fingerprint(extract_structure(text)), analysis, versions,
+                                     analysis_row.get('processing_time') or 0, document.get('id'), user_id)
+    invalidate()
+    return template_id
@@ -1,9 +1,19 @@
 import pytest
 import os
 import tempfile
+import fakeredis
+import redis_client
 from app import app
 
 
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """In-memory Redis behind redis_client.get_redis() for every module."""
+    r = fakeredis.FakeRedis()
+    monkeypatch.setattr(redis_client, '_redis_client', r)
+    return r
+
+
 @pytest.fixture
 def client():
     app.config['SUPABASE_URL'] = os.getenv('SUPABASE_URL', 'https://test-project.supabase.co')
@@ -0,0 +1,63 @@
+import pytest
+from flask import Flask, request, jsonify
+
+import admission
+import metrics
+from scheduler import PENDING_KEY
+
+class Cfg:
+    ADMISSION_ENABLED = True
+    ADMISSION_USER_RATE, ADMISSION_USER_BURST = 1.0, 2
+    ADMISSION_GLOBAL_RATE, ADMISSION_GLOBAL_BURST = 10.0, 100
+    ADMISSION_QUEUE_SOFT_LIMIT, ADMISSION_QUEUE_HARD_LIMIT = 3, 5
+    ADMISSION_OVERLOAD_POLICY = 'downgrade'
+    INFERENCE_QUEUE = 'inference'
+
+@pytest.fixture
+def r(fake_redis, monkeypatch):
+    r = fake_redis
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, 'time', lambda: now[0])
+    r.now = now
+    return r
+
+def test_token_bucket_admits_a_burst_then_rejects_until_refilled(r):
+    controller = admission.AdmissionController(Cfg)
+    assert [controller.check('u1').action for _ in range(3)] == ['admit', 'admit', 'reject']
+    rejected = controller.check('u1')
+    assert rejected.reason == 'user_rate_limit' and 0 < rejected.retry_after <= 1
+    # Another user has a bucket of their own
+    assert controller.check('u2').action == 'admit'
+    r.now[0] += 1
+    assert controller.check('u1').action == 'admit'
+
+def test_queue_depth_downgrades_then_rejects(r):
+    controller = admission.AdmissionController(Cfg)
+    r.rpush('inference', 'a', 'b')
+    r.zadd(PENDING_KEY, {'c': 1})
+    assert controller.queue_depth(r) == 3
+    assert b'analysis_queue_depth{queue="inference"}' in r.hgetall(metrics.GAUGE_KEY)
+
+    assert controller.check('u1', downgradable=True).action == 'downgrade'
+    assert controller.check('u2').reason == 'queue_backlog'
+    r.rpush('inference', 'd', 'e')
+    assert controller.check('u3', downgradable=True).reason == 'queue_full'
+
+def test_decorator_answers_429_with_retry_after(r, monkeypatch):
+    monkeypatch.setattr(admission, 'admission_controller', admission.AdmissionController(Cfg))
+    app = Flask(__name__)
+
+    @app.route('/analyze', methods=['POST'])
+    @admission.admission_controlled('analyze', downgradable=True)
+    def analyze():
+        return jsonify(downgraded=request.admission.downgrade)
+
+    with app.test_client() as client:
+        assert client.post('/analyze').json == {'downgraded': False}
+        client.post('/analyze')
+        resp = client.post('/analyze')
+    assert resp.status_code == 429
+    assert resp.headers['Retry-After'] == '1'
+    assert resp.json['reason'] == 'user_rate_limit'
+    counters = {k.decode(): float(v) for k, v in r.hgetall(metrics.COUNTER_KEY).items()}
+    assert counters['admission_decisions_total{decision="reject",endpoint="analyze",reason="user_rate_limit"}'] == 1
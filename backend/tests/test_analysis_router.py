@@ -0,0 +1,33 @@
+import analysis_router
+from utils.document_features import document_features
+
+ENGLISH = ' '.join(f"Section {i} The supplier shall deliver the goods described in schedule {i} "
+                   f"within thirty days and the customer shall pay each invoice in full." for i in range(1, 200))
+HINDI = ' '.join(f"धारा {i} आपूर्तिकर्ता अनुसूची में वर्णित माल तीस दिनों के भीतर वितरित करेगा।" for i in range(1, 200))
+
+def test_features_are_computed_without_a_tokenizer():
+    features = document_features('Section 1 Term.\nSection 2 Payment is due in thirty days.')
+    assert features['section_count'] == 2
+    assert features['script_ratio'] == 0.0
+    assert features['language'] == 'english'
+    assert 5 < features['estimated_tokens'] < 20
+
+    hindi = document_features(HINDI)
+    assert hindi['script_ratio'] > 0.9
+    assert hindi['language'] == 'hindi'
+
+def test_routes_by_size_structure_and_script():
+    short = analysis_router.route(document_features('Payment is due in thirty days.'))
+    assert (short['pipeline'], short['reason']) == ('fast', 'short')
+
+    long = analysis_router.route(document_features(ENGLISH))
+    assert long['pipeline'] == 'bart'
+    assert long['max_chunks'] > 1
+    assert long['task'] == 'tasks.analyze_document_task'
+
+    indic = analysis_router.route(document_features(HINDI))
+    assert (indic['pipeline'], indic['reason']) == ('multilingual', 'indic:hindi')
+
+    # One long paragraph without sections is simple enough for the fast path
+    plain = analysis_router.route(document_features(' '.join(['The customer shall pay each invoice.'] * 150)))
+    assert (plain['pipeline'], plain['reason']) == ('fast', 'simple')
@@ -0,0 +1,103 @@
+import re
+
+import pytest
+
+import tasks
+import tokenization
+from checkpoints import AnalysisCheckpoint
+
+TEXT = '\n'.join(f"Section {i} Payment. The customer shall pay invoice {i} within thirty days. " * 60
+                 for i in range(1, 4))
+
+class WhitespaceTokenizer:
+    """Word-level stand-in for a fast tokenizer: <s>=0, </s>=2."""
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=True, verbose=False):
+        spans = [m.span() for m in re.finditer(r'\S+', text)]
+        return {'input_ids': [10 + i for i in range(len(spans))], 'offset_mapping': spans}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [0] + ids + [2]
+
+class WorkerLost(BaseException):
+    """The worker process dying mid-task (not handled by the task)."""
+
+class FakeDB:
+    def __init__(self):
+        self.stored = []
+
+    def get_document(self, doc_id):
+        return {'id': doc_id, 'content': TEXT}
+
+    def store_analysis_result(self, doc_id, analysis, processing_time, model_versions, status='completed'):
+        self.stored.append({'analysis': analysis, 'processing_time': processing_time, 'status': status})
+        return f'analysis-{len(self.stored)}'
+
+    def update_document_status(self, doc_id, status):
+        pass
+
+@pytest.fixture
+def db(fake_redis, monkeypatch):
+    monkeypatch.setattr(tokenization.model_store, 'load_tokenizer', lambda name: WhitespaceTokenizer())
+    monkeypatch.setattr(tasks.config[tasks.env], 'TEMPLATES_ENABLED', False)
+    monkeypatch.setattr(tasks.analyze_document_task, 'update_state', lambda *args, **kwargs: None)
+    db = FakeDB()
+    monkeypatch.setattr(tasks, 'get_db_manager', lambda: db)
+    return db
+
+def test_redelivered_task_resumes_after_completed_stages(db, monkeypatch):
+    generated = []
+    def generate(input_ids, **params):
+        if len(generated) == 2:
+            raise WorkerLost()
+        generated.append(len(input_ids))
+        return f'Summary of chunk {len(generated)}.'
+    monkeypatch.setattr(tasks.inference_client, 'generate', generate)
+
+    with pytest.raises(WorkerLost):
+        tasks.analyze_document_task.run('doc-1', 3)
+    assert not db.stored
+
+    # The redelivered task only generates the chunk that is still missing
+    generated.clear()
+    result = tasks.analyze_document_task.run('doc-1', 3)
+    assert len(generated) == 1
+    resumed = result['checkpoint']['resumed_stages']
+    assert {'structure', 'summary_chunk:0', 'summary_chunk:1'} <= set(resumed)
+    assert db.stored[0]['analysis']['summary'] == 'Summary of chunk 1. Summary of chunk 2. Summary of chunk 1.'
+    # The stored duration includes the stages the first delivery computed
+    assert db.stored[0]['processing_time'] >= result['checkpoint']['recompute_avoided_seconds']
+
+def test_stages_computed_by_the_same_task_are_not_resumes(db):
+    checkpoint = AnalysisCheckpoint('doc-1', 'hash', 'v1')
+    checkpoint.save('structure', [1, 2], 1.5)
+    assert checkpoint.load('structure') == [1, 2]
+    assert checkpoint.summary() == {'resumed_stages': [], 'recompute_avoided_seconds': 0.0}
+
+    redelivered = AnalysisCheckpoint('doc-1', 'hash', 'v1')
+    assert redelivered.load('structure') == [1, 2]
+    assert redelivered.summary() == {'resumed_stages': ['structure'], 'recompute_avoided_seconds': 1.5}
+
+def test_redelivery_stops_after_max_attempts(db, monkeypatch):
+    monkeypatch.setattr(tasks.config[tasks.env], 'CHECKPOINT_MAX_ATTEMPTS', 2)
+    statuses = []
+    monkeypatch.setattr(db, 'update_document_status', lambda doc_id, status: statuses.append(status))
+    generated = []
+    def generate(input_ids, **params):
+        generated.append(len(input_ids))
+        raise WorkerLost()
+    monkeypatch.setattr(tasks.inference_client, 'generate', generate)
+
+    for _ in range(2):
+        with pytest.raises(WorkerLost):
+            tasks.analyze_document_task.run('doc-1', 3)
+    assert len(generated) == 2
+
+    # The third delivery is failed without running the document again
+    result = tasks.analyze_document_task.run('doc-1', 3)
+    assert 'error' in result
+    assert len(generated) == 2
+    assert statuses == ['error'] and not db.stored
@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+import clause_cache
+import clause_model
+from utils.hashing import clause_hash
+from utils.structure import extract_structure
+
+NDA = ('Agreement.\n'
+       'Section 1 Confidentiality. Each party keeps the other party\'s information secret.\n'
+       'Section 2 Term. This agreement lasts for two years.\n'
+       'Section 3 Governing Law. This agreement is governed by the laws of India.')
+
+@pytest.fixture(autouse=True)
+def cache(fake_redis, monkeypatch):
+    monkeypatch.setattr(clause_cache, 'model_revision', lambda *args, **kwargs: 'test')
+    clause_cache.clear_memory()
+
+def test_boilerplate_hashes_ignore_layout_and_numbering():
+    assert clause_hash('12.3  The Party’s liability\nis LIMITED.') == clause_hash("the party's liability is limited.")
+    assert clause_hash('30 days notice') != clause_hash('60 days notice')
+
+def test_outputs_are_shared_through_redis():
+    assert clause_cache.get_many('risk', 'test', ['Each party keeps it secret.']) == [None]
+    clause_cache.put_many('risk', 'test', ['Each party keeps it secret.'], [[0.7, 0.2, 0.1]])
+    clause_cache.clear_memory()
+    assert clause_cache.get_many('risk', 'test', ['EACH  party keeps it secret.', 'Other.']) == [[0.7, 0.2, 0.1], None]
+    assert clause_cache.get_many('risk', 'other-model', ['Each party keeps it secret.']) == [None]
+
+def test_only_uncached_sections_reach_the_clause_model(monkeypatch):
+    calls = []
+
+    def fake_model(text, text_hash=None, backend=None):
+        # One clause per "Section N" heading, up to the end of its line
+        calls.append(text)
+        return [{'type': 'general', 'heading': m.group(1), 'start': m.start(), 'end': m.end(), 'page': 1,
+                 'confidence': 0.9} for m in re.finditer(r'(Section \d+)[^\n]*', text)]
+
+    monkeypatch.setattr(clause_model, 'extract_clauses', fake_model)
+    first = clause_model.extract_section_clauses(NDA, extract_structure(NDA))
+    assert calls == [NDA]
+
+    revised = NDA.replace('two years', 'three years').replace('Agreement.', 'Amended Agreement.')
+    second = clause_model.extract_section_clauses(revised, extract_structure(revised))
+    assert len(calls) == 3  # the edited title and term sections only
+    assert [revised[c['start']:c['end']] for c in second] == \
+        [NDA[c['start']:c['end']].replace('two years', 'three years') for c in first]
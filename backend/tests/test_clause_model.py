@@ -0,0 +1,21 @@
+import numpy as np
+import clause_model
+
+def test_windows_overlap_and_cover_the_document():
+    bounds = clause_model.window_bounds(1100, 510, 128)
+    assert bounds == [(0, 510), (382, 892), (764, 1100)]
+    assert clause_model.window_bounds(100, 510, 128) == [(0, 100)]
+    assert clause_model.window_bounds(0, 510, 128) == [(0, 0)]
+
+def test_overlapping_predictions_merge_into_spans():
+    bounds = clause_model.window_bounds(20, 12, 4)
+    truth = np.zeros(20, dtype=np.float32)
+    truth[5:15] = 1.0
+    # The second window is unsure near its left edge; the first window's
+    # centre dominates there
+    second = truth[8:20].copy()
+    second[:2] = 0.2
+    probs = clause_model.merge_window_probs(20, bounds, [truth[0:12], second])
+    assert probs.shape == (20,)
+    assert clause_model.probability_runs(probs, 0.5, min_tokens=3) == [(5, 15)]
+    assert clause_model.probability_runs(probs, 0.5, min_tokens=11) == []
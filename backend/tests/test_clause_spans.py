@@ -0,0 +1,28 @@
+from tasks import extract_clauses
+from utils.clause_spans import clause_preview, with_previews, HEADING_CONFIDENCE
+
+TEXT = ('Services Agreement between the parties.\n'
+        'Section 1 Confidentiality. Each party keeps the other party\'s information secret.\f'
+        'Section 2 Termination. Either party may terminate on thirty days written notice.\n'
+        'Section 3 Payment. Fees are payable within thirty days of each invoice.')
+
+def test_clauses_are_spans_with_pages():
+    clauses = extract_clauses(TEXT)
+    by_type = {clause['type']: clause for clause in clauses}
+    assert 'content' not in by_type['termination']
+
+    confidentiality = by_type['confidentiality']
+    assert TEXT[confidentiality['start']:confidentiality['end']].startswith('Section 1 Confidentiality')
+    assert confidentiality['page'] == 1
+    assert confidentiality['confidence'] == HEADING_CONFIDENCE
+
+    termination = by_type['termination']
+    assert TEXT[termination['start']:termination['end']] == \
+        'Section 2 Termination. Either party may terminate on thirty days written notice.'
+    assert termination['page'] == 2
+
+def test_previews_are_rendered_on_request():
+    clause = {'type': 'termination', 'start': TEXT.index('Section 2'), 'end': TEXT.index('\nSection 3')}
+    assert clause_preview(TEXT, clause, max_chars=21) == 'Section 2 Termination...'
+    # Records stored before spans still carry their content
+    assert with_previews([{'content': 'Old\n clause'}], TEXT)[0]['preview'] == 'Old clause'
@@ -0,0 +1,47 @@
+import math
+import random
+import cost_model
+
+def _history(n=200):
+    random.seed(0)
+    rows = []
+    for _ in range(n):
+        pipeline = random.choice(['bart', 'fast'])
+        text_length = random.randint(500, 200000)
+        seconds = (0.2 if pipeline == 'fast' else 4.0) * (text_length / 1000) ** 0.5
+        rows.append({
+            'text_length': text_length,
+            'document_type': random.choice(['pdf', 'docx', 'txt']),
+            'language': 'english',
+            'pipeline': pipeline,
+            'processing_time': seconds * random.uniform(0.9, 1.1),
+        })
+    return rows
+
+def test_featurize_matches_feature_names():
+    row = cost_model.featurize(1000, 'pdf', 'hindi', 'fast')
+    assert len(row) == len(cost_model.feature_names())
+    assert row[0] == 1.0
+    assert row[1] == math.log1p(1000)
+
+def test_fit_needs_enough_history():
+    assert cost_model.fit(_history(5)) is None
+
+def test_fit_orders_short_jobs_before_long_ones():
+    model = cost_model.fit(_history())
+    assert model['n'] == 200
+    short_nda = cost_model.predict(model, 3000, 'docx', 'english', 'bart')
+    long_contract = cost_model.predict(model, 150000, 'pdf', 'english', 'bart')
+    fast = cost_model.predict(model, 150000, 'pdf', 'english', 'fast')
+    assert short_nda < long_contract
+    assert fast < long_contract
+
+def test_predict_without_model_uses_defaults():
+    assert cost_model.predict(None, 0, pipeline='fast') == cost_model.DEFAULT_COSTS['fast'][0]
+    assert cost_model.predict(None, 10000, pipeline='bart') > cost_model.predict(None, 1000, pipeline='bart')
+
+def test_pipeline_from_model_versions():
+    assert cost_model.pipeline_from_model_versions({'pipeline': 'fast'}) == 'fast'
+    assert cost_model.pipeline_from_model_versions({'analysis_type': 'fast_multilingual'}) == 'fast'
+    assert cost_model.pipeline_from_model_versions({'language': 'hindi'}) == 'multilingual'
+    assert cost_model.pipeline_from_model_versions({}) == 'bart'
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+import deadlines
+from utils.deadline import STAGES, Budget, budget_level, partial_quality
+
+CONTRACT = '\n'.join(f"Section {i}. The supplier shall deliver the goods within thirty days. "
+                     f"The customer shall indemnify the supplier against all claims." for i in range(1, 30))
+
+def test_budget_and_levels():
+    assert Budget().allows(1e9) and not Budget().expired()
+    budget = Budget(time.time() + 2)
+    assert budget.allows(1) and not budget.allows(5)
+    assert Budget(time.time() - 1).expired()
+    assert [budget_level(ms) for ms in (1500, 5000, 8000, 60000)] == ['<=2s', '<=5s', '<=10s', '>30s']
+
+def test_partial_quality_against_refined_analysis():
+    final = {'summary': 'The supplier delivers goods within thirty days.',
+             'clauses': [{'start': 0, 'end': 10}, {'start': 20, 'end': 30}]}
+    assert partial_quality(final, final) == {'summary_f1': 1.0, 'clause_recall': 1.0}
+    quality = partial_quality({'summary': 'The supplier delivers goods.', 'clauses': [{'start': 0, 'end': 10}]}, final)
+    assert 0 < quality['summary_f1'] < 1
+    assert quality['clause_recall'] == 0.5
+
+def test_preview_marks_cheap_stages_complete():
+    analysis = deadlines.preview(CONTRACT)
+    assert analysis['partial'] is True
+    assert analysis['summary_type'] == 'extractive' and analysis['summary']
+    assert analysis['section_count'] > 1
+    assert {'structure', 'extractive_summary'} <= set(analysis['completed_stages'])
+    assert 'abstractive_summary' in analysis['pending_stages']
+    assert set(analysis['completed_stages']) | set(analysis['pending_stages']) == set(STAGES)
+
+def test_limits_keep_deadlines_inside_the_gunicorn_timeout():
+    class Cfg:
+        GUNICORN_TIMEOUT, DEADLINE_MIN_MS, DEADLINE_MAX_MS = 120, 1000, 15000
+    deadlines.check_limits(Cfg)
+    Cfg.DEADLINE_MAX_MS = 120000
+    with pytest.raises(ValueError):
+        deadlines.check_limits(Cfg)
+
+def test_waiter_slots_are_shared_and_released(fake_redis, monkeypatch):
+    r = fake_redis
+    monkeypatch.setattr(deadlines, 'max_waiters', lambda cfg: 1)
+    deadline_at = time.time() + 5
+    with deadlines.waiter_slot(deadline_at) as first:
+        with deadlines.waiter_slot(deadline_at) as second:
+            assert first and not second
+    with deadlines.waiter_slot(deadline_at) as again:
+        assert again
+    assert r.zcard(deadlines.WAITERS_KEY) == 0
+
+def test_downgraded_requests_validate_and_honour_the_deadline(fake_redis, monkeypatch):
+    import app as app_module
+    import admission
+    import analysis_router
+
+    class Task:
+        id, state, info = 'task-1', 'SUCCESS', {'analysis_id': 'analysis-1'}
+    sent = []
+    monkeypatch.setattr(admission.admission_controller, 'check',
+                        lambda identity, downgradable=False: admission.AdmissionDecision(admission.DOWNGRADE,
+                                                                                        'queue_backlog'))
+    monkeypatch.setattr(app_module.celery_app, 'send_task', lambda name, args: sent.append(name) or Task())
+    monkeypatch.setattr(app_module.db_manager, 'get_document',
+                        lambda doc_id: {'id': doc_id, 'user_id': 'user-1', 'content': CONTRACT})
+    monkeypatch.setattr(app_module.db_manager, 'get_analysis_result_by_id',
+                        lambda analysis_id: {'analysis_results': {'summary': 'Fast summary.'}})
+
+    flask_app = app_module.app
+    with flask_app.app_context():
+        token = app_module.jwt_manager.generate_token('user-1', 'user@example.com')
+    headers = {'Authorization': f'Bearer {token}'}
+    with flask_app.test_client() as client:
+        for body in ({'document_id': 'doc-1', 'deadline_ms': 10},
+                     {'document_id': 'doc-1', 'pipeline': 'unknown'}):
+            assert client.post('/api/analyze-document', json=body, headers=headers).status_code == 400
+        assert not sent
+
+        resp = client.post('/api/analyze-document', json={'document_id': 'doc-1', 'deadline_ms': 5000},
+                           headers=headers)
+    assert sent == [analysis_router.TASKS[analysis_router.FAST]]
+    body = resp.get_json()
+    assert resp.status_code == 200
+    assert body['downgraded'] is True and body['pipeline'] == 'fast'
+    assert body['outcome'] == 'complete' and body['analysis'] == {'summary': 'Fast summary.'}
@@ -0,0 +1,36 @@
+from utils.extractive_summary import extractive_summary, split_sentences, tfidf_matrix, WORD
+
+CONTRACT = (
+    "WHEREAS the parties have agreed to enter into this agreement on the date written below. "
+    "WHEREAS the recitals above form part of this agreement for all purposes. "
+    "The supplier shall deliver the goods and the buyer shall pay the invoice within thirty days. "
+    "Late payment of any invoice shall attract interest and the supplier may suspend delivery. "
+    "The buyer may terminate this agreement if the supplier fails to deliver the goods on time. "
+    "Either party shall keep the pricing and delivery terms of this agreement confidential. "
+    "Notices under this agreement shall be sent by registered post to the addresses above."
+)
+
+def test_devanagari_words_keep_their_vowel_signs():
+    assert WORD.findall('समाप्ति की शर्तें') == ['समाप्ति', 'की', 'शर्तें']
+
+def test_split_sentences_handles_danda():
+    sentences = split_sentences('यह अनुबंध दोनों पक्षों के बीच है। भुगतान तीस दिनों के भीतर किया जाएगा।')
+    assert len(sentences) == 2
+
+def test_summary_prefers_central_terms_over_recitals():
+    summary = extractive_summary(CONTRACT, max_sentences=2)
+    assert 'WHEREAS' not in summary
+    assert 'invoice' in summary or 'deliver' in summary
+    # Sentences stay in document order
+    sentences = split_sentences(CONTRACT)
+    picked = [s for s in sentences if s in summary]
+    assert picked == sorted(picked, key=sentences.index)
+
+def test_short_documents_are_returned_whole():
+    assert extractive_summary('Only one sentence in this short document.') == 'Only one sentence in this short document.'
+    assert extractive_summary('') == ''
+
+def test_tfidf_rows_are_normalised():
+    matrix = tfidf_matrix(split_sentences(CONTRACT))
+    norms = matrix.multiply(matrix).sum(axis=1).A.ravel()
+    assert all(abs(n - 1) < 1e-9 for n in norms)
@@ -0,0 +1,47 @@
+import threading
+from inference_server import DynamicBatcher
+
+def test_concurrent_requests_share_a_batch():
+    calls = []
+    def runner(model, texts, params):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    batcher = DynamicBatcher(runner, max_batch_size=8, max_wait_ms=200)
+    results = {}
+    def request(i):
+        results[i] = batcher.submit('bart', f'doc {i}', {'max_length': 150}).result(timeout=5)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: f'DOC {i}' for i in range(4)}
+    assert len(calls) == 1 and len(calls[0]) == 4
+
+def test_different_params_run_as_separate_groups():
+    calls = []
+    def runner(model, texts, params):
+        calls.append((params['max_length'], len(texts)))
+        return texts
+
+    batcher = DynamicBatcher(runner, max_batch_size=8, max_wait_ms=100)
+    futures = [batcher.submit('bart', 'a', {'max_length': 150}),
+               batcher.submit('bart', 'b', {'max_length': 80}),
+               batcher.submit('bart', 'c', {'max_length': 150})]
+    assert [f.result(timeout=5) for f in futures] == ['a', 'b', 'c']
+    assert sorted(calls) == [(80, 1), (150, 2)]
+
+def test_runner_errors_reach_every_caller():
+    def runner(model, texts, params):
+        raise RuntimeError('out of memory')
+
+    batcher = DynamicBatcher(runner, max_batch_size=2, max_wait_ms=10)
+    future = batcher.submit('bart', 'a', {})
+    try:
+        future.result(timeout=5)
+        assert False, 'expected the runner error'
+    except RuntimeError as e:
+        assert 'out of memory' in str(e)
@@ -0,0 +1,45 @@
+import re
+import input_compression
+import tokenization
+
+class WhitespaceTokenizer:
+    """Word-level stand-in for a fast tokenizer: <s>=0, </s>=2."""
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=True, verbose=False):
+        spans = [m.span() for m in re.finditer(r'\S+', text)]
+        return {'input_ids': [10 + i for i in range(len(spans))], 'offset_mapping': spans}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [0] + ids + [2]
+
+RECITALS = ' '.join(f'Whereas recital number {i} records background facts only.' for i in range(20))
+TERMS = ('Section 7 Limitation of Liability. The supplier liability for any claim is capped at the fees paid. '
+         'Neither party is liable for indirect loss of profit.')
+TEXT = RECITALS + ' ' + TERMS
+
+def _tokens(monkeypatch, text=TEXT):
+    monkeypatch.setattr(tokenization.model_store, 'load_tokenizer', lambda name: WhitespaceTokenizer())
+    return tokenization._tokenize(text, 'test-model')
+
+def test_long_document_keeps_salient_sentences_in_order(monkeypatch):
+    tokens = _tokens(monkeypatch)
+    compressed = input_compression.compress(tokens, TEXT, max_tokens=40, mode='salience')
+    assert len(compressed) <= 38
+    kept = ' '.join(TEXT[a:b] for a, b in compressed.offsets)
+    assert 'Section 7 Limitation of Liability.' in kept
+    assert list(compressed.offsets[:, 0]) == sorted(compressed.offsets[:, 0])
+
+def test_head_mode_and_short_documents_are_untouched(monkeypatch):
+    tokens = _tokens(monkeypatch)
+    assert input_compression.compress(tokens, TEXT, max_tokens=40, mode='head') is tokens
+    short = _tokens(monkeypatch, TERMS)
+    assert input_compression.compress(short, TERMS, max_tokens=1024, mode='salience') is short
+
+def test_chunk_budget_scales_with_windows(monkeypatch):
+    tokens = _tokens(monkeypatch)
+    compressed = input_compression.compress(tokens, TEXT, max_tokens=40, windows=2, mode='salience')
+    assert 38 < len(compressed) <= 76
+    assert len(compressed.chunk_bounds(40, 2)) == 2
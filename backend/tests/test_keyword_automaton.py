@@ -0,0 +1,41 @@
+import random
+import keywords
+from utils.keyword_automaton import KeywordAutomaton
+
+def _naive_count(text, keyword):
+    text, count = text.lower(), 0
+    start = text.find(keyword)
+    while start != -1:
+        count += 1
+        start = text.find(keyword, start + 1)
+    return count
+
+def test_counts_match_substring_search_including_overlaps():
+    vocabulary = {'a': ['he', 'she', 'hers'], 'b': ['his', 'he'], 'c': ['aaa']}
+    automaton = KeywordAutomaton(vocabulary)
+    rng = random.Random(7)
+    for _ in range(200):
+        text = ''.join(rng.choice('hHeEsSria ') for _ in range(rng.randint(0, 60)))
+        hits = automaton.scan(text)
+        for label, terms in vocabulary.items():
+            assert hits.counts.get(label, 0) == sum(_naive_count(text, t) for t in terms)
+            for start, end, keyword in hits.offsets.get(label, []):
+                assert text[start:end].lower() == keyword
+
+def test_devanagari_offsets_and_document_risk_flags():
+    text = 'Clause 9. किसी भी उल्लंघन पर दंड लगेगा। Termination on breach.'
+    hits = keywords.scan(text)
+    start, end, keyword = hits.first((keywords.RISK, 'breach'))
+    assert text[start:end] == 'उल्लंघन'
+    assert keywords.risk_flags(text) == ['penalty', 'breach', 'termination']
+
+def test_classification_assigns_document_hits_to_clause_spans():
+    text = ('The Supplier shall indemnify and is liable for the fee.\n'
+            'गोपनीय जानकारी का खुलासा नहीं किया जाएगा।')
+    split = text.index('\n')
+    clauses = [{'start': 0, 'end': split}, {'start': split + 1, 'end': len(text)}]
+    classification = keywords.classify_clauses(clauses, text)
+    assert classification['liability'] == 50.0
+    assert classification['payment_terms'] == 50.0
+    assert classification['confidentiality'] == 50.0
+    assert classification['warranties'] == 0.0
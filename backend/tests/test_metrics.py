@@ -0,0 +1,50 @@
+import pytest
+
+import metrics
+
+@pytest.fixture(autouse=True)
+def r(fake_redis):
+    return fake_redis
+
+def test_counters_and_gauges_render_in_prometheus_text():
+    metrics.inc('requests_total', endpoint='upload')
+    metrics.inc('requests_total', 2, endpoint='upload')
+    metrics.set_gauge('queue_depth', 7, queue='inference')
+    text = metrics.render_prometheus()
+    assert '# TYPE requests_total counter\nrequests_total{endpoint="upload"} 3' in text
+    assert '# TYPE queue_depth gauge\nqueue_depth{queue="inference"} 7' in text
+
+def test_histograms_are_cumulative_with_sorted_buckets():
+    for value in (0.5, 3, 50):
+        metrics.observe('latency_seconds', value, buckets=(1, 10), endpoint='x')
+    lines = metrics.render_prometheus().splitlines()
+    assert lines == [
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{endpoint="x",le="1"} 1',
+        'latency_seconds_bucket{endpoint="x",le="10"} 2',
+        'latency_seconds_bucket{endpoint="x",le="+Inf"} 3',
+        'latency_seconds_count{endpoint="x"} 3',
+        'latency_seconds_sum{endpoint="x"} 53.5',
+    ]
+
+def test_recording_never_raises_without_redis(monkeypatch):
+    def unavailable():
+        raise ConnectionError('redis down')
+    monkeypatch.setattr(metrics, 'get_redis', unavailable)
+    metrics.inc('requests_total')
+    metrics.observe('latency_seconds', 1)
+
+def test_metrics_endpoint_needs_the_scrape_token_or_an_admin(monkeypatch):
+    import app as app_module
+    flask_app = app_module.app
+    monkeypatch.setitem(flask_app.config, 'METRICS_TOKEN', 'scrape-secret')
+    monkeypatch.setitem(flask_app.config, 'ADMIN_EMAILS', 'admin@example.com')
+    with flask_app.app_context():
+        user = app_module.jwt_manager.generate_token('user-1', 'user@example.com')
+        admin = app_module.jwt_manager.generate_token('admin-1', 'admin@example.com')
+    with flask_app.test_client() as client:
+        assert client.get('/api/metrics').status_code == 401
+        assert client.get('/api/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+        assert client.get('/api/metrics', headers={'Authorization': f'Bearer {user}'}).status_code == 403
+        assert client.get('/api/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+        assert client.get('/api/metrics', headers={'Authorization': f'Bearer {admin}'}).status_code == 200
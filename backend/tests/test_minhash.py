@@ -0,0 +1,24 @@
+from utils.minhash import MinHasher, LSHIndex, jaccard, encode_signature, decode_signature
+
+BASE = ' '.join(f"The supplier shall deliver item {i} to the customer within {i + 3} business days." for i in range(40))
+
+def test_near_duplicates_are_found_and_ranked_by_jaccard():
+    hasher = MinHasher(num_perm=128)
+    edited = BASE.replace('item 7 ', 'product 7 ')
+    other = ' '.join(f"Either party may terminate clause {i} by giving notice in writing." for i in range(40))
+    index = LSHIndex(bands=16)
+    for doc_id, text in [('base', BASE), ('edited', edited), ('other', other)]:
+        index.add(doc_id, hasher.signature(text))
+
+    results = index.query(hasher.signature(BASE), threshold=0.8, exclude='base')
+    assert [doc_id for doc_id, _ in results] == ['edited']
+    assert 0.85 < results[0][1] < 1.0
+
+    index.remove('edited')
+    assert index.query(hasher.signature(BASE), threshold=0.8, exclude='base') == []
+
+def test_signatures_round_trip_compactly():
+    signature = MinHasher(num_perm=128).signature(BASE)
+    encoded = encode_signature(signature)
+    assert len(encoded) == 684  # 512 bytes in base64
+    assert jaccard(decode_signature(encoded), signature) == 1.0
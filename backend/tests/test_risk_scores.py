@@ -0,0 +1,23 @@
+import json
+import numpy as np
+import risk_model
+from utils.risk_scores import pack_probs, unpack_probs, document_score, risk_level
+
+def test_probabilities_round_trip_as_compact_float16():
+    probs = np.random.default_rng(3).dirichlet([1, 1, 1], size=40).astype(np.float32)
+    packed = json.loads(json.dumps(pack_probs(probs)))
+    assert packed['shape'] == [40, 3]
+    assert len(packed['data']) < len(json.dumps(probs.round(4).tolist())) / 2
+    assert np.abs(unpack_probs(packed) - probs).max() < 1e-3
+
+def test_document_score_is_not_diluted_by_harmless_clauses():
+    risky = [[0.0, 0.0, 1.0]] * 2
+    harmless = [[1.0, 0.0, 0.0]] * 30
+    score = document_score(np.array(risky + harmless))
+    assert score == round(2 / 3, 4)
+    assert risk_level(score) == 'high'
+    assert risk_level(document_score(np.zeros((0, 3)))) == 'low'
+
+def test_length_batches_group_similar_lengths():
+    batches = risk_model.length_batches([50, 3, 40, 4, 5], 2)
+    assert batches == [[1, 3], [4, 2], [0]]
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+import scheduler
+from celery_app import celery_app
+
+@pytest.fixture
+def r(fake_redis, monkeypatch):
+    r = fake_redis
+    monkeypatch.setattr(scheduler, '_dispatch_script', None)
+    cfg = scheduler._cfg()
+    monkeypatch.setattr(cfg, 'SCHED_LONG_QUEUE', 'inference_long')
+    monkeypatch.setattr(cfg, 'SCHED_DISPATCH_DEPTH', 2)
+    # send_task stands in for Celery pushing the message onto the queue list
+    monkeypatch.setattr(celery_app, 'send_task',
+                        lambda name, args, task_id, queue: r.rpush(queue, json.dumps([name, task_id])))
+    return r
+
+def pend(r, task_id, queue, score):
+    r.hset(scheduler.JOB_KEY.format(task_id), mapping={'task_name': 'tasks.analyze_document_task',
+                                                      'args': '[]', 'predicted': 1, 'enqueued_at': 0,
+                                                      'queue': queue})
+    r.zadd(scheduler.PENDING_KEY, {task_id: score})
+
+def test_long_job_backlog_does_not_block_short_jobs(r):
+    cfg = scheduler._cfg()
+    for i in range(5):
+        pend(r, f'long-{i}', cfg.SCHED_LONG_QUEUE, i)
+    for i in range(3):
+        pend(r, f'short-{i}', cfg.INFERENCE_QUEUE, 10 + i)
+
+    assert scheduler.dispatch() == 4
+    assert r.llen(cfg.SCHED_LONG_QUEUE) == 2
+    assert r.llen(cfg.INFERENCE_QUEUE) == 2
+    assert [m.decode() for m in r.zrange(scheduler.PENDING_KEY, 0, -1)] == ['long-2', 'long-3', 'long-4', 'short-2']
+    # Queues stay full until a worker takes a task
+    assert scheduler.dispatch() == 0
+    r.lpop(cfg.INFERENCE_QUEUE)
+    assert scheduler.dispatch() == 1
+    assert r.zrank(scheduler.PENDING_KEY, 'short-2') is None
+
+def test_claimed_jobs_count_against_the_queue_depth(r):
+    cfg = scheduler._cfg()
+    r.set(scheduler.RESERVED_KEY.format(cfg.INFERENCE_QUEUE), 2)
+    pend(r, 'short-0', cfg.INFERENCE_QUEUE, 0)
+    assert scheduler.dispatch() == 0
+    r.delete(scheduler.RESERVED_KEY.format(cfg.INFERENCE_QUEUE))
+    assert scheduler.dispatch() == 1
+    assert int(r.get(scheduler.RESERVED_KEY.format(cfg.INFERENCE_QUEUE))) == 0
+
+def test_expired_jobs_are_dropped(r):
+    r.zadd(scheduler.PENDING_KEY, {'gone': 0})
+    assert scheduler.dispatch() == 0
+    assert r.zcard(scheduler.PENDING_KEY) == 0
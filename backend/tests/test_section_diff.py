@@ -0,0 +1,62 @@
+from tasks import extract_structure, extract_clauses, revise_clauses
+from utils.section_diff import SectionDiff, plan_chunks
+
+V1 = ('Services Agreement.\n'
+      'Section 1 Confidentiality. Each party keeps the other party\'s information secret.\n'
+      'Section 2 Payment. Fees are payable within thirty days of each invoice.\n'
+      'Section 3 Termination. Either party may terminate on thirty days written notice.')
+V2 = V1.replace('thirty days of each invoice', 'forty-five days of each invoice, with interest on late fees')
+
+def test_only_changed_sections_are_recomputed_and_the_rest_move():
+    old, new = extract_structure(V1), extract_structure(V2)
+    diff = SectionDiff(old, new)
+    assert diff.changed == [2]
+    assert diff.reused == {0, 1, 3}
+
+    parent_clauses = extract_clauses(V1)
+    revised = revise_clauses(V2, None, new, diff, parent_clauses)
+    clauses, parent_index = revised['clauses'], revised['parent_index']
+    by_type = {clause['type']: (clause, index) for clause, index in zip(clauses, parent_index)}
+
+    termination, index = by_type['termination']
+    assert index is not None
+    assert V2[termination['start']:termination['end']] == \
+        'Section 3 Termination. Either party may terminate on thirty days written notice.'
+    payment, index = by_type['payment_terms']
+    assert index is None
+    assert 'forty-five days' in V2[payment['start']:payment['end']]
+    assert [c['start'] for c in clauses] == sorted(c['start'] for c in clauses)
+
+def test_plan_chunks_only_uncovered_tokens():
+    assert plan_chunks(100, [(10, 40), (60, 70)], 25, 5, 10) == \
+        [(0, 10, None), (10, 40, 0), (40, 60, None), (60, 70, 1), (70, 85, None), (85, 100, None)]
+    assert plan_chunks(30, [], 20, 5, 10) == [(0, 15, None), (15, 30, None)]
+    assert plan_chunks(30, [(0, 30)], 20, 5, 10) == [(0, 30, 0)]
+
+def test_plan_chunks_merges_small_gaps_and_respects_the_budget():
+    # The 3-token gap joins the shorter neighbouring chunk, which is summarized again
+    assert plan_chunks(100, [(0, 40), (43, 60)], 50, 10, 10) == [(0, 40, 0), (40, 60, None), (60, 100, None)]
+    assert plan_chunks(100, [(0, 97)], 100, 10, 10) == [(0, 100, None)]
+    assert plan_chunks(100, [(10, 40), (60, 70)], 25, 5, 3) is None
+
+def spans(clauses):
+    return sorted((c['type'], c['start'], c['end']) for c in clauses)
+
+def test_revision_matches_a_fresh_analysis():
+    # A new heading clause ahead of the parent's payment clause replaces it
+    v2 = V2.replace('Section 1 Confidentiality.', 'Section 1 Fees and confidentiality. Fees exclude VAT.\n'
+                                                  'Confidentiality.')
+    old, new = extract_structure(V1), extract_structure(v2)
+    revised = revise_clauses(v2, None, new, SectionDiff(old, new), extract_clauses(V1))
+    assert spans(revised['clauses']) == spans(extract_clauses(v2))
+
+def test_clauses_reaching_into_changed_sections_are_found_again():
+    old, new = extract_structure(V1), extract_structure(V2)
+    parent = extract_clauses(V1)
+    # A clause (e.g. from the clause model) running from section 1 into the changed section 2
+    crossing = {'type': 'confidentiality', 'start': old[1]['start'], 'end': old[2]['start'] + 20, 'confidence': 0.9}
+    parent = [c for c in parent if c['type'] != 'confidentiality'] + [crossing]
+    revised = revise_clauses(V2, None, new, SectionDiff(old, new), parent)
+    assert spans(revised['clauses']) == spans(extract_clauses(V2))
+    assert all(index is None for clause, index in zip(revised['clauses'], revised['parent_index'])
+               if clause['type'] in ('confidentiality', 'payment_terms'))
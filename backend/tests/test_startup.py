@@ -0,0 +1,10 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from benchmark_startup import measure, violations
+
+def test_web_worker_starts_within_budget_without_ml_stack():
+    result = measure('app', runs=1)
+    assert violations(result) == []
@@ -0,0 +1,72 @@
+import os
+import time
+
+import pytest
+
+import summary_cache
+
+PARAMS = {'max_length': 150, 'min_length': 30}
+
+@pytest.fixture
+def redis(fake_redis, monkeypatch):
+    monkeypatch.setattr(summary_cache, 'model_revision', lambda model_name: 'test')
+    monkeypatch.setattr(summary_cache, '_disk_usage', {'bytes': None, 'scanned_at': 0.0})
+    _configure(monkeypatch, SUMMARY_CACHE_ENABLED=True, SUMMARY_CACHE_DIR='')
+    return fake_redis
+
+def _configure(monkeypatch, **settings):
+    cfg = summary_cache._cfg()
+    for name, value in settings.items():
+        monkeypatch.setattr(cfg, name, value)
+
+def test_redis_tier_evicts_least_recently_used(redis, monkeypatch):
+    _configure(monkeypatch, SUMMARY_CACHE_MAX_ENTRIES=2)
+    summary_cache.put([1, 2], 'bart', PARAMS, 'first', 1.0)
+    summary_cache.put([3, 4], 'bart', PARAMS, 'second', 1.0)
+    assert summary_cache.get([1, 2], 'bart', PARAMS) == 'first'  # now more recent than 'second'
+    summary_cache.put([5, 6], 'bart', PARAMS, 'third', 1.0)
+
+    assert summary_cache.get([3, 4], 'bart', PARAMS) is None
+    assert summary_cache.get([1, 2], 'bart', PARAMS) == 'first'
+    assert summary_cache.get([5, 6], 'bart', PARAMS) == 'third'
+    assert redis.zcard(summary_cache.INDEX_KEY) == 2
+
+def test_redis_entries_expire_after_ttl(redis, monkeypatch):
+    _configure(monkeypatch, SUMMARY_CACHE_TTL_SECONDS=60)
+    summary_cache.put('text', 'bart', PARAMS, 'summary', 1.0)
+    key = summary_cache.cache_key('text', 'bart', PARAMS)
+    assert 0 < redis.ttl(summary_cache.ENTRY_KEY.format(key)) <= 60
+
+def test_expired_disk_entries_are_removed(redis, monkeypatch, tmp_path):
+    _configure(monkeypatch, SUMMARY_CACHE_DIR=str(tmp_path), SUMMARY_CACHE_TTL_SECONDS=60)
+    summary_cache.put('text', 'bart', PARAMS, 'summary', 1.0)
+    redis.flushall()
+    assert summary_cache.get('text', 'bart', PARAMS) == 'summary'  # served from disk
+
+    redis.flushall()
+    path = summary_cache._disk_path(summary_cache.cache_key('text', 'bart', PARAMS))
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert summary_cache.get('text', 'bart', PARAMS) is None
+    assert not os.path.exists(path)
+
+def test_disk_tier_tracks_size_and_evicts_oldest(redis, monkeypatch, tmp_path):
+    _configure(monkeypatch, SUMMARY_CACHE_DIR=str(tmp_path), SUMMARY_CACHE_DISK_MAX_MB=0.01)  # ~10 KB, about 60 entries
+    scans = []
+    scan = summary_cache._scan_disk
+    monkeypatch.setattr(summary_cache, '_scan_disk', lambda target=None: scans.append(target) or scan(target))
+
+    paths = []
+    for i in range(200):
+        summary_cache.put(f'text {i}', 'bart', PARAMS, 'x' * 100, 1.0)
+        paths.append(summary_cache._disk_path(summary_cache.cache_key(f'text {i}', 'bart', PARAMS)))
+        old = time.time() - 1000 + i
+        if os.path.exists(paths[-1]):
+            os.utime(paths[-1], (old, old))
+
+    total = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+    assert total <= 0.01 * 1024 * 1024
+    assert summary_cache._disk_usage['bytes'] == total
+    assert len(scans) < 50  # the directory is listed on eviction only, not on every write
+    assert os.path.exists(paths[-1])
+    assert not os.path.exists(paths[0])
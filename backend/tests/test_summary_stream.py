@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import app as app_module
+import admission
+import summary_stream
+
+EVENTS = [('token', {'text': 'The supplier '}), ('token', {'text': 'delivers goods.'}),
+          ('done', {'document_id': 'doc-1', 'analysis_id': 'a-1', 'summary': 'The supplier delivers goods.',
+                    'cached': False})]
+
+@pytest.fixture
+def r(fake_redis):
+    return fake_redis
+
+def parse(body):
+    return [(block.split('\n')[0][len('event: '):], json.loads(block.split('\n')[1][len('data: '):]))
+            for block in body.strip().split('\n\n')]
+
+def test_relay_forwards_published_events(r):
+    summary_stream.publish_summary_events('doc-1', '', 'stream-1', events=EVENTS)
+    events = parse(''.join(summary_stream.relay_events('stream-1')))
+    assert [e for e, _ in events] == ['token', 'token', 'done']
+    assert events[-1][1]['analysis_id'] == 'a-1' and 'ttft_seconds' in events[-1][1]
+    assert not r.exists(summary_stream.STREAM_KEY.format('stream-1'))
+
+def test_relay_times_out_without_a_final_event(r):
+    summary_stream.publish_summary_events('doc-1', '', 'stream-2', events=EVENTS[:1])
+    events = parse(''.join(summary_stream.relay_events('stream-2', timeout=1)))
+    assert [e for e, _ in events] == ['token', 'error']
+
+def test_stream_endpoint_relays_the_worker_task(r, monkeypatch):
+    sent = []
+    def send_task(name, args):
+        sent.append(name)
+        summary_stream.publish_summary_events(args[0], '', args[1], events=EVENTS)
+    monkeypatch.setattr(app_module.celery_app, 'send_task', send_task)
+    monkeypatch.setattr(app_module.db_manager, 'get_document',
+                        lambda doc_id: {'id': doc_id, 'user_id': 'user-1', 'content': 'The supplier delivers goods.'})
+    monkeypatch.setattr(admission.admission_controller, 'enabled', False)
+
+    flask_app = app_module.app
+    with flask_app.app_context():
+        token = app_module.jwt_manager.generate_token('user-1', 'user@example.com')
+    with flask_app.test_client() as client:
+        resp = client.post('/api/documents/doc-1/summary/stream', headers={'Authorization': f'Bearer {token}'})
+        assert resp.status_code == 200
+        assert resp.mimetype == 'text/event-stream'
+        events = parse(resp.get_data(as_text=True))
+    assert sent == ['tasks.stream_summary_task']
+    assert events[-1] == ('done', {**EVENTS[-1][1], 'ttft_seconds': events[-1][1]['ttft_seconds']})
@@ -0,0 +1,42 @@
+import pytest
+
+import app as app_module
+import admission
+import template_library
+
+@pytest.fixture
+def client(monkeypatch):
+    flask_app = app_module.app
+    monkeypatch.setitem(flask_app.config, 'ADMIN_EMAILS', 'admin@example.com')
+    monkeypatch.setattr(admission.admission_controller, 'enabled', False)
+    monkeypatch.setattr(app_module.db_manager, 'get_document',
+                        lambda doc_id: {'id': doc_id, 'user_id': 'other-user', 'content': 'Agreement.'})
+    monkeypatch.setattr(app_module.db_manager, 'get_analysis_result',
+                        lambda doc_id: {'id': 'a-1', 'analysis_results': {}})
+    with flask_app.app_context():
+        token = app_module.jwt_manager.generate_token('admin-user', 'admin@example.com')
+    with flask_app.test_client() as client:
+        client.headers = {'Authorization': f'Bearer {token}'}
+        yield client
+
+def test_admins_cannot_register_other_users_documents(client, monkeypatch):
+    registered = []
+    monkeypatch.setattr(template_library, 'register', lambda *args: registered.append(args) or 't-1')
+    resp = client.post('/api/admin/templates', json={'name': 'NDA', 'document_id': 'doc-1'}, headers=client.headers)
+    assert resp.status_code == 403
+    assert registered == []
+
+    monkeypatch.setattr(app_module.db_manager, 'get_document',
+                        lambda doc_id: {'id': doc_id, 'user_id': 'admin-user', 'content': 'Agreement.'})
+    resp = client.post('/api/admin/templates', json={'name': 'NDA', 'document_id': 'doc-1'}, headers=client.headers)
+    assert resp.status_code == 201
+    assert resp.get_json()['template_id'] == 't-1'
+
+def test_deleting_a_missing_template_is_not_found(client, monkeypatch):
+    monkeypatch.setattr(template_library, 'invalidate', lambda: None)
+    monkeypatch.setattr(app_module.supabase_db, 'delete_template', lambda template_id: 0)
+    assert client.delete('/api/admin/templates/missing', headers=client.headers).status_code == 404
+
+    monkeypatch.setattr(app_module.supabase_db, 'delete_template', lambda template_id: 1)
+    resp = client.delete('/api/admin/templates/t-1', headers=client.headers)
+    assert resp.status_code == 200 and resp.get_json()['deleted'] is True
@@ -0,0 +1,31 @@
+from tasks import extract_structure
+from utils.section_diff import SectionDiff
+from utils.template_index import TemplateIndex, fingerprint
+
+NDA = ('Mutual Non-Disclosure Agreement.\n'
+       'Section 1 Confidential Information. Each party keeps the other party\'s information secret.\n'
+       'Section 2 Term. This agreement lasts for two years from the effective date.\n'
+       'Section 3 Governing Law. This agreement is governed by the laws of India.')
+SERVICES = ('Master Services Agreement.\n'
+            'Section 1 Services. The supplier provides the services described in each order.\n'
+            'Section 2 Fees. Fees are payable within thirty days of each invoice.')
+
+def test_documents_match_the_template_they_were_copied_from():
+    index = TemplateIndex({'nda': fingerprint(extract_structure(NDA)),
+                           'services': fingerprint(extract_structure(SERVICES))})
+    edited = NDA.replace('two years', 'three years')
+    template_id, coverage = index.match(fingerprint(extract_structure(edited)))
+    assert template_id == 'nda'
+    assert 0.6 < coverage < 1.0
+    assert index.match(fingerprint(extract_structure(NDA))) == ('nda', 1.0)
+    assert index.match(fingerprint(extract_structure('Unrelated letter.'))) == (None, 0.0)
+
+    # Only the edited section deviates from the template
+    assert SectionDiff(extract_structure(NDA), extract_structure(edited)).changed == [2]
+
+def test_a_short_template_does_not_cover_a_longer_document():
+    head = NDA[:NDA.index('Section 2')]
+    index = TemplateIndex({'head': fingerprint(extract_structure(head))})
+    template_id, coverage = index.match(fingerprint(extract_structure(NDA)))
+    assert template_id == 'head'
+    assert coverage < 0.5
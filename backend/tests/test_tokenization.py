@@ -0,0 +1,42 @@
+import re
+import tokenization
+from tokenization import TokenizedDocument
+
+class WhitespaceTokenizer:
+    """Word-level stand-in for a fast tokenizer: <s>=0, </s>=2."""
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=True, verbose=False):
+        spans = [m.span() for m in re.finditer(r'\S+', text)]
+        return {'input_ids': [10 + i for i in range(len(spans))], 'offset_mapping': spans}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [0] + ids + [2]
+
+def _document(text, monkeypatch):
+    monkeypatch.setattr(tokenization.model_store, 'load_tokenizer', lambda name: WhitespaceTokenizer())
+    return tokenization._tokenize(text, 'test-model')
+
+def test_chunks_are_model_windows_with_special_tokens(monkeypatch):
+    doc = _document(' '.join(f'w{i}' for i in range(10)), monkeypatch)
+    bounds = doc.chunk_bounds(max_tokens=6)
+    assert bounds == [(0, 4), (4, 8), (8, 10)]
+    assert doc.chunk(*bounds[1]) == [0, 14, 15, 16, 17, 2]
+    assert doc.truncated(6) == [0, 10, 11, 12, 13, 2]
+    assert doc.chunk_bounds(max_tokens=6, max_chunks=1) == [(0, 4)]
+
+def test_token_and_char_spans_share_offsets(monkeypatch):
+    text = 'Section 1 Term. Section 2 Payment due.'
+    doc = _document(text, monkeypatch)
+    start = text.index('Section 2')
+    token_start, token_end = doc.token_span(start, len(text))
+    assert (token_start, token_end) == (3, 7)
+    assert text[slice(*doc.char_span(token_start, token_end))] == 'Section 2 Payment due.'
+
+def test_round_trip_through_cache_bytes(monkeypatch):
+    doc = _document('one two three', monkeypatch)
+    restored = TokenizedDocument.from_bytes('test-model', *doc.to_bytes())
+    assert list(restored.input_ids) == [10, 11, 12]
+    assert restored.offsets.tolist() == [[0, 3], [4, 7], [8, 13]]
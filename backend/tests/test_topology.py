@@ -0,0 +1,33 @@
+import topology
+from config import Config
+
+class Cfg(Config):
+    TOPOLOGY_WEB_WORKERS = 0
+    TOPOLOGY_FAST_CONCURRENCY = 0
+    TOPOLOGY_INFERENCE_CONCURRENCY = 0
+    TOPOLOGY_INFERENCE_THREADS = 0
+    TOPOLOGY_INTEROP_THREADS = 1
+
+def test_cgroup_quota_v2_and_v1(tmp_path):
+    (tmp_path / 'cpu.max').write_text('250000 100000\n')
+    assert topology.cgroup_cpu_limit(str(tmp_path)) == 2.5
+    (tmp_path / 'cpu.max').write_text('max 100000\n')
+    assert topology.cgroup_cpu_limit(str(tmp_path)) is None
+
+    v1 = tmp_path / 'v1'
+    (v1 / 'cpu').mkdir(parents=True)
+    (v1 / 'cpu' / 'cpu.cfs_quota_us').write_text('400000')
+    (v1 / 'cpu' / 'cpu.cfs_period_us').write_text('100000')
+    assert topology.cgroup_cpu_limit(str(v1)) == 4.0
+
+def test_roles_split_cores_without_oversubscribing():
+    inference = topology.plan(topology.INFERENCE, cores=16, cfg=Cfg)
+    assert (inference.processes, inference.intra_op_threads) == (4, 4)
+    assert topology.plan(topology.FAST, cores=16, cfg=Cfg).intra_op_threads == 1
+    assert topology.plan(topology.SERVER, cores=16, cfg=Cfg).intra_op_threads == 16
+
+    class Pinned(Cfg):
+        TOPOLOGY_INFERENCE_CONCURRENCY = 3
+    pinned = topology.plan(topology.INFERENCE, cores=16, cfg=Pinned)
+    assert (pinned.processes, pinned.intra_op_threads) == (3, 5)
+    assert topology.cpu_block(pinned, 1, cpus=range(16)) == {5, 6, 7, 8, 9}
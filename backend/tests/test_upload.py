@@ -76,11 +76,11 @@ def test_analyze_document_task():
     # Run the task synchronously
     result = analyze_document_task.apply(args=[doc_id])
     assert result.successful()
+    # Results are stored by reference; the analysis itself lives in the DB
     assert 'document_id' in result.result
-    assert 'analysis' in result.result
-    assert 'summary' in result.result['analysis']
-    assert 'clauses' in result.result['analysis']
-    assert 'risks' in result.result['analysis']
+    assert 'analysis_id' in result.result
+    assert result.result['status'] == 'completed'
+    assert 'analysis' not in result.result
 
 def test_search_documents(client):
     # Test missing query
@@ -0,0 +1,126 @@
+"""
+Tokenize each document once per model.
+
+``tokenize_document`` runs the (fast) tokenizer over the full text with
+offsets, caches the ids and character offsets in Redis under the content
+hash, and returns a ``TokenizedDocument``. Every stage then works on that
+one result: summary chunks and truncated inputs are id windows that go
+straight to ``model.generate`` (via ``inference_client.generate``) with no
+decode/re-encode round trip, and sections or clauses are mapped to token
+spans with the same offsets.
+"""
+
+import os
+import logging
+
+import numpy as np
+
+import model_store
+from config import config
+from redis_client import get_redis
+from utils.hashing import content_hash
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+TOKENS_KEY = "tokens:{}:{}"
+
+
+class TokenizedDocument:
+    """Token ids and character offsets of one document for one model."""
+
+    def __init__(self, model_name, input_ids, offsets):
+        self.model_name = model_name
+        self.input_ids = np.asarray(input_ids, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int32).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.input_ids)
+
+    def _with_special_tokens(self, ids):
+        tokenizer = model_store.load_tokenizer(self.model_name)
+        return tokenizer.build_inputs_with_special_tokens([int(i) for i in ids])
+
+    def window_size(self, max_tokens):
+        """Document tokens that fit in ``max_tokens`` once special tokens are added."""
+        tokenizer = model_store.load_tokenizer(self.model_name)
+        return max_tokens - tokenizer.num_special_tokens_to_add()
+
+    def truncated(self, max_tokens):
+        """Model input for the first ``max_tokens`` tokens (special tokens included)."""
+        return self._with_special_tokens(self.input_ids[:self.window_size(max_tokens)])
+
+    def chunk_bounds(self, max_tokens, max_chunks=None):
+        """(start, end) token indices of consecutive model-window chunks."""
+        window = self.window_size(max_tokens)
+        bounds = [(start, min(start + window, len(self))) for start in range(0, len(self), window)]
+        return (bounds[:max_chunks] if max_chunks else bounds) or [(0, 0)]
+
+    def chunk(self, start, end):
+        """Model input for tokens ``start:end`` (special tokens included)."""
+        return self._with_special_tokens(self.input_ids[start:end])
+
+    def subset(self, indices):
+        """A document made of the tokens at ``indices`` (e.g. selected sentences)."""
+        return TokenizedDocument(self.model_name, self.input_ids[indices], self.offsets[indices])
+
+    def char_span(self, token_start, token_end):
+        """Character span covered by tokens ``token_start:token_end``."""
+        if token_end <= token_start or not len(self):
+            return 0, 0
+        return int(self.offsets[token_start][0]), int(self.offsets[token_end - 1][1])
+
+    def token_span(self, char_start, char_end):
+        """Token indices overlapping the character span ``[char_start, char_end)``."""
+        token_start = np.searchsorted(self.offsets[:, 1], char_start, side='right')
+        token_end = np.searchsorted(self.offsets[:, 0], char_end, side='left')
+        return int(token_start), int(max(token_start, token_end))
+
+    def to_bytes(self):
+        return self.input_ids.tobytes(), self.offsets.tobytes()
+
+    @classmethod
+    def from_bytes(cls, model_name, ids_bytes, offsets_bytes):
+        return cls(model_name, np.frombuffer(ids_bytes, dtype=np.int32),
+                   np.frombuffer(offsets_bytes, dtype=np.int32))
+
+
+def _tokenize(text, model_name):
+    tokenizer = model_store.load_tokenizer(model_name)
+    encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+    return TokenizedDocument(model_name, encoded['input_ids'], encoded['offset_mapping'])
+
+
+def tokenize_document(text, model_name, text_hash=None):
+    """
+    Tokenize a document for a model, reusing the cached result when the
+    same text was tokenized before.
+
+    Args:
+        text: Document text
+        model_name: Model whose tokenizer to use
+        text_hash: Precomputed content hash of ``text`` (optional)
+
+    Returns:
+        TokenizedDocument
+    """
+    key = TOKENS_KEY.format(model_name, text_hash or content_hash(text))
+    try:
+        cached = get_redis().hmget(key, 'ids', 'offsets')
+        if cached[0] is not None:
+            return TokenizedDocument.from_bytes(model_name, cached[0], cached[1])
+    except Exception as e:
+        logger.warning(f"Token cache read failed for {key}: {str(e)}")
+
+    document = _tokenize(text, model_name)
+    logger.info(f"Tokenized document with {model_name}: {len(document)} tokens")
+    try:
+        ids_bytes, offsets_bytes = document.to_bytes()
+        pipe = get_redis().pipeline()
+        pipe.hset(key, mapping={'ids': ids_bytes, 'offsets': offsets_bytes})
+        pipe.expire(key, config[env].TOKEN_CACHE_TTL_SECONDS)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Token cache write failed for {key}: {str(e)}")
+    return document
@@ -0,0 +1,184 @@
+"""
+CPU topology for the web and worker tiers.
+
+Left alone, torch (and the OpenMP/MKL pools under numpy and tokenizers)
+starts one intra-op thread per visible core in every process. With four
+gunicorn workers and a prefork Celery pool on the same node that is dozens
+of busy threads per core as soon as several inferences overlap, and inside
+a container the "visible" cores are the host's, not the cgroup quota.
+
+This module sizes each role from the cores it can actually use:
+
+    cores = min(CPU affinity mask, cgroup CPU quota)
+
+    web               TOPOLOGY_WEB_WORKERS gunicorn workers (default
+                      max(2, cores)), 1 compute thread each - they mostly
+                      enqueue and wait on I/O
+    fast              TOPOLOGY_FAST_CONCURRENCY Celery children on the
+                      default queue (default cores), 1 thread each
+    inference         Celery children on the inference queue, each with
+                      TOPOLOGY_INFERENCE_THREADS intra-op threads (default
+                      min(4, cores)) and cores // threads children
+    inference-server  one process using every core
+
+Inter-op threads are TOPOLOGY_INTEROP_THREADS (default 1): generation is a
+sequential graph and gains nothing from a second pool. With
+TOPOLOGY_PIN_CPUS=True each child is pinned to its own block of cores.
+
+``apply(role)`` runs at process start (gunicorn ``post_fork``, Celery
+``worker_process_init``, the inference server main) and exports the
+thread counts before torch is imported, so lazy imports pick them up.
+``scripts/benchmark_topology.py`` compares aggregate throughput with the
+library defaults.
+"""
+
+import os
+import sys
+import math
+import logging
+from collections import namedtuple
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+env = os.getenv('FLASK_ENV', 'development')
+
+WEB = 'web'
+FAST = 'fast'
+INFERENCE = 'inference'
+SERVER = 'inference-server'
+ROLES = (WEB, FAST, INFERENCE, SERVER)
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+
+# Thread pools read these once, when the library is first imported
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+Plan = namedtuple('Plan', ['role', 'cores', 'processes', 'intra_op_threads', 'inter_op_threads'])
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read().strip()
+
+
+def cgroup_cpu_limit(root=CGROUP_ROOT):
+    """
+    CPU quota of this cgroup in cores (cgroup v2 ``cpu.max`` or v1
+    ``cpu.cfs_quota_us``/``cpu.cfs_period_us``).
+
+    Returns:
+        float: Quota in cores, or None when unlimited or unknown
+    """
+    try:
+        quota, period = _read(os.path.join(root, 'cpu.max')).split()[:2]
+        return None if quota == 'max' else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    for controller in ('cpu', 'cpu,cpuacct'):
+        try:
+            quota = int(_read(os.path.join(root, controller, 'cpu.cfs_quota_us')))
+            period = int(_read(os.path.join(root, controller, 'cpu.cfs_period_us')))
+            return quota / period if quota > 0 and period > 0 else None
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def available_cores(root=CGROUP_ROOT):
+    """Cores this process may run on: the affinity mask capped by the cgroup quota."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(root)
+    if limit:
+        # A fractional quota is throttled, not shared - round down
+        cores = min(cores, max(1, math.floor(limit)))
+    return cores
+
+
+def plan(role, cores=None, cfg=None):
+    """
+    Process and thread counts for a role.
+
+    Args:
+        role: One of ROLES
+        cores: Usable cores (defaults to ``available_cores()``)
+        cfg: Config class (defaults to the current environment's)
+
+    Returns:
+        Plan
+    """
+    if role not in ROLES:
+        raise ValueError(f"Unknown topology role '{role}', expected one of {', '.join(ROLES)}")
+    cfg = cfg or config[env]
+    cores = cores or available_cores()
+    inter_op = max(1, cfg.TOPOLOGY_INTEROP_THREADS)
+
+    if role == WEB:
+        return Plan(role, cores, cfg.TOPOLOGY_WEB_WORKERS or max(2, cores), 1, inter_op)
+    if role == FAST:
+        return Plan(role, cores, cfg.TOPOLOGY_FAST_CONCURRENCY or cores, 1, inter_op)
+    if role == SERVER:
+        return Plan(role, cores, 1, cfg.TOPOLOGY_INFERENCE_THREADS or cores, inter_op)
+
+    processes = cfg.TOPOLOGY_INFERENCE_CONCURRENCY
+    threads = cfg.TOPOLOGY_INFERENCE_THREADS
+    if not threads:
+        threads = max(1, cores // processes) if processes else min(4, cores)
+    return Plan(role, cores, processes or max(1, cores // threads), threads, inter_op)
+
+
+def cpu_block(plan, index, cpus=None):
+    """The cores child ``index`` of a pinned pool runs on."""
+    cpus = sorted(cpus if cpus is not None else os.sched_getaffinity(0))
+    width = min(plan.intra_op_threads, len(cpus))
+    start = (index * width) % len(cpus)
+    return {cpus[(start + i) % len(cpus)] for i in range(width)}
+
+
+def apply(role, index=None, cfg=None):
+    """
+    Configure thread pools (and optionally CPU affinity) for this process.
+
+    Call as early as possible in the process: the OpenMP/MKL variables only
+    take effect for libraries imported afterwards. If torch is already
+    loaded its pools are resized directly.
+
+    Args:
+        role: One of ROLES
+        index: Child number within its pool, used for CPU pinning
+
+    Returns:
+        Plan: The applied plan, or None when TOPOLOGY_ENABLED is off
+    """
+    cfg = cfg or config[env]
+    if not cfg.TOPOLOGY_ENABLED:
+        return None
+    p = plan(role, cfg=cfg)
+
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(p.intra_op_threads)
+    # Fast tokenizers spawn their own pool per process otherwise
+    os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(p.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(p.inter_op_threads)
+        except RuntimeError:
+            # Only settable before the first parallel op in the process
+            logger.warning("torch inter-op threads already initialised, leaving them as they are")
+
+    pinned = None
+    if cfg.TOPOLOGY_PIN_CPUS and index is not None and hasattr(os, 'sched_setaffinity'):
+        pinned = cpu_block(p, index)
+        os.sched_setaffinity(0, pinned)
+
+    logger.info(f"Topology {role}: {p.cores} cores, {p.processes} processes x {p.intra_op_threads} "
+                f"intra-op / {p.inter_op_threads} inter-op threads"
+                + (f", pinned to {sorted(pinned)}" if pinned else ''))
+    return p
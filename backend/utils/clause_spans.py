@@ -0,0 +1,63 @@
+import re
+from bisect import bisect_right
+
+# Page separator written between PDF pages by extract_text
+PAGE_BREAK = '\f'
+
+# How a clause was found
+HEADING_CONFIDENCE = 0.9    # numbered heading naming the clause type
+PHRASE_CONFIDENCE = 0.7     # clause phrase without a heading
+KEYWORD_CONFIDENCE = 0.5    # keyword anchor with surrounding context
+FALLBACK_CONFIDENCE = 0.3   # plain sentence, no clause signal
+
+def trim_span(text, start, end):
+    """Shrink (start, end) so the span has no leading or trailing whitespace."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+class PageIndex:
+    """Map character offsets to 1-based page numbers via the page breaks."""
+
+    def __init__(self, text):
+        self.breaks = [m.start() for m in re.finditer(PAGE_BREAK, text or '')]
+
+    def page(self, offset):
+        return bisect_right(self.breaks, offset) + 1
+
+def clause_record(text, clause_type, heading, start, end, confidence, pages=None, **extra):
+    """
+    A clause as a span of the stored document text.
+
+    Args:
+        text: Document text the offsets refer to
+        clause_type: Clause category
+        heading: Matched heading or label
+        start, end: Character offsets (trimmed of surrounding whitespace)
+        confidence: One of the *_CONFIDENCE levels
+        pages: PageIndex of ``text`` (built if not given)
+
+    Returns:
+        dict: {type, heading, start, end, page, confidence, **extra}
+    """
+    start, end = trim_span(text, start, end)
+    pages = pages or PageIndex(text)
+    return {'type': clause_type, 'heading': heading, 'start': start, 'end': end,
+            'page': pages.page(start), 'confidence': confidence, **extra}
+
+def clause_text(text, clause):
+    """The clause's exact text; legacy records carry it in 'content'."""
+    if 'start' in clause and 'end' in clause:
+        return text[clause['start']:clause['end']]
+    return clause.get('content', '')
+
+def clause_preview(text, clause, max_chars=500):
+    """Whitespace-collapsed clause text, cut at ``max_chars`` with '...'."""
+    preview = re.sub(r'\s+', ' ', clause_text(text, clause)).strip()
+    return preview[:max_chars] + '...' if len(preview) > max_chars else preview
+
+def with_previews(clauses, text, max_chars=500):
+    """Copies of the clause records with a rendered 'preview' each."""
+    return [{**clause, 'preview': clause_preview(text, clause, max_chars)} for clause in clauses or []]
@@ -0,0 +1,61 @@
+import re
+import time
+
+# Analysis stages in order of cost; the cheap ones always fit a deadline
+STAGES = ('structure', 'clauses', 'risks', 'extractive_summary', 'abstractive_summary')
+
+# Upper bounds (ms) of the budget levels metrics are reported by
+BUDGET_LEVELS = (2000, 5000, 10000, 30000)
+
+WORD = re.compile(r'[\w\u0900-\u097F]+')
+
+class Budget:
+    """
+    Time left before an absolute deadline.
+
+    Args:
+        deadline_at: Epoch seconds, or None for no deadline
+    """
+
+    def __init__(self, deadline_at=None):
+        self.deadline_at = deadline_at
+
+    def remaining(self):
+        """Seconds left (infinite without a deadline, never negative)."""
+        if self.deadline_at is None:
+            return float('inf')
+        return max(0.0, self.deadline_at - time.time())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def allows(self, seconds):
+        """Whether work expected to take ``seconds`` fits in the time left."""
+        return seconds <= self.remaining()
+
+def budget_level(deadline_ms):
+    """Metric label of a deadline, e.g. '<=5s' or '>30s'."""
+    for bound in BUDGET_LEVELS:
+        if deadline_ms <= bound:
+            return f"<={bound // 1000}s"
+    return f">{BUDGET_LEVELS[-1] // 1000}s"
+
+def _words(text):
+    return set(WORD.findall((text or '').lower()))
+
+def partial_quality(partial, final):
+    """
+    How close a partial analysis came to the refined one.
+
+    Returns:
+        dict: {'summary_f1': word-set F1 of the two summaries,
+               'clause_recall': share of final clause spans present in the
+                                partial analysis (1.0 without clauses)}
+    """
+    partial_words, final_words = _words(partial.get('summary')), _words(final.get('summary'))
+    shared = len(partial_words & final_words)
+    f1 = 2 * shared / (len(partial_words) + len(final_words)) if shared else 0.0
+    final_spans = {(c.get('start'), c.get('end')) for c in final.get('clauses') or []}
+    partial_spans = {(c.get('start'), c.get('end')) for c in partial.get('clauses') or []}
+    recall = len(final_spans & partial_spans) / len(final_spans) if final_spans else 1.0
+    return {'summary_f1': round(f1, 4), 'clause_recall': round(recall, 4)}
@@ -0,0 +1,58 @@
+from utils.structure import extract_structure
+
+# Unicode blocks of the Indic scripts (Devanagari through Malayalam)
+INDIC_RANGE = (0x0900, 0x0DFF)
+
+# langdetect codes of the languages the multilingual path handles
+INDIC_LANGUAGES = {'hi': 'hindi', 'mr': 'marathi', 'ne': 'nepali', 'pa': 'punjabi'}
+
+def script_ratio(text):
+    """Share of the letters of a text written in an Indic script."""
+    letters = indic = 0
+    for char in text or '':
+        if char.isalpha():
+            letters += 1
+            if INDIC_RANGE[0] <= ord(char) <= INDIC_RANGE[1]:
+                indic += 1
+    return indic / letters if letters else 0.0
+
+def estimate_tokens(text):
+    """
+    Rough BART token count without loading a tokenizer: about four ASCII
+    characters per token, and about one token per character of other
+    scripts (byte-level BPE splits them into several bytes).
+    """
+    text = text or ''
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return int(ascii_chars / 4 + (len(text) - ascii_chars))
+
+def detect_language(text, ratio, min_ratio=0.2):
+    """
+    'english' for Latin-script text, else the Indic language langdetect
+    finds in a sample of the text ('hindi' when it is unsure).
+    """
+    if ratio < min_ratio:
+        return 'english'
+    try:
+        from langdetect import detect
+        return INDIC_LANGUAGES.get(detect((text or '')[:5000]), 'hindi')
+    except Exception:
+        return 'hindi'
+
+def document_features(text, sections=None):
+    """
+    Cheap routing features of a document, computed once at ingest.
+
+    Args:
+        text: Document text
+        sections: Structure index of ``text`` (computed if not given)
+
+    Returns:
+        dict: {'text_length', 'estimated_tokens', 'script_ratio',
+               'section_count', 'language'}
+    """
+    ratio = script_ratio(text)
+    sections = sections if sections is not None else extract_structure(text or '')
+    return {'text_length': len(text or ''), 'estimated_tokens': estimate_tokens(text),
+            'script_ratio': round(ratio, 4), 'section_count': len(sections),
+            'language': detect_language(text, ratio)}
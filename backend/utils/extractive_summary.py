@@ -0,0 +1,136 @@
+import re
+import numpy as np
+from scipy import sparse
+
+# Sentence ends: Latin punctuation plus the Devanagari danda / double danda
+SENTENCE_SPLIT = re.compile(r'[.!?।॥]+|\n\s*\n')
+
+# \w alone misses Devanagari vowel signs (matras) and viramas, which would
+# split words such as "समाप्ति" into fragments
+WORD = re.compile(r'[\w\u0900-\u097F]+')
+
+STOPWORDS = {
+    # English
+    'the', 'a', 'an', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'by', 'with', 'as', 'at', 'be',
+    'is', 'are', 'was', 'were', 'this', 'that', 'these', 'those', 'it', 'its', 'shall', 'will',
+    'may', 'such', 'any', 'all', 'from', 'which', 'who', 'not', 'no', 'have', 'has', 'been',
+    # Hindi
+    'का', 'की', 'के', 'को', 'में', 'से', 'और', 'है', 'हैं', 'पर', 'यह', 'वह', 'था', 'थे', 'एक', 'भी',
+    'या', 'तो', 'ही', 'द्वारा', 'लिए',
+    # Marathi
+    'आणि', 'आहे', 'आहेत', 'या', 'व', 'हे', 'ही', 'ते', 'की', 'च्या', 'ला', 'ने', 'मध्ये',
+}
+
+def split_sentences(text, min_length=20):
+    """
+    Split text into sentences on Latin and Devanagari sentence punctuation.
+
+    Args:
+        text: Document text
+        min_length: Shorter fragments (headings, numbering) are dropped
+
+    Returns:
+        list: Stripped sentences in document order
+    """
+    sentences = (s.strip() for s in SENTENCE_SPLIT.split(text or ''))
+    return [re.sub(r'\s+', ' ', s) for s in sentences if len(s) > min_length]
+
+def sentence_spans(text):
+    """
+    Character spans of every sentence, each including its end punctuation,
+    so that concatenating all spans reproduces the text (minus blank runs).
+
+    Returns:
+        list: (start, end) tuples in document order
+    """
+    text = text or ''
+    bounds = [0] + [m.end() for m in SENTENCE_SPLIT.finditer(text)] + [len(text)]
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if text[a:b].strip()]
+
+def tfidf_matrix(sentences):
+    """
+    Build an L2-normalised TF-IDF matrix (sentences x terms) in CSR form.
+
+    Uses sublinear term frequency and smoothed IDF.
+    """
+    vocabulary = {}
+    rows, cols, counts = [], [], []
+    for i, sentence in enumerate(sentences):
+        terms = {}
+        for word in WORD.findall(sentence.lower()):
+            if word in STOPWORDS or len(word) < 2 or word.isdigit():
+                continue
+            j = vocabulary.setdefault(word, len(vocabulary))
+            terms[j] = terms.get(j, 0) + 1
+        rows.extend([i] * len(terms))
+        cols.extend(terms.keys())
+        counts.extend(terms.values())
+
+    tf = sparse.csr_matrix((1 + np.log(np.asarray(counts, dtype=np.float64)), (rows, cols)),
+                           shape=(len(sentences), max(1, len(vocabulary))))
+    df = np.bincount(np.asarray(cols, dtype=np.int64), minlength=tf.shape[1])
+    idf = np.log((1 + len(sentences)) / (1 + df)) + 1
+    tfidf = tf @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ tfidf
+
+def textrank_scores(matrix, damping=0.85, iterations=50, tolerance=1e-6):
+    """
+    PageRank over the cosine-similarity graph of the sentence vectors.
+
+    The n x n similarity matrix S = X X^T is never built: with L2-normalised
+    rows, S v = X (X^T v) minus each sentence's self-similarity, so every
+    iteration costs O(nnz(X)) and long documents stay in milliseconds.
+
+    Args:
+        matrix: L2-normalised sentence x term matrix
+
+    Returns:
+        numpy.ndarray: One score per sentence
+    """
+    n = matrix.shape[0]
+    matrix = matrix.tocsr()
+    transpose = matrix.T.tocsr()
+    self_similarity = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+
+    def similarity_times(vector):
+        return matrix @ (transpose @ vector) - self_similarity * vector
+
+    out_weight = similarity_times(np.ones(n))
+    dangling = out_weight <= 1e-12
+    out_weight[dangling] = 1
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        spread = np.where(dangling, 0, scores / out_weight)
+        updated = (1 - damping) / n + damping * (similarity_times(spread) + scores[dangling].sum() / n)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+def extractive_summary(text, max_sentences=3):
+    """
+    Summarize by picking the most central sentences.
+
+    Sentences are ranked with TextRank over TF-IDF vectors, so those that
+    share the most terms with the rest of the document score highest
+    wherever they appear. The top ``max_sentences`` are returned in
+    document order.
+
+    Args:
+        text: Document text (any of English, Hindi, Marathi)
+        max_sentences: Number of sentences to keep
+
+    Returns:
+        str: Summary, sentences joined with '. '
+    """
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return '. '.join(sentences) + '.' if sentences else ''
+
+    scores = textrank_scores(tfidf_matrix(sentences))
+
+    top = np.sort(np.argsort(-scores, kind='stable')[:max_sentences])
+    return '. '.join(sentences[i] for i in top) + '.'
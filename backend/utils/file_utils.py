@@ -55,10 +55,9 @@ def extract_text(path):
             raise ValueError("Legacy .doc format is not supported. Please convert to .docx format.")
         elif ext == 'pdf':
             reader = PdfReader(path)
-            text = ''
-            for page in reader.pages:
-                text += page.extract_text()
-            return text
+            # Pages are separated by form feeds so clause offsets can be
+            # mapped back to page numbers (see utils/clause_spans.py)
+            return '\f'.join(page.extract_text() or '' for page in reader.pages)
         else:
             raise ValueError(f"Unsupported file extension: {ext}")
     except ValueError as ve:
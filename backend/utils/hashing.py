@@ -0,0 +1,48 @@
+import hashlib
+import json
+import re
+
+_PUNCTUATION = str.maketrans({'\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+                              '\u2013': '-', '\u2014': '-', '\u00a0': ' '})
+# "Section 5.", "12.3", "4.", "(a)", "iv)" - but not "30 days"
+_NUMBERING = re.compile(r'^\s*(?:(?:article|section|clause)\s+\d+(?:\.\d+)*\.?'
+                        r'|\d+(?:\.\d+)+\.?|\d+[.)]|\(?[a-z]\)|\(?[ivx]+\))\s+')
+
+def content_hash(text):
+    """
+    Stable hash of document text, used to key checkpoints and caches.
+
+    Args:
+        text: Document or section text
+
+    Returns:
+        str: Hex SHA-256 digest of the UTF-8 encoded text
+    """
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+def params_hash(params):
+    """
+    Stable hash of a parameter dict (e.g. generation parameters).
+
+    Args:
+        params: JSON-serialisable dict
+
+    Returns:
+        str: Hex SHA-256 digest of the canonical JSON encoding
+    """
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def normalize_clause(text):
+    """
+    Canonical form of a clause or section for cache lookups: case-folded,
+    typographic quotes and dashes replaced, leading numbering ("12.3",
+    "(a)", "Section 5.") dropped and whitespace collapsed, so the same
+    boilerplate matches across documents regardless of layout.
+    """
+    text = (text or '').casefold().translate(_PUNCTUATION)
+    text = re.sub(_NUMBERING, '', text)
+    return ' '.join(text.split())
+
+def clause_hash(text):
+    """Hex SHA-256 digest of the normalized clause text (see normalize_clause)."""
+    return content_hash(normalize_clause(text))
@@ -0,0 +1,110 @@
+import re
+
+class KeywordHits:
+    """
+    Result of one automaton scan.
+
+    Attributes:
+        counts: {label: number of keyword occurrences}
+        offsets: {label: [(start, end, keyword), ...]} in text order
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.offsets = {}
+
+    def add(self, label, start, end, keyword):
+        self.counts[label] = self.counts.get(label, 0) + 1
+        self.offsets.setdefault(label, []).append((start, end, keyword))
+
+    def labels(self):
+        return set(self.counts)
+
+    def first(self, label):
+        """(start, end, keyword) of the first hit for a label, or None."""
+        hits = self.offsets.get(label)
+        return hits[0] if hits else None
+
+def _trie_pattern(node):
+    """Regex for a trie node; longer continuations are tried first."""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char != '']
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # A keyword ends here: the longer keywords are optional extensions
+        return '(?:' + body + ')?' if len(branches) > 1 or len(branches[0]) > 1 else body + '?'
+    return body
+
+class KeywordAutomaton:
+    """
+    Multi-keyword matcher compiled from a fixed vocabulary.
+
+    All keywords are merged into one trie, and the trie is compiled into a
+    single regular expression that the C regex engine runs over the text in
+    one pass. At each position the engine follows at most one trie path (a
+    position costs at most the longest keyword length), so a scan is linear
+    in the text whatever the number of keywords. The longest keyword found
+    at each position is expanded to every keyword that is a prefix of it,
+    so nested keywords ("warrant" / "warranty") are all reported.
+
+    Matching is case-insensitive substring matching (the same semantics as
+    ``keyword in text.lower()``), so a keyword also matches inside longer
+    words, and overlapping occurrences are all reported.
+
+    Args:
+        vocabulary: {label: [keyword, ...]}; a keyword may belong to several
+                    labels and labels can be any hashable value
+    """
+
+    def __init__(self, vocabulary):
+        labels_by_keyword = {}
+        for label, keywords in vocabulary.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    labels_by_keyword.setdefault(keyword, []).append(label)
+
+        trie = {}
+        for keyword in labels_by_keyword:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        # Every keyword matched at a position, given the longest one there
+        self._matches = {
+            keyword: [(len(prefix), prefix, tuple(labels_by_keyword[prefix]))
+                      for prefix in labels_by_keyword if keyword.startswith(prefix)]
+            for keyword in labels_by_keyword
+        }
+        # Zero-width lookahead so overlapping occurrences are all found
+        pattern = '(?=(' + _trie_pattern(trie) + '))' if trie else None
+        self._pattern = re.compile(pattern) if pattern else None
+        self._pattern_ignorecase = re.compile(pattern, re.IGNORECASE) if pattern else None
+        self.keyword_count = len(labels_by_keyword)
+
+    def scan(self, text):
+        """
+        Find every keyword occurrence in ``text``.
+
+        Returns:
+            KeywordHits: Counts and character offsets (into ``text``) per label
+        """
+        hits = KeywordHits()
+        if not text or self._pattern is None:
+            return hits
+        # Lowercase once; the few characters that lowercase to two would
+        # shift offsets, so such texts are matched case-insensitively instead
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            found = [(m.start(), m.group(1)) for m in self._pattern.finditer(lowered)]
+        else:
+            found = [(m.start(), m.group(1).lower()) for m in self._pattern_ignorecase.finditer(text)]
+
+        matches = self._matches
+        for start, longest in found:
+            for length, keyword, labels in matches.get(longest, ()):
+                for label in labels:
+                    hits.add(label, start, start + length, keyword)
+        return hits
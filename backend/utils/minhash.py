@@ -0,0 +1,127 @@
+import re
+import base64
+import hashlib
+import zlib
+
+import numpy as np
+
+# Largest prime below 2**32: a * x + b stays below 2**64 for 32-bit a, b, x
+PRIME = np.uint64(4294967291)
+
+def shingles(text, size=5):
+    """Set of 32-bit hashes of the word ``size``-grams of a text (case and spacing ignored)."""
+    words = re.findall(r'\w+', (text or '').lower())
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+    return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8')) for i in range(len(words) - size + 1)}
+
+class MinHasher:
+    """
+    MinHash signatures: for each of ``num_perm`` random hash functions
+    ``(a * x + b) mod PRIME``, the minimum over a document's shingle hashes.
+    The fraction of equal positions in two signatures estimates the Jaccard
+    similarity of the shingle sets.
+
+    Args:
+        num_perm: Signature length
+        shingle_size: Words per shingle
+        seed: Seed of the hash functions; signatures are only comparable
+              between hashers with the same seed and length
+    """
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, int(PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.integers(0, int(PRIME), size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text):
+        """uint32 signature of a text (all ones for a text without words)."""
+        hashes = np.fromiter(shingles(text, self.shingle_size), dtype=np.uint64)
+        if not hashes.size:
+            return np.full(self.num_perm, 0xFFFFFFFF, dtype=np.uint32)
+        return ((self.a * hashes[None, :] + self.b) % PRIME).min(axis=1).astype(np.uint32)
+
+def jaccard(sig_a, sig_b):
+    """Jaccard similarity estimated from two signatures."""
+    return float(np.mean(np.asarray(sig_a) == np.asarray(sig_b)))
+
+def encode_signature(signature):
+    """Signature as base64 text (4 bytes per position) for storage."""
+    return base64.b64encode(np.asarray(signature, dtype='<u4').tobytes()).decode('ascii')
+
+def decode_signature(data):
+    """Signature from encode_signature text or raw bytes."""
+    raw = base64.b64decode(data) if isinstance(data, str) else data
+    return np.frombuffer(raw, dtype='<u4')
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hashing over MinHash signatures.
+
+    The signature is cut into ``bands`` bands of ``len / bands`` rows, and a
+    document is filed under one bucket per band. Two documents become
+    candidates when any band is identical, which for Jaccard similarity s
+    happens with probability 1 - (1 - s**rows)**bands: near-duplicates
+    almost always collide while dissimilar documents rarely do, so a query
+    only reads ``bands`` buckets instead of comparing every document.
+    Candidates are then ranked by their estimated Jaccard similarity.
+
+    Buckets and signatures live in dicts; RedisLSHIndex keeps the same
+    layout in Redis.
+
+    Args:
+        bands: Number of bands (must divide the signature length)
+    """
+
+    def __init__(self, bands=16):
+        self.bands = bands
+        self.buckets = {}
+        self.signatures = {}
+
+    def band_keys(self, signature):
+        """One bucket key per band of a signature."""
+        signature = np.asarray(signature, dtype='<u4')
+        if len(signature) % self.bands:
+            raise ValueError(f"Signature length {len(signature)} is not a multiple of {self.bands} bands")
+        rows = len(signature) // self.bands
+        return [f"{band}:{hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()}"
+                for band in range(self.bands)]
+
+    def threshold(self, num_perm):
+        """Similarity at which documents become candidates with probability ~1/2."""
+        return (1 / self.bands) ** (self.bands / num_perm)
+
+    def add(self, doc_id, signature):
+        for key in self.band_keys(signature):
+            self.buckets.setdefault(key, set()).add(doc_id)
+        self.signatures[doc_id] = np.asarray(signature, dtype='<u4')
+
+    def remove(self, doc_id):
+        signature = self.signatures.pop(doc_id, None)
+        if signature is not None:
+            for key in self.band_keys(signature):
+                self.buckets.get(key, set()).discard(doc_id)
+
+    def _candidates(self, keys):
+        found = set()
+        for key in keys:
+            found.update(self.buckets.get(key, ()))
+        return found
+
+    def _signatures(self, doc_ids):
+        return {doc_id: self.signatures[doc_id] for doc_id in doc_ids if doc_id in self.signatures}
+
+    def query(self, signature, threshold=0.0, limit=None, exclude=None):
+        """
+        Indexed documents similar to a signature.
+
+        Returns:
+            list: [(doc_id, estimated Jaccard)] at or above ``threshold``, most similar first
+        """
+        candidates = self._candidates(self.band_keys(signature))
+        candidates.discard(exclude)
+        scored = [(doc_id, jaccard(signature, other)) for doc_id, other in self._signatures(candidates).items()]
+        scored = sorted((item for item in scored if item[1] >= threshold), key=lambda item: (-item[1], item[0]))
+        return scored[:limit] if limit else scored
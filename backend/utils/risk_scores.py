@@ -0,0 +1,46 @@
+import base64
+import numpy as np
+
+# Classes of the fine-tuned risk classifier, in label order
+RISK_LABELS = ('low', 'medium', 'high')
+
+# Severity of each class, used for clause and document scores
+SEVERITY = np.array([0.0, 0.5, 1.0], dtype=np.float32)
+
+# Clause severities averaged into the document score
+TOP_CLAUSES = 3
+
+def pack_probs(probs):
+    """
+    Store an (n_clauses, n_labels) probability matrix compactly.
+
+    Returns:
+        dict: {'labels', 'shape', 'dtype': 'float16', 'data': base64 bytes}
+    """
+    probs = np.asarray(probs, dtype=np.float16)
+    return {'labels': list(RISK_LABELS), 'shape': list(probs.shape), 'dtype': 'float16',
+            'data': base64.b64encode(probs.tobytes()).decode('ascii')}
+
+def unpack_probs(packed):
+    """The probability matrix of a pack_probs record, as float32."""
+    probs = np.frombuffer(base64.b64decode(packed['data']), dtype=packed.get('dtype', 'float16'))
+    return probs.reshape(packed['shape']).astype(np.float32)
+
+def clause_severities(probs):
+    """Expected severity (0 = low, 1 = high) of every clause."""
+    probs = np.asarray(probs, dtype=np.float32)
+    if not probs.size:
+        return np.zeros(0, dtype=np.float32)
+    return probs @ SEVERITY[:probs.shape[1]]
+
+def document_score(probs, top=TOP_CLAUSES):
+    """
+    Document risk score in [0, 1]: the mean severity of its ``top`` riskiest
+    clauses, so a few risky clauses are not diluted by many harmless ones.
+    """
+    severities = np.sort(clause_severities(probs))[::-1][:top]
+    return round(float(severities.mean()), 4) if severities.size else 0.0
+
+def risk_level(score, medium=0.3, high=0.6):
+    """'low', 'medium' or 'high' for a document score."""
+    return 'high' if score >= high else 'medium' if score >= medium else 'low'
@@ -0,0 +1,117 @@
+import math
+import difflib
+from bisect import bisect_right
+
+class SectionDiff:
+    """
+    Sections of a revised document matched to an earlier version by hash.
+
+    Both versions are split with the same structure index (each section
+    carries the content hash of its exact text), and the hash sequences are
+    aligned in order, so moved or renumbered neighbours do not break the
+    match. Each run of consecutive unchanged sections is the same text in
+    both versions, only shifted, so spans of the earlier analysis lying in
+    one run can be reused at their new offsets.
+
+    Args:
+        old_sections: Sections of the earlier version ({'start', 'end', 'hash'})
+        new_sections: Sections of the revision
+
+    Attributes:
+        reused: Indices of revision sections with an unchanged match
+        changed: Indices of revision sections to recompute, in order
+        runs: (old_start, old_end, delta) character ranges of unchanged runs
+    """
+
+    def __init__(self, old_sections, new_sections):
+        matcher = difflib.SequenceMatcher(None, [s['hash'] for s in old_sections],
+                                          [s['hash'] for s in new_sections], autojunk=False)
+        self.reused = set()
+        self.runs = []
+        for old_index, new_index, size in matcher.get_matching_blocks():
+            if not size:
+                continue
+            self.reused.update(range(new_index, new_index + size))
+            old_start = old_sections[old_index]['start']
+            self.runs.append((old_start, old_sections[old_index + size - 1]['end'],
+                              new_sections[new_index]['start'] - old_start))
+        self.changed = [i for i in range(len(new_sections)) if i not in self.reused]
+
+    def shift(self, start, end):
+        """New (start, end) of an earlier span inside one unchanged run, else None."""
+        for old_start, old_end, delta in self.runs:
+            if old_start <= start and end <= old_end:
+                return start + delta, end + delta
+        return None
+
+    def touched(self, new_sections, start, end):
+        """
+        Revision sections an earlier span that is not in one unchanged run
+        (see shift) still covers: the unchanged sections from each end of
+        the span up to the first changed one.
+        """
+        changed = set(self.changed)
+        starts = [section['start'] for section in new_sections]
+        ends = []
+        for position in (start, end - 1):
+            moved = self.shift(position, position + 1)
+            ends.append(bisect_right(starts, moved[0]) - 1 if moved else None)
+        first, last = ends
+        touched = set()
+        for index, step, stop in ((first, 1, last), (last, -1, first)):
+            while index is not None and 0 <= index < len(new_sections) and index not in changed:
+                touched.add(index)
+                if index == stop:
+                    break
+                index += step
+        return touched
+
+def plan_chunks(length, reused, window, min_tokens, max_chunks):
+    """
+    Token chunks of a revision that keeps the summaries of ``reused`` spans.
+
+    The tokens between reused spans are chunked into evenly sized pieces of
+    at most ``window`` tokens. A gap shorter than ``min_tokens`` is merged
+    into a neighbouring chunk (preferably another gap; a reused chunk it is
+    merged into is summarized again), since summarizing a few tokens with
+    the summary's minimum length only produces filler.
+
+    Args:
+        length: Number of tokens
+        reused: (start, end) token spans whose summaries can be kept
+        window: Maximum chunk length
+        min_tokens: Shortest gap summarized on its own
+        max_chunks: Chunk budget
+
+    Returns:
+        list: (start, end, index into ``reused`` or None) in order, or None
+              when the chunks would exceed ``max_chunks``
+    """
+    segments, position = [], 0
+    for index, (start, end) in sorted(enumerate(reused), key=lambda item: item[1]):
+        start = max(start, position)
+        if end <= start:
+            continue
+        if start > position:
+            segments.append([position, start, None])
+        segments.append([start, end, index])
+        position = end
+    if position < length:
+        segments.append([position, length, None])
+
+    while len(segments) > 1:
+        small = next((i for i, (start, end, index) in enumerate(segments)
+                      if index is None and end - start < min_tokens), None)
+        if small is None:
+            break
+        neighbours = [i for i in (small - 1, small + 1) if 0 <= i < len(segments)]
+        other = min(neighbours, key=lambda i: (segments[i][2] is not None, segments[i][1] - segments[i][0]))
+        first, last = sorted((small, other))
+        segments[first:last + 1] = [[segments[first][0], segments[last][1], None]]
+
+    chunks = []
+    for start, end, index in segments:
+        pieces = math.ceil((end - start) / window) if index is None else 1
+        chunks.extend((start + (end - start) * i // pieces, start + (end - start) * (i + 1) // pieces, index)
+                      for i in range(pieces))
+    return chunks if len(chunks) <= max_chunks else None
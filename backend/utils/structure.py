@@ -0,0 +1,36 @@
+import re
+
+from utils.hashing import content_hash
+
+# Start of the next major heading (after a line or PDF page break) - bounds
+# both sections and clauses
+SECTION_HEADING = r'[\n\f]\s*(?:article|section|clause)\s*\d+'
+
+def extract_structure(text, tokens=None):
+    """
+    Split a document into sections at article/section/clause headings.
+
+    Args:
+        text: Document text
+        tokens: Optional TokenizedDocument of ``text``; when given, each
+                section also carries its token span
+
+    Returns:
+        list: [{'index', 'heading', 'start', 'end', 'hash'}] spans covering
+              the text, with the content hash of each section's text (plus
+              'token_start'/'token_end' with ``tokens``)
+    """
+    starts = [0] + [m.start() + 1 for m in re.finditer(SECTION_HEADING, text, re.IGNORECASE)]
+    bounds = starts + [len(text)]
+    sections = []
+    for i in range(len(starts)):
+        start, end = bounds[i], bounds[i + 1]
+        if end <= start:
+            continue
+        first_line = text[start:end].strip().split('\n', 1)[0]
+        section = {'index': len(sections), 'heading': first_line[:100], 'start': start, 'end': end,
+                   'hash': content_hash(text[start:end])}
+        if tokens is not None:
+            section['token_start'], section['token_end'] = tokens.token_span(start, end)
+        sections.append(section)
+    return sections
@@ -0,0 +1,52 @@
+from collections import Counter
+
+def fingerprint(sections):
+    """[[section hash, section length], ...] of a structure index."""
+    return [[section['hash'], section['end'] - section['start']] for section in sections]
+
+class TemplateIndex:
+    """
+    Inverted index from section hashes to the templates containing them.
+
+    A document is matched by looking up each of its section hashes, so the
+    cost depends on the document's section count, not on the number of
+    templates. The best template is the one sharing the most text:
+    coverage is the length of the shared sections over the longer of the
+    document and the template, so a short template does not match a long
+    document it only starts.
+
+    Args:
+        templates: {template_id: fingerprint}
+    """
+
+    def __init__(self, templates):
+        self.postings = {}
+        self.sizes = {}
+        for template_id, sections in templates.items():
+            self.sizes[template_id] = sum(length for _, length in sections) or 1
+            for section_hash, count in Counter(h for h, _ in sections).items():
+                self.postings.setdefault(section_hash, []).append((template_id, count))
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def match(self, sections):
+        """
+        Closest template to a document's fingerprint.
+
+        Returns:
+            tuple: (template_id, coverage in [0, 1]), or (None, 0.0)
+        """
+        shared = {}
+        seen = Counter()
+        for section_hash, length in sections:
+            seen[section_hash] += 1
+            for template_id, count in self.postings.get(section_hash, ()):
+                # Repeated sections only match as often as the template has them
+                if seen[section_hash] <= count:
+                    shared[template_id] = shared.get(template_id, 0) + length
+        if not shared:
+            return None, 0.0
+        size = sum(length for _, length in sections) or 1
+        best = max(shared, key=lambda t: shared[t] / max(size, self.sizes[t]))
+        return best, round(shared[best] / max(size, self.sizes[best]), 4)
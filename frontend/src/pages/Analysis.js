@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { analyzeDocument, getTaskStatus, getDocuments, exportAnalysis, analyzeDocumentFastMultilingual } from '../services/api';
+import { analyzeDocument, getTaskStatus, getDocuments, exportAnalysis, analyzeDocumentFastMultilingual, getDocumentClauses } from '../services/api';
 import RiskDistributionChart from '../components/RiskDistributionChart';
 import ClauseTypeChart from '../components/ClauseTypeChart';
 
@@ -52,7 +52,7 @@ const processClauses = (clauses) => {
     if (typeof clause === 'string') {
       clauseContent = clause.trim();
     } else if (clause && typeof clause === 'object') {
-      clauseContent = (clause.content || '').trim();
+      clauseContent = (clause.preview || clause.content || '').trim();
       if (clause.heading && isDescriptiveLegalHeading(clause.heading)) {
         proposedHeading = clause.heading.trim();
       }
@@ -123,6 +123,18 @@ const Analysis = () => {
     }
   };
 
+  // Clauses arrive as spans of the document text; their previews are
+  // rendered by the backend on request
+  const showAnalysisResult = async (result) => {
+    setAnalysisResult(result);
+    try {
+      const response = await getDocumentClauses(selectedDocument);
+      setAnalysisResult({ ...result, analysis: { ...result.analysis, clauses: response.data.clauses } });
+    } catch (err) {
+      console.error('Failed to load clause previews:', err);
+    }
+  };
+
   const handleAnalyze = async () => {
     if (!selectedDocument) {
       setError('Please select a document');
@@ -139,7 +151,7 @@ const Analysis = () => {
       
       if (response.status === 200 && response.data) {
         // Fast multilingual analysis completed immediately
-        setAnalysisResult(response.data);
+        showAnalysisResult(response.data);
         setStatus('Fast analysis completed');
         console.log('Fast multilingual analysis completed:', response.data);
         
@@ -192,7 +204,7 @@ const Analysis = () => {
         
         // Handle final states
         if (task.state === 'SUCCESS') {
-          setAnalysisResult(task.result);
+          showAnalysisResult(task.result);
           setStatus('Completed');
           clearInterval(interval);
         } else if (task.state === 'FAILURE') {
@@ -665,8 +677,19 @@ const Analysis = () => {
                   </div>
                   <h2 className="text-lg font-semibold text-gray-900">Risk Assessment</h2>
                 </div>
-                <div className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-red-100 text-red-800">
-                  {(analysisResult.analysis.risks || []).length} risks
+                <div className="flex items-center gap-2">
+                  {analysisResult.analysis.risk_level && (
+                    <div className={`inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium ${
+                      analysisResult.analysis.risk_level === 'high' ? 'bg-red-100 text-red-800' :
+                      analysisResult.analysis.risk_level === 'medium' ? 'bg-yellow-100 text-yellow-800' :
+                      'bg-green-100 text-green-800'
+                    }`}>
+                      {analysisResult.analysis.risk_level} risk ({Math.round(analysisResult.analysis.risk_score * 100)}%)
+                    </div>
+                  )}
+                  <div className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-red-100 text-red-800">
+                    {(analysisResult.analysis.risks || []).length} risks
+                  </div>
                 </div>
               </div>
               
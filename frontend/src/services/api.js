@@ -38,9 +38,12 @@ api.interceptors.response.use(
 );
 
 // Upload a single document
-export function uploadDocument(file, onProgress) {
+export function uploadDocument(file, onProgress, previousVersionId = null) {
   const formData = new FormData();
   formData.append('file', file);
+  if (previousVersionId) {
+    formData.append('previous_version_id', previousVersionId);
+  }
   return api.post('/api/upload-document', formData, {
     headers: {'Content-Type': 'multipart/form-data'},
     onUploadProgress: e => onProgress(Math.round((e.loaded * 100)/e.total))
@@ -72,6 +75,22 @@ export function getDashboardStats() {
   return api.get('/api/dashboard-stats');
 }
 
+// Clauses of the latest analysis (start/end offsets into the document text),
+// with rendered previews
+export function getDocumentClauses(documentId, maxChars = 500) {
+  return api.get(`/api/documents/${documentId}/clauses`, { params: { previews: true, max_chars: maxChars } });
+}
+
+// Versions linked to a document, oldest first
+export function getDocumentVersions(documentId) {
+  return api.get(`/api/documents/${documentId}/versions`);
+}
+
+// Near-duplicates of a document among the user's documents
+export function getSimilarDocuments(documentId, threshold) {
+  return api.get(`/api/documents/${documentId}/similar`, { params: threshold ? { threshold } : {} });
+}
+
 // Export analysis
 export function exportAnalysis(documentId) {
   return api.post(`/api/export-analysis-temp/${documentId}`, {}, { responseType: 'blob' });
@@ -84,6 +103,38 @@ export function analyzeDocumentMultilingual(documentId) {
   });
 }
 
+// Stream the summary token by token (server-sent events over a POST).
+// onToken receives each text piece; resolves with the final `done` payload.
+export async function streamSummary(documentId, onToken) {
+  const baseURL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
+  const response = await fetch(`${baseURL}/api/documents/${documentId}/summary/stream`, {
+    method: 'POST',
+    headers: { Authorization: `Bearer ${localStorage.getItem('legistra_token')}` }
+  });
+  if (!response.ok) {
+    throw new Error(`Summary stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const events = buffer.split('\n\n');
+    buffer = events.pop();
+    for (const raw of events) {
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+      if (event === 'token') onToken(data.text);
+      if (event === 'done') return data;
+      if (event === 'error') throw new Error(data.error);
+    }
+  }
+  throw new Error('Summary stream ended unexpectedly');
+}
+
 // Fast multilingual document analysis
 export function analyzeDocumentFastMultilingual(documentId) {
   return api.post('/api/analyze-document-fast-multilingual', { document_id: documentId }, {